@@ -1,11 +1,22 @@
-from fastapi import APIRouter, HTTPException, status, Request
+import json
+import time
+from fastapi import APIRouter, HTTPException, status, Request, Response
 from pydantic import BaseModel
 from typing import Literal, Optional
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse, HTMLResponse, FileResponse
 from app.config.config import logger, K_RESULTS
-from app.services import embed
+from app.services.search.service import get_backend, search_episodes
+from app.services.search.snippets import parse_fields, project
+from app.services.monitoring.profiling import profile_request
+from app.services.monitoring.health import get_health_monitor
+from app.services.monitoring.metrics import (
+    SEARCH_LATENCY_SECONDS,
+    SEARCH_REQUESTS,
+    SEARCH_STAGE_SECONDS,
+    result_count_bucket,
+)
 from pathlib import Path
-from redis import Redis
 
 
 router = APIRouter()
@@ -34,8 +45,47 @@ async def root():
 async def index():
     return FileResponse(Path(__file__).parent.parent.absolute() / "static" / "index.html")
 
+def _search_body(request: Request, search_query: str, limit: int, field_list, backend_name: str):
+    """Run a /search query and serialize it; returns (body, result count, profile)."""
+    with profile_request(request, "/search") as profile:
+        hits = search_episodes(search_query, limit=limit)
+
+        # Same shape as the original RediSearch response: cosine distance, joined text
+        with SEARCH_STAGE_SECONDS.time(backend=backend_name, stage="assemble"):
+            if field_list is None:
+                results = [
+                    {
+                        "id": hit["key"],
+                        "vector_score": str(1.0 - hit["score"]),
+                        "summary": " ".join(hit["data"].get("summary") or []),
+                        "synopsis": " ".join(hit["data"].get("synopsis") or []),
+                    }
+                    for hit in hits
+                ]
+            else:
+                results = [
+                    {
+                        "id": hit["key"],
+                        "vector_score": str(1.0 - hit["score"]),
+                        **project(hit["data"], field_list, search_query),
+                    }
+                    for hit in hits
+                ]
+
+        with SEARCH_STAGE_SECONDS.time(backend=backend_name, stage="serialize"):
+            body = json.dumps(
+                {"status": "success", "result": results, "message": "Search successful."}
+            )
+    return body, len(results), profile
+
 @router.post("/search", response_model=SearchResponse, status_code=status.HTTP_200_OK)
-async def search(request: Request, k: Optional[int] = None):
+async def search(request: Request, k: Optional[int] = None, fields: Optional[str] = None):
+    """``fields`` (comma-separated, e.g. ``title,snippet``) replaces the joined summary/synopsis."""
+    try:
+        field_list = parse_fields(fields)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"status": "error", "data": str(e)})
+    backend_name = "unknown"
     try:
         body_as_json = await request.json()
         search_query = body_as_json.get("query", None)
@@ -51,13 +101,22 @@ async def search(request: Request, k: Optional[int] = None):
                 status="success", result=[], message="Empty query string submitted."
             )
         else:
-            results = embed.fetch_search_results(search_query, k or K_RESULTS)
-
-            return SearchResponse(
-                status="success", result=results, message="Search successful."
+            start = time.perf_counter()
+            backend_name = get_backend().name
+            # Encoding and scanning block, so they run in the threadpool rather than on the event loop
+            body, result_count, profile = await run_in_threadpool(
+                _search_body, request, search_query, k or K_RESULTS, field_list, backend_name
             )
+            SEARCH_REQUESTS.inc(endpoint="/search", backend=backend_name, status="ok")
+            SEARCH_LATENCY_SECONDS.observe(
+                time.perf_counter() - start,
+                endpoint="/search", backend=backend_name, result_count=result_count_bucket(result_count),
+            )
+            headers = {"X-Profile-Id": profile.id} if profile else None
+            return Response(content=body, media_type="application/json", headers=headers)
 
     except Exception as e:
+        SEARCH_REQUESTS.inc(endpoint="/search", backend=backend_name, status="error")
         return JSONResponse(
             status_code=500, content={"status": "error", "data": str(e)}
         )
@@ -73,38 +132,28 @@ async def health_check():
 
 @router.get("/health/redis", response_model=SuccessResponse, status_code=status.HTTP_200_OK)
 async def redis_health_check():
-    """Health check endpoint to verify Redis connection."""
-    try:
-        # Test Redis connection
-        client = Redis(host='localhost', port=6379, db=0)
-        client.ping()
-        logger.info("Redis health check successful")
-        return SuccessResponse(
-            status="success",
-            message="Redis connection is healthy"
-        )
-    except Exception as e:
-        logger.error(f"Redis health check failed: {e}")
+    """Health check endpoint to verify Redis connection (cached by the health monitor)."""
+    redis_status = get_health_monitor().status("redis")
+    if redis_status["status"] != "healthy":
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=f"Redis connection failed: {str(e)}"
+            detail=f"Redis connection failed: {redis_status['error']}"
         )
+    return SuccessResponse(
+        status="success",
+        message="Redis connection is healthy"
+    )
 
 @router.get("/health/model", response_model=SuccessResponse, status_code=status.HTTP_200_OK)
 async def model_health_check():
-    """Health check endpoint to verify the embedding model is loaded."""
-    try:
-        # Test model by encoding a simple string
-        from app.services.embed import embedder
-        embedder.encode("test")
-        logger.info("Model health check successful")
-        return SuccessResponse(
-            status="success",
-            message="Embedding model is healthy"
-        )
-    except Exception as e:
-        logger.error(f"Model health check failed: {e}")
+    """Health check endpoint to verify the embedding model is loaded (cached by the health monitor)."""
+    model_status = get_health_monitor().status("model")
+    if model_status["status"] != "healthy":
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=f"Model check failed: {str(e)}"
+            detail=f"Model check failed: {model_status['error']}"
         )
+    return SuccessResponse(
+        status="success",
+        message="Embedding model is healthy"
+    )
@@ -1,24 +1,34 @@
-from fastapi import FastAPI, HTTPException
+from app.services.monitoring.startup import startup_timer
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 import uvicorn
 from app.config.config import logger
 from app.api import api
 from app.api.routes import search as search_router
+from app.api.routes import admin as admin_router
 from fastapi.middleware.cors import CORSMiddleware
-from app.services.embed import (
-    client,
-    load_content,
-    create_pipeline,
-    execute_pipeline,
-    create_index,
-)
-from app.services.embed import CONTENT_PATH
+from app.services.embed import client, CONTENT_PATH
+from app.services.search.backends import RedisBackend, items_from_records
+from app.services.search.service import backends_of, get_backend
+from app.services.search.suggest import get_suggest_index
+from app.services.search.entities import get_entity_index
+from app.services.search.quotes import get_quote_index
 from app.services.storage.document_store import get_store
+from app.services.storage.snapshot_store import SnapshotStore
+from app.services.monitoring.metrics import REGISTRY, HTTP_REQUEST_SECONDS
+from app.services.monitoring.admission import BATCH_PATHS, AdmissionMiddleware
+from app.services.monitoring.health import get_health_monitor
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
-from typing import Dict, Any
-import json
+import time
+
+startup_timer.mark("imports")
 
 app = FastAPI()
+# Searches beyond the concurrency limit queue or are shed with 503; added
+# before CORS so that rejections still carry the CORS headers
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(AdmissionMiddleware, paths=BATCH_PATHS, pool="batch")
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://localhost:5175"],  # React dev server
@@ -28,146 +38,194 @@ app.add_middleware(
 )
 app.include_router(api.router)
 app.include_router(search_router.router, prefix="/api")
-app.mount(
-    "/static",
-    StaticFiles(directory=Path(__file__).parent.parent.absolute() / "static"),
-    name="static",
-)
+app.include_router(admin_router.router, prefix="/admin")
+STATIC_DIR = Path(__file__).parent.parent.absolute() / "static"
+if STATIC_DIR.is_dir():
+    # Only present once the frontend has been built into app/static
+    app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template, not raw URL, to keep label cardinality bounded
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.observe(
+        time.perf_counter() - start,
+        method=request.method,
+        path=getattr(route, "path", "unmatched"),
+        status=response.status_code,
+    )
+    return response
 
-# Track service status
-service_status: Dict[str, Any] = {
-    "redis": {"status": "unknown", "error": None},
-    "model": {"status": "unknown", "error": None},
-    "data": {"status": "unknown", "error": None},
-    "store": {"status": "unknown", "error": None}
-}
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: per-stage search/ingest latency, request counts."""
+    return PlainTextResponse(REGISTRY.expose(), media_type="text/plain; version=0.0.4")
 
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Main.py: Starting application...")
+# Service status: seeded by startup, then kept current by background probes
+health_monitor = get_health_monitor()
+
+# Set by the pre-fork launcher (app.api.prefork) once load_services() has run in
+# the parent; its workers then share what was loaded instead of loading it again
+preloaded = False
+
+def load_services(verify_model: bool = True):
+    """Connect to Redis, load the store, indexes and Redis data, and check the model.
 
+    With ``verify_model=False`` the model is neither loaded nor run, so the
+    pre-fork parent never starts the encoder's thread pools.
+    """
     # Initialize Redis
     try:
-        client.ping()
-        service_status["redis"]["status"] = "healthy"
+        with startup_timer.phase("redis_connect"):
+            client.ping()
+        health_monitor.record("redis")
         logger.info("Redis connection successful")
     except Exception as e:
-        service_status["redis"]["status"] = "unhealthy"
-        service_status["redis"]["error"] = str(e)
+        health_monitor.record("redis", error=str(e))
         logger.error(f"Redis connection failed: {e}")
 
     # Initialize Document Store
     try:
-        store = get_store()
-        # Test store by checking if any seasons exist
-        if not list(store.episodes_path.glob("season_*.json")):
-            logger.info("Store empty, importing data...")
-            # Find latest JSON file
-            content_dir = Path(CONTENT_PATH).parent
-            json_files = list(content_dir.glob("buffy_all_seasons_*.json"))
-            if json_files:
-                latest_file = max(json_files, key=lambda p: p.stat().st_mtime)
-                store.import_from_json(str(latest_file))
-                logger.info(f"Imported data from {latest_file}")
-            else:
-                logger.warning("No JSON data files found to import")
+        with startup_timer.phase("store_load"):
+            store = get_store()
+            # Test store by checking if any seasons exist
+            if not list(store.episodes_path.glob("season_*.json")):
+                logger.info("Store empty, importing data...")
+                # Prefer the latest crawl snapshot; its ref names it directly
+                snapshots = SnapshotStore()
+                latest_snapshot = snapshots.latest("crawl")
+                if latest_snapshot:
+                    store.import_snapshot(snapshots, latest_snapshot)
+                    logger.info(f"Imported crawl snapshot {latest_snapshot}")
+                else:
+                    # Fall back to the latest JSON/JSONL file
+                    content_dir = Path(CONTENT_PATH).parent
+                    json_files = list(content_dir.glob("buffy_all_seasons_*.json"))
+                    json_files += list(content_dir.glob("buffy_all_seasons_*.jsonl"))
+                    if json_files:
+                        latest_file = max(json_files, key=lambda p: p.stat().st_mtime)
+                        store.import_from_json(str(latest_file))
+                        logger.info(f"Imported data from {latest_file}")
+                    else:
+                        logger.warning("No JSON data files found to import")
         
-        service_status["store"]["status"] = "healthy"
+        health_monitor.record("store")
         logger.info("Document store initialized successfully")
 
     except Exception as e:
-        service_status["store"]["status"] = "unhealthy"
-        service_status["store"]["error"] = str(e)
+        health_monitor.record("store", error=str(e))
         logger.error(f"Document store initialization failed: {e}")
 
-    # Load and process data if Redis is healthy
-    if service_status["redis"]["status"] == "healthy":
-        try:
-            client.flushdb()
-            logger.info("Flushed the Redis database.")
-
-            # Load data from document store
-            store = get_store()
-            buffy_data = {}
-            
-            # Load each season
-            for season_file in store.episodes_path.glob("season_*.json"):
-                season_num = int(season_file.stem.split('_')[1])
-                with open(season_file, 'r') as f:
-                    season_data = json.load(f)
-                buffy_data[f"season_{season_num}"] = season_data
-
-            pipeline = create_pipeline(buffy_data)
-            logger.info("Created pipeline.")
-
-            execute_pipeline(pipeline)
-            logger.info("Executed pipeline.")
-
-            create_index()
-            logger.info("Created index.")
-
-            service_status["data"]["status"] = "healthy"
-        except Exception as e:
-            service_status["data"]["status"] = "unhealthy"
-            service_status["data"]["error"] = str(e)
-            logger.error(f"Data processing failed: {e}")
+    # Build the vector index. Redis is only loaded when the configured backend uses it
+    try:
+        with startup_timer.phase("vector_index"):
+            backend = get_backend()
+        with startup_timer.phase("fragment_cache"):
+            get_store().load_fragments()
+        with startup_timer.phase("suggest_index"):
+            get_suggest_index()
+        with startup_timer.phase("entity_index"):
+            get_entity_index()
+        with startup_timer.phase("quote_index"):
+            get_quote_index()
+        redis_backend = next((b for b in backends_of(backend) if isinstance(b, RedisBackend)), None)
+        if redis_backend and health_monitor.healthy("redis"):
+            with startup_timer.phase("redis_ingest"):
+                client.flushdb()
+                logger.info("Flushed the Redis database.")
+
+                # Reuse the embeddings saved in the document store
+                written = redis_backend.upsert(items_from_records(get_store().iter_records()))
+                logger.info(f"Loaded {written} episodes into Redis.")
+
+            with startup_timer.phase("index_build"):
+                redis_backend.create_index()
+                logger.info("Created index.")
+            # Redis answers from the re-ingested copy now; cached results are keyed on the old version
+            get_store().bump_data_version()
+
+        health_monitor.record("data")
+    except Exception as e:
+        health_monitor.record("data", error=str(e))
+        logger.error(f"Data processing failed: {e}")
 
     # Verify model
+    if not verify_model:
+        return
     try:
-        from app.services.embed import embedder
-        # Test model with a simple string
-        embedder.encode("test")
-        service_status["model"]["status"] = "healthy"
+        with startup_timer.phase("model_verify"):
+            from app.services.embed import embedder
+            # Test model with a simple string
+            embedder.encode("test")
+        health_monitor.record("model")
         logger.info("Model verification successful")
     except Exception as e:
-        service_status["model"]["status"] = "unhealthy"
-        service_status["model"]["error"] = str(e)
+        health_monitor.record("model", error=str(e))
         logger.error(f"Model verification failed: {e}")
 
+@app.on_event("startup")
+async def startup_event():
+    logger.info("Main.py: Starting application...")
+    if preloaded:
+        # Loaded before fork; take this worker's own readings (and load the model if the parent did not)
+        health_monitor.check_all()
+    else:
+        load_services()
+    health_monitor.start()
+    startup_timer.ready()
+    startup_timer.log_report(logger)
+
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Main.py: Shutting down application...")
+    health_monitor.stop()
     # No need to close document store as it's file-based
-    pass
 
 @app.get("/health")
 async def health_check():
-    """Overall health check endpoint."""
-    overall_status = "healthy" if all(s["status"] == "healthy" for s in service_status.values()) else "degraded"
+    """Overall health check endpoint; served from the background monitor's cache."""
+    services = health_monitor.statuses()
+    overall_status = "healthy" if all(s["status"] == "healthy" for s in services.values()) else "degraded"
     return {
         "status": overall_status,
-        "services": service_status
+        "services": services
     }
 
-@app.get("/health/redis")
-async def redis_health_check():
-    """Redis health check endpoint."""
-    if service_status["redis"]["status"] == "healthy":
-        return {"status": "healthy", "message": "Redis connection is healthy"}
+@app.get("/health/startup")
+async def startup_report():
+    """Boot time broken down by phase (imports, model load, store load, Redis ingest, index build)."""
+    return startup_timer.report()
+
+@app.get("/health/history")
+async def health_history():
+    """Recent probe latencies and results per service."""
+    return {"interval_seconds": health_monitor.interval, "services": health_monitor.history()}
+
+def _cached_health(name: str, label: str):
+    status = health_monitor.status(name)
+    if status["status"] == "healthy":
+        return {"status": "healthy", "message": f"{label} is healthy", "checked_at": status["checked_at"]}
     raise HTTPException(
         status_code=503,
-        detail=f"Redis is unhealthy: {service_status['redis']['error']}"
+        detail=f"{label} is unhealthy: {status['error']}"
     )
 
+@app.get("/health/redis")
+async def redis_health_check():
+    """Redis health check endpoint."""
+    return _cached_health("redis", "Redis connection")
+
 @app.get("/health/model")
 async def model_health_check():
     """Model health check endpoint."""
-    if service_status["model"]["status"] == "healthy":
-        return {"status": "healthy", "message": "Model is healthy"}
-    raise HTTPException(
-        status_code=503,
-        detail=f"Model is unhealthy: {service_status['model']['error']}"
-    )
+    return _cached_health("model", "Model")
 
 @app.get("/health/store")
 async def store_health_check():
     """Document store health check endpoint."""
-    if service_status["store"]["status"] == "healthy":
-        return {"status": "healthy", "message": "Document store is healthy"}
-    raise HTTPException(
-        status_code=503,
-        detail=f"Document store is unhealthy: {service_status['store']['error']}"
-    )
+    return _cached_health("store", "Document store")
 
 if __name__ == "__main__":
     uvicorn.run(app, host="127.0.0.1", port=8000)
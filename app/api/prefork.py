@@ -0,0 +1,278 @@
+"""Pre-fork production launcher: load once, fork N uvicorn workers.
+
+    python -m app.api.prefork --workers 4 --port 8000 [--report boot.json]
+
+``uvicorn --workers N`` imports and loads the app in every worker, so the
+model, the parsed document store and the vector matrices exist N times.
+Here the parent runs the startup work once (``main.load_services``), maps
+the vector matrices into read-only files (``NumpyBackend.map_matrices``),
+loads the PyTorch model, freezes the GC and only then forks. Workers share
+those pages copy-on-write and accept on one listening socket.
+
+* ONNX Runtime sessions own thread pools that do not survive ``fork``, so
+  with an ONNX encoder each worker loads its own (small) session instead.
+* The parent never runs the model: running it would start thread pools
+  whose locks the children would inherit.
+* Workers that die are replaced from the already-loaded parent. One that
+  dies within ``MIN_WORKER_LIFETIME_SECONDS`` of its fork counts as a
+  failed start, and replacements after consecutive failed starts are
+  delayed exponentially (up to ``RESPAWN_MAX_DELAY_SECONDS``), so a worker
+  that cannot start does not turn the parent into a fork loop.
+
+Once every worker is up, the parent logs (and with ``--report`` writes)
+the boot time and each process's RSS, PSS and private memory, read from
+``/proc/<pid>/smaps_rollup`` (Linux).
+"""
+import argparse
+import gc
+import json
+import os
+import select
+import signal
+import socket
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+
+from app.config.config import logger
+
+READY_TIMEOUT_SECONDS = 300
+MIN_WORKER_LIFETIME_SECONDS = 10
+RESPAWN_BASE_DELAY_SECONDS = 0.5
+RESPAWN_MAX_DELAY_SECONDS = 30
+# smaps_rollup fields, reported in MiB
+MEMORY_FIELDS = {"Rss": "rss_mb", "Pss": "pss_mb", "Shared_Clean": "shared_mb", "Shared_Dirty": "shared_mb",
+                 "Private_Clean": "private_mb", "Private_Dirty": "private_mb"}
+
+
+def process_memory(pid: int) -> Dict[str, Optional[float]]:
+    """RSS, PSS, shared and private memory of ``pid`` in MiB (None where /proc is unavailable)."""
+    totals = {name: 0.0 for name in MEMORY_FIELDS.values()}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in MEMORY_FIELDS:
+                    totals[MEMORY_FIELDS[name]] += int(rest.split()[0]) / 1024
+    except (OSError, ValueError):
+        return {name: None for name in totals}
+    return {name: round(value, 1) for name, value in totals.items()}
+
+
+def preload() -> Dict[str, Any]:
+    """Run the app's startup work in this (parent) process. Returns what was shared."""
+    from app.api import main
+    from app.services.embeddings.model import get_embedder, resolve_encoder_kind
+    from app.services.monitoring.startup import startup_timer
+    from app.services.search.backends import NumpyBackend
+    from app.services.search.service import backends_of, get_backend
+    from app.services.storage.document_store import get_store
+
+    main.load_services(verify_model=False)
+    shared: Dict[str, Any] = {"encoder": resolve_encoder_kind(), "model_shared": False, "vector_bytes_mapped": 0}
+    with startup_timer.phase("vector_memmap"):
+        for backend in backends_of(get_backend()):
+            if isinstance(backend, NumpyBackend):
+                shared["vector_bytes_mapped"] += backend.map_matrices(get_store().base_path / "index" / "shared")
+    if shared["encoder"] == "torch":
+        get_embedder()
+        shared["model_shared"] = True
+    main.preloaded = True
+    # Keep the collector from touching (and so copying) every preloaded object in each worker
+    gc.collect()
+    gc.freeze()
+    return shared
+
+
+def respawn_delay(failed_starts: int) -> float:
+    """Seconds to wait before replacing a worker after ``failed_starts`` consecutive failed starts."""
+    if not failed_starts:
+        return 0.0
+    return min(RESPAWN_MAX_DELAY_SECONDS, RESPAWN_BASE_DELAY_SECONDS * 2 ** (failed_starts - 1))
+
+
+class PreforkServer:
+    def __init__(self, app, host: str, port: int, workers: int, log_level: str = "info"):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.log_level = log_level
+        self.started = time.perf_counter()
+        self.children: Dict[int, float] = {}  # pid -> fork time
+        self.ready: Dict[int, float] = {}  # pid -> seconds from fork to ready
+        self.stopping = False
+        self.failed_starts = 0  # consecutive workers that died soon after fork
+        self.respawns: List[float] = []  # when each pending replacement is due
+        self._socket: Optional[socket.socket] = None
+        self._ready_r = self._ready_w = -1
+
+    def _spawn(self):
+        forked_at = time.perf_counter()
+        pid = os.fork()
+        if pid:
+            self.children[pid] = forked_at
+            return
+        code = 1
+        try:
+            self._serve_worker()
+            code = 0
+        except BaseException as e:
+            logger.error(f"Worker {os.getpid()} failed: {e}")
+        finally:
+            os._exit(code)
+
+    def _serve_worker(self):
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        os.close(self._ready_r)
+        ready_w = self._ready_w
+
+        async def notify_ready():
+            # Runs after the app's own startup handler; one short write is atomic on a pipe
+            os.write(ready_w, f"{os.getpid()}\n".encode())
+
+        self.app.router.on_startup.append(notify_ready)
+        config = uvicorn.Config(self.app, log_level=self.log_level, lifespan="on")
+        server = uvicorn.Server(config)
+        server.run(sockets=[self._socket])
+        if not server.started:
+            # uvicorn returns normally when the app's startup fails
+            raise RuntimeError("application startup failed")
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+        self.respawns.clear()
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _read_ready(self, buffer: bytes) -> bytes:
+        buffer += os.read(self._ready_r, 4096)
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            pid = int(line)
+            if pid in self.children:
+                self.ready[pid] = time.perf_counter() - self.children[pid]
+                logger.info(f"Worker {pid} ready {self.ready[pid]:.2f}s after fork")
+        return buffer
+
+    def _reap(self):
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                return
+            if pid == 0:
+                return
+            forked_at = self.children.pop(pid, None)
+            self.ready.pop(pid, None)
+            if self.stopping:
+                continue
+            if forked_at is not None and time.perf_counter() - forked_at < MIN_WORKER_LIFETIME_SECONDS:
+                self.failed_starts += 1
+            else:
+                self.failed_starts = 0
+            delay = respawn_delay(self.failed_starts)
+            logger.warning(f"Worker {pid} exited ({status}); starting a replacement in {delay:.1f}s")
+            self.respawns.append(time.perf_counter() + delay)
+
+    def _respawn_due(self):
+        now = time.perf_counter()
+        due = [at for at in self.respawns if at <= now]
+        self.respawns = [at for at in self.respawns if at > now]
+        for _ in due:
+            self._spawn()
+
+    def report(self, preload_seconds: float, shared: Dict[str, Any]) -> Dict[str, Any]:
+        from app.services.monitoring.startup import startup_timer
+
+        workers: List[Dict[str, Any]] = [
+            {"pid": pid, "ready_seconds": round(self.ready[pid], 3), **process_memory(pid)}
+            for pid in sorted(self.ready)
+        ]
+        return {
+            "port": self.port,
+            "workers": len(workers),
+            "preload_seconds": round(preload_seconds, 3),
+            "total_boot_seconds": round(time.perf_counter() - self.started, 3),
+            **shared,
+            "parent": {"pid": os.getpid(), **process_memory(os.getpid())},
+            "worker_memory": workers,
+            "phases": startup_timer.report()["phases"],
+        }
+
+    def run(self, preload_seconds: float = 0.0, shared: Optional[Dict[str, Any]] = None,
+            report_path: Optional[Path] = None) -> int:
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((self.host, self.port))
+        # Resolves port 0 to the one the kernel picked
+        self.port = self._socket.getsockname()[1]
+        self._socket.listen(2048)
+        self._socket.set_inheritable(True)
+        self._ready_r, self._ready_w = os.pipe()
+
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGTERM, self._stop)
+        for _ in range(self.workers):
+            self._spawn()
+        logger.info(f"Forked {self.workers} workers on {self.host}:{self.port}")
+
+        reported = False
+        buffer = b""
+        deadline = time.perf_counter() + READY_TIMEOUT_SECONDS
+        while self.children or self.respawns:
+            readable, _, _ = select.select([self._ready_r], [], [], 0.5)
+            if readable:
+                buffer = self._read_ready(buffer)
+            self._reap()
+            self._respawn_due()
+            if not reported and (len(self.ready) == self.workers or time.perf_counter() > deadline):
+                reported = True
+                boot = self.report(preload_seconds, shared or {})
+                logger.info(
+                    f"Pre-fork boot: {boot['workers']}/{self.workers} workers ready in "
+                    f"{boot['total_boot_seconds']:.2f}s (preload {boot['preload_seconds']:.2f}s)"
+                )
+                for worker in boot["worker_memory"]:
+                    logger.info(
+                        f"  worker {worker['pid']}: ready {worker['ready_seconds']:.2f}s, "
+                        f"rss {worker['rss_mb']} MiB, pss {worker['pss_mb']} MiB, private {worker['private_mb']} MiB"
+                    )
+                if report_path is not None:
+                    report_path.write_text(json.dumps(boot, indent=2))
+        self._socket.close()
+        return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the API from pre-forked workers sharing one loaded model and index.")
+    parser.add_argument("--host", default=os.environ.get("API_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("API_PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--report", type=Path, help="Write the boot/memory report here as JSON")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    shared = preload()
+    from app.api.main import app
+
+    preload_seconds = time.perf_counter() - start
+    logger.info(
+        f"Preloaded in {preload_seconds:.2f}s: {shared['vector_bytes_mapped'] / 2**20:.1f} MiB of vectors mapped, "
+        f"{'shared' if shared['model_shared'] else 'per-worker'} {shared['encoder']} encoder"
+    )
+    server = PreforkServer(app, args.host, args.port, args.workers, args.log_level)
+    server.started = start
+    return server.run(preload_seconds, shared, args.report)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
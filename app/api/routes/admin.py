@@ -0,0 +1,47 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from app.config.config import logger
+from app.services.monitoring import profiling
+
+def require_admin(request: Request):
+    """Reject the request unless admin is enabled and the token matches."""
+    if not profiling.admin_enabled():
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not profiling.is_admin(request.headers):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/profiles")
+async def list_profiles():
+    """Recently captured request profiles (most recent last)."""
+    return {"profiles": profiling.list_profiles()}
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """Top frames of a captured request profile."""
+    profile = profiling.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"No profile {profile_id}")
+    return profile
+
+@router.post("/memory/snapshot")
+async def memory_snapshot(top: int = 20):
+    """Take a tracemalloc snapshot (starting tracing on first use)."""
+    summary = profiling.take_snapshot(top=top)
+    logger.info(f"Took memory snapshot {summary['id']}: {summary['total_bytes']} bytes traced")
+    return summary
+
+@router.get("/memory/diff")
+async def memory_diff(base: str, target: Optional[str] = None, top: int = 20):
+    """Memory growth between two snapshots, or between ``base`` and now."""
+    try:
+        return profiling.diff_snapshots(base, target, top=top)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"No snapshot {e}")
+
+@router.post("/memory/stop")
+async def memory_stop():
+    """Stop tracemalloc so tracing stops costing anything."""
+    profiling.stop_tracing()
+    return {"status": "stopped"}
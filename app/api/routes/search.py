@@ -1,93 +1,511 @@
 import os
 import glob
 import json
-from fastapi import APIRouter, HTTPException
+import time
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sentence_transformers import SentenceTransformer
 import numpy as np
 from typing import List, Optional
 from app.services.storage.document_store import get_store
+from app.services.storage.fragments import dumps, results_body, splice
+from app.services.storage.episode_jsonl import iter_snapshot
+from app.services.search.service import get_backend, iter_search, search_batch, search_episodes as vector_search
+from app.services.search.suggest import KINDS as SUGGEST_KINDS, get_suggest_index
+from app.services.search.entities import ROLES as ENTITY_ROLES, EntityTerm, get_entity_index
+from app.services.search.result_cache import get_result_cache
+from app.services.search.quotes import MODES as QUOTE_MODES, get_quote_index
+from app.services.search.snippets import DOCUMENT_FIELDS, SNIPPET, parse_fields, project
+from app.services.embeddings.model import get_embedder
+from app.services.monitoring.profiling import profile_request
+from app.services.monitoring.admission import POOLS as ADMISSION_POOLS, get_admission_controller
+from app.services.monitoring.metrics import (
+    SEARCH_LATENCY_SECONDS,
+    SEARCH_REQUESTS,
+    SEARCH_STAGE_SECONDS,
+    result_count_bucket,
+)
 from app.config.config import logger
 from redis import Redis
 
 # --- Data Loading ---
 CONTENT_DIR = "app/content"
-MODEL_NAME = "all-MiniLM-L6-v2"
+
+def _has_season_1(path: str) -> bool:
+    if path.endswith(".jsonl"):
+        # Stream records; stops at the first season 1 episode
+        return any(season == "season_1" for season, _, _ in iter_snapshot(path))
+    with open(path, "r") as file:
+        return "season_1" in json.load(file)
 
 # Find the latest season 1 data file
 def get_latest_data_file():
-    files = sorted(glob.glob(os.path.join(CONTENT_DIR, "buffy_all_seasons_*.json")), reverse=True)
+    files = glob.glob(os.path.join(CONTENT_DIR, "buffy_all_seasons_*.json"))
+    files += glob.glob(os.path.join(CONTENT_DIR, "buffy_all_seasons_*.jsonl"))
+    files.sort(key=lambda p: os.path.splitext(os.path.basename(p))[0], reverse=True)
     for f in files:
-        with open(f, "r") as file:
-            data = json.load(file)
-            if "season_1" in data:
-                return f
+        if _has_season_1(f):
+            return f
     raise FileNotFoundError("No season 1 data file found.")
 
-# Load data and model at startup
-DATA_FILE = get_latest_data_file()
-with open(DATA_FILE, "r") as f:
-    DATA = json.load(f)["season_1"]
+def load_season_1(path: str) -> dict:
+    if path.endswith(".jsonl"):
+        return {ep: data for season, ep, data in iter_snapshot(path) if season == "season_1"}
+    with open(path, "r") as f:
+        return json.load(f)["season_1"]
+
+# Data and model are loaded on first access (e.g. `search.DATA`), not at import
+_lazy: dict = {}
 
-MODEL = SentenceTransformer(MODEL_NAME)
+def __getattr__(name):
+    if name == "DATA_FILE":
+        if name not in _lazy:
+            _lazy[name] = get_latest_data_file()
+        return _lazy[name]
+    if name == "DATA":
+        if name not in _lazy:
+            _lazy[name] = load_season_1(__getattr__("DATA_FILE"))
+        return _lazy[name]
+    if name == "MODEL":
+        return get_embedder()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # --- API Schema ---
 class SearchRequest(BaseModel):
     query: str
     top_k: int = 3
+    seasons: Optional[List[int]] = None
+    # Only episodes where all of these characters/cast appear (entity index prefilter)
+    entities: Optional[List[str]] = None
+    # Only these of title, airdate, summary, synopsis, quotes, trivia, snippet (default: all but snippet)
+    fields: Optional[List[str]] = None
+
+class BatchQuery(BaseModel):
+    query: str
+    # Defaults to the request's top_k
+    top_k: Optional[int] = None
+    seasons: Optional[List[int]] = None
+    entities: Optional[List[str]] = None
+
+class BatchSearchRequest(BaseModel):
+    queries: List[BatchQuery]
+    top_k: int = 3
+    fields: Optional[List[str]] = None
+
+class Snippet(BaseModel):
+    field: str
+    text: str
+    # [start, end) character offsets of query words in text
+    highlights: List[List[int]]
 
 class SearchResult(BaseModel):
     season_number: int
     episode_number: str
-    title: str
-    airdate: str
-    summary: List[str]
     score: float
+    rank: Optional[int] = None
+    title: Optional[str] = None
+    airdate: Optional[str] = None
+    summary: Optional[List[str]] = None
     synopsis: Optional[List[str]] = None
     quotes: Optional[List[str]] = None
     trivia: Optional[List[str]] = None
+    snippet: Optional[Snippet] = None
 
 class SearchResponse(BaseModel):
     results: List[SearchResult]
 
+class Suggestion(BaseModel):
+    text: str
+    kind: str
+    popularity: float
+    season: Optional[int] = None
+    episode: Optional[str] = None
+
+class SuggestResponse(BaseModel):
+    query: str
+    suggestions: List[Suggestion]
+
+class EntityQueryTerm(BaseModel):
+    name: str
+    role: str = "appears"
+
+class EntityQueryRequest(BaseModel):
+    all_of: List[EntityQueryTerm] = []
+    any_of: List[EntityQueryTerm] = []
+    none_of: List[EntityQueryTerm] = []
+    seasons: Optional[List[int]] = None
+
+class EntityEpisode(BaseModel):
+    season_number: int
+    episode_number: str
+    title: str
+
+class EntityQueryResponse(BaseModel):
+    episodes: List[EntityEpisode]
+    unresolved: List[str]
+
+class QuoteMatch(BaseModel):
+    text: str
+    speaker: Optional[str] = None
+    season: int
+    episode: str
+    title: str
+    score: float
+    match: str
+
+class QuoteResponse(BaseModel):
+    query: str
+    results: List[QuoteMatch]
+
+class SimilarEpisode(BaseModel):
+    season_number: int
+    episode_number: str
+    title: str
+    airdate: str
+    score: float
+
+class SimilarResponse(BaseModel):
+    season_number: int
+    episode_number: str
+    results: List[SimilarEpisode]
+
 # --- Cosine Similarity ---
 def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
 
+# --- Streaming ---
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+MAX_BATCH_QUERIES = 10000
+
+def stream_frame(kind: str, payload: bytes, fmt: str) -> bytes:
+    """One NDJSON line, or one Server-Sent Event named ``kind``."""
+    if fmt == "sse":
+        return b"event: " + kind.encode() + b"\ndata: " + payload + b"\n\n"
+    return payload + b"\n"
+
 # --- Router ---
 router = APIRouter()
 
 @router.post("/search", response_model=SearchResponse)
-def search_episodes(req: SearchRequest):
+def search_episodes(req: SearchRequest, request: Request):
+    start = time.perf_counter()
+    backend_name = "unknown"
     try:
-        store = get_store()
-        results = store.search_episodes(req.query, limit=req.top_k)
-        
-        # Convert results to response format
-        search_results = []
-        for result in results:
-            episode_data = result['data']
-            search_results.append(SearchResult(
-                season_number=result['season'],
-                episode_number=episode_data['episode_number'],
-                title=episode_data['title'],
-                airdate=episode_data['airdate'],
-                summary=episode_data['summary'],
-                score=result['score'],
-                synopsis=episode_data.get('synopsis'),
-                quotes=episode_data.get('quotes'),
-                trivia=episode_data.get('trivia')
-            ))
+        fields = parse_fields(req.fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        backend_name = get_backend().name
+        with profile_request(request, "/api/search") as profile:
+            episodes = None
+            if req.entities:
+                episodes = get_entity_index().query(all_of=[EntityTerm(name) for name in req.entities])
+            if fields is None:
+                results = vector_search(
+                    req.query, limit=req.top_k, seasons=req.seasons, episodes=episodes, fragments=True
+                )
+                # Whole documents: splice each episode's cached JSON with this query's score and rank
+                with SEARCH_STAGE_SECONDS.time(backend=backend_name, stage="serialize"):
+                    body = results_body(
+                        splice(result['fragment'], result['score'], rank)
+                        for rank, result in enumerate(results, 1)
+                    )
+            else:
+                results = vector_search(req.query, limit=req.top_k, seasons=req.seasons, episodes=episodes)
+                with SEARCH_STAGE_SECONDS.time(backend=backend_name, stage="assemble"):
+                    search_results = [
+                        SearchResult(
+                            season_number=result['season'],
+                            episode_number=result['episode'],
+                            score=result['score'],
+                            rank=rank,
+                            **project(result['data'], fields, req.query),
+                        )
+                        for rank, result in enumerate(results, 1)
+                    ]
+                # exclude_unset drops the fields that were not asked for
+                with SEARCH_STAGE_SECONDS.time(backend=backend_name, stage="serialize"):
+                    body = SearchResponse(results=search_results).json(exclude_unset=True)
         
-        return SearchResponse(results=search_results)
+        SEARCH_REQUESTS.inc(endpoint="/api/search", backend=backend_name, status="ok")
+        SEARCH_LATENCY_SECONDS.observe(
+            time.perf_counter() - start,
+            endpoint="/api/search", backend=backend_name, result_count=result_count_bucket(len(results)),
+        )
+        headers = {"X-Profile-Id": profile.id} if profile else None
+        return Response(content=body, media_type="application/json", headers=headers)
         
     except Exception as e:
+        SEARCH_REQUESTS.inc(endpoint="/api/search", backend=backend_name, status="error")
         logger.error(f"Search failed: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Search operation failed: {str(e)}"
         )
 
+@router.post("/search/stream")
+def search_stream(req: SearchRequest, request: Request, format: Optional[str] = None):
+    """``/api/search`` streamed: one frame per result as soon as it is fetched, then a summary.
+
+    ``format`` is ndjson (default) or sse; an ``Accept: text/event-stream``
+    header also selects sse. Frames carry a "type" of result, error or
+    summary; the summary has the count and per-stage milliseconds.
+    """
+    fmt = format or ("sse" if "text/event-stream" in request.headers.get("accept", "") else "ndjson")
+    if fmt not in STREAM_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown format {fmt!r}; choose from ndjson, sse")
+    try:
+        fields = parse_fields(req.fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    episodes = None
+    if req.entities:
+        episodes = get_entity_index().query(all_of=[EntityTerm(name) for name in req.entities])
+    backend_name = get_backend().name
+
+    def frames():
+        start = time.perf_counter()
+        timings = {}
+        count = 0
+        status = "ok"
+        try:
+            hits = iter_search(
+                req.query, limit=req.top_k, seasons=req.seasons, episodes=episodes,
+                fragments=fields is None, timings=timings,
+            )
+            for rank, hit in enumerate(hits, 1):
+                if fields is None:
+                    payload = b'{"type":"result",' + splice(hit['fragment'], hit['score'], rank)[1:]
+                else:
+                    payload = dumps({
+                        "type": "result", "score": float(hit['score']), "rank": rank,
+                        "season_number": hit['season'], "episode_number": hit['episode'],
+                        **project(hit['data'], fields, req.query),
+                    })
+                count += 1
+                yield stream_frame("result", payload, fmt)
+        except Exception as e:
+            # Headers are already sent; report the failure in-band
+            status = "error"
+            logger.error(f"Streaming search failed: {str(e)}")
+            yield stream_frame("error", dumps({"type": "error", "detail": str(e)}), fmt)
+        took = time.perf_counter() - start
+        yield stream_frame("summary", dumps({
+            "type": "summary",
+            "count": count,
+            "took_ms": round(took * 1000, 3),
+            "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()},
+        }), fmt)
+        SEARCH_REQUESTS.inc(endpoint="/api/search/stream", backend=backend_name, status=status)
+        SEARCH_LATENCY_SECONDS.observe(
+            took, endpoint="/api/search/stream", backend=backend_name, result_count=result_count_bucket(count),
+        )
+
+    # No proxy buffering or caching, so frames reach the client as they are produced
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(frames(), media_type=STREAM_MEDIA_TYPES[fmt], headers=headers)
+
+@router.post("/search/batch")
+def search_batch_endpoint(req: BatchSearchRequest, format: str = "ndjson"):
+    """Many searches in one call, for evaluation and bulk tagging jobs.
+
+    Queries are encoded in batches and scored with one matrix product per
+    batch. One frame per query is streamed back in input order
+    (``{"type": "result", "index": i, "query": ..., "results": [...]}``),
+    then a summary frame.
+    """
+    if format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown format {format!r}; choose from ndjson, sse")
+    if len(req.queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_QUERIES} queries per batch")
+    try:
+        fields = parse_fields(req.fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    limits = [q.top_k or req.top_k for q in req.queries]
+    episodes = None
+    if any(q.entities for q in req.queries):
+        index = get_entity_index()
+        episodes = [
+            index.query(all_of=[EntityTerm(name) for name in q.entities]) if q.entities else None
+            for q in req.queries
+        ]
+    backend_name = get_backend().name
+
+    def frames():
+        start = time.perf_counter()
+        count = 0
+        status = "ok"
+        try:
+            batches = search_batch(
+                [q.query for q in req.queries],
+                limit=max(limits, default=0),
+                seasons=[q.seasons for q in req.queries],
+                episodes=episodes,
+                fragments=fields is None,
+            )
+            for i, (q, results) in enumerate(zip(req.queries, batches)):
+                results = results[:limits[i]]
+                if fields is None:
+                    parts = [splice(r['fragment'], r['score'], rank) for rank, r in enumerate(results, 1)]
+                else:
+                    parts = [
+                        dumps({
+                            "score": float(r['score']), "rank": rank,
+                            "season_number": r['season'], "episode_number": r['episode'],
+                            **project(r['data'], fields, q.query),
+                        })
+                        for rank, r in enumerate(results, 1)
+                    ]
+                payload = (
+                    b'{"type":"result","index":' + str(i).encode() + b',"query":' + dumps(q.query)
+                    + b',"results":[' + b",".join(parts) + b"]}"
+                )
+                count += 1
+                yield stream_frame("result", payload, format)
+        except Exception as e:
+            status = "error"
+            logger.error(f"Batch search failed after {count} queries: {str(e)}")
+            yield stream_frame("error", dumps({"type": "error", "index": count, "detail": str(e)}), format)
+        took = time.perf_counter() - start
+        yield stream_frame("summary", dumps({
+            "type": "summary",
+            "count": count,
+            "took_ms": round(took * 1000, 3),
+            "queries_per_second": round(count / took, 1) if took else None,
+        }), format)
+        SEARCH_REQUESTS.inc(endpoint="/api/search/batch", backend=backend_name, status=status)
+        SEARCH_LATENCY_SECONDS.observe(
+            took, endpoint="/api/search/batch", backend=backend_name, result_count=result_count_bucket(count),
+        )
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(frames(), media_type=STREAM_MEDIA_TYPES[format], headers=headers)
+
+@router.get("/suggest", response_model=SuggestResponse)
+def suggest(q: str = "", limit: int = Query(8, ge=1, le=20), kinds: Optional[str] = None):
+    """Typeahead over titles, cast and quote openings; no model involved.
+
+    ``kinds`` is a comma-separated subset of title, character, actor, quote.
+    """
+    kind_set = None
+    if kinds:
+        kind_set = {k.strip() for k in kinds.split(",") if k.strip()}
+        unknown = kind_set - set(SUGGEST_KINDS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown kinds: {', '.join(sorted(unknown))}")
+    suggestions = get_suggest_index().suggest(q, limit=limit, kinds=kind_set)
+    # Serialized by hand: response_model validation would cost more than the lookup
+    body = json.dumps({"query": q, "suggestions": [s.to_dict() for s in suggestions]})
+    return Response(content=body, media_type="application/json")
+
+@router.get("/entities/{name}")
+def entity_episodes(name: str):
+    """Every role a character or cast member has, with the episodes for each."""
+    index = get_entity_index()
+    entity = index.resolve(name)
+    if entity is None:
+        raise HTTPException(status_code=404, detail=f"Unknown character or cast member: {name}")
+    return {
+        "entity": index.display.get(entity, name),
+        "id": entity,
+        "roles": {
+            role: [{"season_number": s, "episode_number": e, "title": index.title((s, e))} for s, e in keys]
+            for role, keys in index.roles(name).items()
+        },
+    }
+
+@router.post("/entities/query", response_model=EntityQueryResponse)
+def entity_query(req: EntityQueryRequest):
+    """Episodes by cast/character: all_of AND (any_of OR ...) AND NOT none_of.
+
+    Roles: cast, guest, recurring, first_appearance, last_appearance,
+    introduced, mentioned, died, appears (any on-screen role) and any.
+    """
+    index = get_entity_index()
+    terms = req.all_of + req.any_of + req.none_of
+    bad_roles = sorted({t.role for t in terms} - set(ENTITY_ROLES))
+    if bad_roles:
+        raise HTTPException(status_code=400, detail=f"Unknown roles: {', '.join(bad_roles)}")
+
+    def convert(items: List[EntityQueryTerm]) -> List[EntityTerm]:
+        return [EntityTerm(t.name, t.role) for t in items]
+
+    keys = index.query(convert(req.all_of), convert(req.any_of), convert(req.none_of), seasons=req.seasons)
+    return EntityQueryResponse(
+        episodes=[EntityEpisode(season_number=s, episode_number=e, title=index.title((s, e))) for s, e in keys],
+        unresolved=[t.name for t in terms if index.resolve(t.name) is None],
+    )
+
+@router.get("/quotes", response_model=QuoteResponse)
+def quote_search(
+    q: str,
+    mode: str = "auto",
+    limit: int = Query(10, ge=1, le=50),
+    speaker: Optional[str] = None,
+):
+    """Individual quote lines with speaker and episode.
+
+    ``mode`` is exact, fuzzy, semantic or auto (the first of those that
+    finds anything). "who said ..." questions are answered with the line.
+    """
+    if mode not in QUOTE_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown mode {mode!r}; choose from {', '.join(QUOTE_MODES)}")
+    start = time.perf_counter()
+    hits = get_quote_index().search(q, mode=mode, limit=limit, speaker=speaker)
+    SEARCH_REQUESTS.inc(endpoint="/api/quotes", backend="quotes", status="ok")
+    SEARCH_LATENCY_SECONDS.observe(
+        time.perf_counter() - start,
+        endpoint="/api/quotes", backend="quotes", result_count=result_count_bucket(len(hits)),
+    )
+    body = json.dumps({"query": q, "results": [hit.to_dict() for hit in hits]})
+    return Response(content=body, media_type="application/json")
+
+@router.get("/episodes/{season}/{episode}")
+def get_episode(season: int, episode: str, fields: Optional[str] = None, q: Optional[str] = None):
+    """One episode's public fields (no embeddings), for results fetched with ``fields=``.
+
+    ``fields`` is comma-separated; ``snippet`` needs ``q``.
+    """
+    try:
+        field_list = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    data = get_store().get_episode(season, episode, with_embeddings=False)
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"No episode {episode} in season {season}")
+    if field_list is None:
+        field_list = DOCUMENT_FIELDS + ((SNIPPET,) if q else ())
+    return {"season_number": season, "episode_number": episode, **project(data, field_list, q or "")}
+
+@router.get("/episodes/{season}/{episode}/similar", response_model=SimilarResponse)
+def similar_episodes(season: int, episode: str, limit: int = Query(10, ge=1, le=50)):
+    """Episodes most like this one, from the precomputed similarity graph (no encode, no scan)."""
+    start = time.perf_counter()
+    results = get_store().similar_episodes(season, episode, limit=limit)
+    if results is None:
+        SEARCH_REQUESTS.inc(endpoint="/api/episodes/similar", backend="graph", status="not_found")
+        raise HTTPException(status_code=404, detail=f"No similarity entry for season {season} episode {episode}")
+    SEARCH_REQUESTS.inc(endpoint="/api/episodes/similar", backend="graph", status="ok")
+    SEARCH_LATENCY_SECONDS.observe(
+        time.perf_counter() - start,
+        endpoint="/api/episodes/similar", backend="graph", result_count=result_count_bucket(len(results)),
+    )
+    return SimilarResponse(
+        season_number=season,
+        episode_number=episode,
+        results=[
+            SimilarEpisode(
+                season_number=r['season'],
+                episode_number=r['episode'],
+                title=r['data']['title'],
+                airdate=r['data']['airdate'],
+                score=r['score'],
+            )
+            for r in results
+        ],
+    )
+
 @router.get("/test")
 async def test_system():
     """Test endpoint to verify system state."""
@@ -125,6 +543,14 @@ async def test_system():
                     }
                     break
         
+        try:
+            backend_info = get_backend().stats()
+        except Exception as e:
+            backend_info = {"error": str(e)}
+        cache = get_result_cache()
+        backend_info["result_cache"] = cache.stats() if cache else None
+        backend_info["admission"] = [get_admission_controller(pool).snapshot() for pool in ADMISSION_POOLS]
+
         # Test a simple search
         test_query = "Buffy fights vampires"
         search_results = store.search_episodes(test_query, limit=1)
@@ -133,6 +559,7 @@ async def test_system():
             "status": "healthy",
             "redis": redis_info,
             "store": store_info,
+            "vector_backend": backend_info,
             "test_search": {
                 "query": test_query,
                 "results": search_results
@@ -1,5 +1,6 @@
 import logging.config
 import json
+from app.services.monitoring.startup import startup_timer
 
 K_RESULTS = 3
 
@@ -14,7 +15,8 @@ def load_logging_config():
 
 
 def get_logger(name: str = "my_app"):
-    load_logging_config()
+    with startup_timer.phase("logging_config"):
+        load_logging_config()
     return logging.getLogger(name)
 
 
@@ -1,11 +1,16 @@
-import numpy as np
 import json
 import redis
 from app.config.config import logger, K_RESULTS
-
-from sentence_transformers import SentenceTransformer
+from app.services.embeddings.batch import embed_texts
+from app.services.embeddings.model import get_embedder
+from app.services.monitoring.metrics import (
+    INGEST_EPISODES,
+    INGEST_STAGE_SECONDS,
+    SEARCH_STAGE_SECONDS,
+)
 
 from redis.commands.search.field import (
+    NumericField,
     TextField,
     VectorField,
 )
@@ -17,9 +22,18 @@ REDIS_HOST = "localhost"
 REDIS_PORT = 6379
 CONTENT_PATH = "app/content/buffy_data.json"
 VECTOR_DIMENSION = 384  # all-MiniLM-L6-v2 uses 384 dimensions
+INDEX_NAME = "idx:buffy_vss"
+KEY_PREFIX = "buffy:"
+REDIS_SOCKET_TIMEOUT = 0.5  # seconds; used by the search backend so a stuck Redis fails fast
 
 client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
-embedder = SentenceTransformer("all-MiniLM-L6-v2")  # Fast, good for dialogue, small memory footprint
+
+
+def __getattr__(name):
+    # `embed.embedder` is loaded on first access rather than at import time
+    if name == "embedder":
+        return get_embedder()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def load_content(file_path):
@@ -34,55 +48,61 @@ Pipeline is tailored to this particular content.
 
 def create_pipeline(buffy_json):
     pipeline = client.pipeline()
-    key_prefix = "buffy:"
+    key_prefix = KEY_PREFIX
 
+    episodes = []
     for season_label, season_data in buffy_json.items():
         season_num = int(season_label.split('_')[1])
-        key_full = f"{key_prefix}s{season_num:02}"  # 'buffy:s03'
-
-        # Process each episode in the season
         for episode_num, episode_data in season_data.items():
-            episode_key = f"{key_full}:e{episode_num}"  # 'buffy:s03:e01'
-            
-            # Get episode content
-            synopsis = " ".join(episode_data.get("episode_synopsis", []))
-            summary = " ".join(episode_data.get("episode_summary", []))
-
-            # Generate embeddings
-            synopsis_embedding = embedder.encode(synopsis).astype(np.float32).tolist() if synopsis else None
-            summary_embedding = embedder.encode(summary).astype(np.float32).tolist() if summary else None
-
-            obj = {
-                "synopsis": synopsis,
-                "summary": summary,
-                "synopsis_embedding": synopsis_embedding,
-                "summary_embedding": summary_embedding,
-                "metadata": {
-                    "season": season_num,
-                    "episode": episode_num,
-                    "title": episode_data.get("episode_title"),
-                    "airdate": episode_data.get("episode_airdate")
-                }
+            episodes.append((season_num, episode_num, episode_data))
+
+    # Embed every summary and synopsis in length-sorted batches
+    texts = []
+    for i, (_, _, episode_data) in enumerate(episodes):
+        texts.append(((i, "synopsis"), " ".join(episode_data.get("episode_synopsis") or [])))
+        texts.append(((i, "summary"), " ".join(episode_data.get("episode_summary") or [])))
+    vectors = dict(embed_texts(texts, source="redis_ingest"))
+
+    for i, (season_num, episode_num, episode_data) in enumerate(episodes):
+        episode_key = f"{key_prefix}s{season_num:02}:e{episode_num}"  # 'buffy:s03:e01'
+        synopsis_embedding = vectors[(i, "synopsis")]
+        summary_embedding = vectors[(i, "summary")]
+
+        obj = {
+            "synopsis": " ".join(episode_data.get("episode_synopsis") or []),
+            "summary": " ".join(episode_data.get("episode_summary") or []),
+            "synopsis_embedding": synopsis_embedding.tolist() if synopsis_embedding is not None else None,
+            "summary_embedding": summary_embedding.tolist() if summary_embedding is not None else None,
+            "metadata": {
+                "season": season_num,
+                "episode": episode_num,
+                "title": episode_data.get("episode_title"),
+                "airdate": episode_data.get("episode_airdate")
             }
+        }
 
-            pipeline.json().set(episode_key, "$", obj)
+        pipeline.json().set(episode_key, "$", obj)
+        INGEST_EPISODES.inc(source="redis_ingest")
 
     return pipeline
 
 
 def execute_pipeline(pipeline):
     try:
-        res = pipeline.execute()
+        with INGEST_STAGE_SECONDS.time(source="redis_ingest", stage="pipeline_execute"):
+            res = pipeline.execute()
         logger.info(f"Pipeline successfully executed: {res}")
     except Exception as e:
         logger.info(f"Error executing pipeline: {e}")
     # TODO return execution result
 
 
-def create_index():
-    schema = (
+def index_schema():
+    """Fields of the episode index; ``season`` allows filtered KNN queries."""
+    return (
         TextField("$.synopsis", no_stem=False, as_name="synopsis"),
         TextField("$.summary", no_stem=False, as_name="summary"),
+        NumericField("$.metadata.season", as_name="season"),
         VectorField(
             "$.synopsis_embedding",
             "FLAT",
@@ -105,11 +125,15 @@ def create_index():
         ),
     )
 
-    definition = IndexDefinition(prefix=["buffy:"], index_type=IndexType.JSON)
+
+def create_index():
+    schema = index_schema()
+    definition = IndexDefinition(prefix=[KEY_PREFIX], index_type=IndexType.JSON)
     try:
-        client.ft("idx:buffy_vss").create_index(fields=schema, definition=definition)
+        with INGEST_STAGE_SECONDS.time(source="redis_ingest", stage="index_build"):
+            client.ft(INDEX_NAME).create_index(fields=schema, definition=definition)
 
-        index_info = client.ft("idx:buffy_vss").info()
+        index_info = client.ft(INDEX_NAME).info()
 
         index_name = index_info.get("index_name", "N/A")
         duration = index_info.get("total_indexing_time", "N/A")
@@ -136,7 +160,8 @@ def fetch_search_results(query_text: str = "", k: int = None) -> list[str]:
         logger.warn("Empty query text submitted.")
         return []
 
-    query_text_embedding = embedder.encode(query_text)
+    with SEARCH_STAGE_SECONDS.time(backend="redis", stage="encode"):
+        query_text_embedding = get_embedder().encode(query_text)
 
     redis_query = (
         Query("(*)=>[KNN 3 @summary_embedding $query_vector AS vector_score]")
@@ -145,22 +170,24 @@ def fetch_search_results(query_text: str = "", k: int = None) -> list[str]:
         .dialect(2)
     )
 
-    query_result = (
-        client.ft("idx:buffy_vss")
-        .search(redis_query, {"query_vector": query_text_embedding.tobytes()})
-        .docs
-    )
-
-    res = []
-    for document in query_result:
-        res.append(
-            {
-                prop: document[prop]
-                for prop in ["id", "vector_score", "summary", "synopsis"]
-            }
+    with SEARCH_STAGE_SECONDS.time(backend="redis", stage="knn"):
+        query_result = (
+            client.ft(INDEX_NAME)
+            .search(redis_query, {"query_vector": query_text_embedding.tobytes()})
+            .docs
         )
 
-    return sorted(res, key=lambda x: x["vector_score"])
+    with SEARCH_STAGE_SECONDS.time(backend="redis", stage="assemble"):
+        res = []
+        for document in query_result:
+            res.append(
+                {
+                    prop: document[prop]
+                    for prop in ["id", "vector_score", "summary", "synopsis"]
+                }
+            )
+
+        return sorted(res, key=lambda x: x["vector_score"])
 
 
 def main_new():
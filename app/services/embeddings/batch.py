@@ -0,0 +1,163 @@
+"""Bulk text embedding for ingest and re-embedding.
+
+Encoding texts one ``encode`` call at a time pays the per-call overhead for
+each text and pads nothing, but batching naively pads every text to the
+longest in its batch. ``embed_texts`` reads the input in windows, sorts each
+window by token length so batches hold texts of similar length, encodes in
+batches, and yields the results back in input order. Token counts come from
+the encoder's own tokenizer when it has one.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.embeddings.model import get_embedder
+from app.services.monitoring.metrics import INGEST_STAGE_SECONDS, INGEST_TOKENS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 64
+# Texts sorted together; larger windows pad less but hold more results in memory
+DEFAULT_WINDOW = 2048
+
+# Crawl-layout text field -> embedding field
+CRAWL_EMBEDDING_FIELDS = (
+    ("episode_summary", "summary_embedding"),
+    ("episode_synopsis", "synopsis_embedding"),
+    ("episode_quotes", "quotes_embedding"),
+)
+# Same for EpisodeDocument / document store records
+STORE_EMBEDDING_FIELDS = (
+    ("summary", "summary_embedding"),
+    ("synopsis", "synopsis_embedding"),
+    ("quotes", "quotes_embedding"),
+)
+
+
+@dataclass
+class EmbeddingStats:
+    texts: int = 0
+    batches: int = 0
+    tokens: int = 0
+    # Tokens actually run through the model, padding included
+    padded_tokens: int = 0
+    seconds: float = 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.tokens / self.seconds if self.seconds else 0.0
+
+    @property
+    def padding_ratio(self) -> float:
+        """Share of model input that was padding."""
+        return 1 - self.tokens / self.padded_tokens if self.padded_tokens else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.texts} texts in {self.batches} batches, {self.seconds:.2f}s, "
+            f"{self.tokens_per_second:.0f} tokens/s, {self.padding_ratio:.1%} padding"
+        )
+
+
+def token_lengths(encoder, texts: List[str]) -> List[int]:
+    """Token counts (with special tokens, truncated like the model) for each text.
+
+    Falls back to a word count for encoders without a tokenizer.
+    """
+    max_length = getattr(encoder, "max_seq_length", None) or 512
+    tokenizer = getattr(encoder, "tokenizer", None)
+    if tokenizer is not None and hasattr(tokenizer, "encode_batch"):
+        # tokenizers.Tokenizer (OnnxEncoder); padding may be enabled, so count the mask
+        lengths = [sum(e.attention_mask) for e in tokenizer.encode_batch(texts)]
+    elif tokenizer is not None:
+        # transformers tokenizer (SentenceTransformer)
+        lengths = [len(ids) for ids in tokenizer(texts, add_special_tokens=True)["input_ids"]]
+    else:
+        lengths = [len(t.split()) + 2 for t in texts]
+    return [min(n, max_length) for n in lengths]
+
+
+def embed_texts(
+    items: Iterable[Tuple[Hashable, str]],
+    encoder=None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    window: int = DEFAULT_WINDOW,
+    source: str = "batch",
+    stats: Optional[EmbeddingStats] = None,
+) -> Iterator[Tuple[Hashable, Optional[np.ndarray]]]:
+    """Embed (id, text) pairs, yielding (id, vector) in input order.
+
+    Empty texts yield ``None`` without touching the model. Pass an
+    ``EmbeddingStats`` to collect throughput figures; they are also logged.
+    """
+    encoder = encoder or get_embedder()
+    stats = stats if stats is not None else EmbeddingStats()
+    pending: List[Tuple[Hashable, str]] = []
+
+    def flush() -> Iterator[Tuple[Hashable, Optional[np.ndarray]]]:
+        texts = [text for _, text in pending]
+        results: List[Optional[np.ndarray]] = [None] * len(pending)
+        todo = [i for i, text in enumerate(texts) if text and text.strip()]
+        if todo:
+            lengths = token_lengths(encoder, [texts[i] for i in todo])
+            order = [todo[j] for j in np.argsort(lengths, kind="stable")]
+            length_of = dict(zip(todo, lengths))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                began = time.perf_counter()
+                with INGEST_STAGE_SECONDS.time(source=source, stage="encode"):
+                    vectors = encoder.encode([texts[i] for i in batch], batch_size=len(batch))
+                stats.seconds += time.perf_counter() - began
+                batch_lengths = [length_of[i] for i in batch]
+                stats.batches += 1
+                stats.tokens += sum(batch_lengths)
+                stats.padded_tokens += max(batch_lengths) * len(batch)
+                for i, vector in zip(batch, vectors):
+                    results[i] = np.asarray(vector, dtype=np.float32)
+            INGEST_TOKENS.inc(sum(lengths), source=source)
+        stats.texts += len(pending)
+        for (item_id, _), vector in zip(pending, results):
+            yield item_id, vector
+        pending.clear()
+
+    for item in items:
+        pending.append(item)
+        if len(pending) >= window:
+            yield from flush()
+    if pending:
+        yield from flush()
+    if stats.texts:
+        logger.info(f"Embedded ({source}): {stats.summary()}")
+
+
+def as_text(value: Any) -> str:
+    """Join a list of paragraphs; pass strings through; None becomes ""."""
+    if isinstance(value, list):
+        return " ".join(value)
+    return value or ""
+
+
+def embed_episodes(
+    episodes: Iterable[Dict[str, Any]],
+    fields: Tuple[Tuple[str, str], ...] = CRAWL_EMBEDDING_FIELDS,
+    source: str = "batch",
+    **kwargs,
+) -> EmbeddingStats:
+    """Fill in the embedding fields of episode dicts in place.
+
+    ``fields`` maps text fields to embedding fields. An episode without text
+    for a field gets ``None`` there.
+    """
+    episodes = list(episodes)
+    items = (
+        ((i, embedding_field), as_text(episode.get(text_field)))
+        for i, episode in enumerate(episodes)
+        for text_field, embedding_field in fields
+    )
+    stats = EmbeddingStats()
+    for (i, embedding_field), vector in embed_texts(items, source=source, stats=stats, **kwargs):
+        episodes[i][embedding_field] = vector.tolist() if vector is not None else None
+    return stats
@@ -0,0 +1,106 @@
+"""Export the MiniLM transformer to ONNX and quantize it to int8.
+
+This is an offline build step and the only place that needs torch:
+
+    python -m app.services.embeddings.export_onnx            # fp32 + int8
+    python -m app.services.embeddings.export_onnx --verify   # also check parity
+
+The graph outputs per-token embeddings; pooling and normalization are done
+by OnnxEncoder from the vendored sentence-transformers configs. Dynamic
+quantization stores the MatMul weights as int8 and keeps activations in
+float, so no calibration data is needed.
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from app.services.embeddings.model import MODEL_NAME
+from app.services.embeddings.onnx_encoder import MODEL_DIR, ONNX_FILE, ONNX_INT8_FILE
+
+OPSET = 14
+PARITY_SENTENCES = [
+    "Buffy fights the Master beneath Sunnydale High.",
+    "Willow and Tara perform a spell together.",
+    "Giles researches a prophecy in the library while Xander makes jokes.",
+    "Spike returns to Sunnydale looking for a cure.",
+    "",
+]
+
+
+def export(model_dir: Path = MODEL_DIR, quantize: bool = True) -> List[Path]:
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    transformer = SentenceTransformer(MODEL_NAME)[0]
+    model = transformer.auto_model.eval()
+    tokenizer = transformer.tokenizer
+
+    out = model_dir / ONNX_FILE
+    out.parent.mkdir(parents=True, exist_ok=True)
+    sample = tokenizer(["a sample sentence", "another one"], padding=True, return_tensors="pt")
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    dynamic = {"batch": 0, "tokens": 1}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[n] for n in names),
+            str(out),
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={name: dynamic for name in names + ["last_hidden_state"]},
+            opset_version=OPSET,
+        )
+    written = [out]
+    print(f"Wrote {out} ({out.stat().st_size / 1e6:.1f} MB)")
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantized = model_dir / ONNX_INT8_FILE
+        quantize_dynamic(str(out), str(quantized), weight_type=QuantType.QInt8)
+        written.append(quantized)
+        print(f"Wrote {quantized} ({quantized.stat().st_size / 1e6:.1f} MB)")
+    return written
+
+
+def parity(model_dir: Path = MODEL_DIR, sentences: Optional[List[str]] = None) -> dict:
+    """Minimum cosine similarity of each ONNX variant against SentenceTransformer."""
+    from sentence_transformers import SentenceTransformer
+    from app.services.embeddings.onnx_encoder import OnnxEncoder
+
+    sentences = sentences or PARITY_SENTENCES
+    reference = SentenceTransformer(MODEL_NAME).encode(sentences, normalize_embeddings=True)
+    result = {}
+    for quantized in (False, True):
+        if not (model_dir / (ONNX_INT8_FILE if quantized else ONNX_FILE)).exists():
+            continue
+        encoder = OnnxEncoder(model_dir, quantized=quantized)
+        candidate = encoder.encode(sentences)
+        cosines = np.sum(reference * candidate, axis=1) / (
+            np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+        )
+        result["onnx-int8" if quantized else "onnx"] = float(cosines.min())
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export MiniLM to ONNX (fp32 and int8).")
+    parser.add_argument("--model-dir", default=str(MODEL_DIR))
+    parser.add_argument("--no-quantize", action="store_true")
+    parser.add_argument("--verify", action="store_true", help="Check cosine parity with PyTorch")
+    args = parser.parse_args(argv)
+
+    model_dir = Path(args.model_dir)
+    export(model_dir, quantize=not args.no_quantize)
+    if args.verify:
+        for name, cosine in parity(model_dir).items():
+            status = "ok" if cosine >= 0.99 else "BELOW 0.99"
+            print(f"{name}: min cosine vs torch {cosine:.5f} {status}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Shared, lazily loaded sentence embedding model.
+
+Loading the model is the most expensive part of boot, so it happens on
+first use and is shared by the API, the document store and the ingest
+scripts instead of each building its own instance.
+
+``TVSHOWCHAT_ENCODER`` picks the implementation:
+
+* ``auto`` (default): the int8 ONNX graph if exported, else the fp32 one,
+  else PyTorch.
+* ``onnx-int8`` / ``onnx``: ONNX Runtime (see onnx_encoder); torch is never imported.
+* ``torch``: sentence_transformers.SentenceTransformer.
+"""
+import logging
+import os
+import threading
+from typing import Optional
+
+from app.services.monitoring.startup import startup_timer
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "all-MiniLM-L6-v2"  # Fast, good for dialogue, small memory footprint
+ENCODER_ENV = "TVSHOWCHAT_ENCODER"
+ENCODER_CHOICES = ("auto", "onnx-int8", "onnx", "torch")
+
+_embedder = None
+_encoder_kind: Optional[str] = None
+_lock = threading.Lock()
+
+
+def resolve_encoder_kind(kind: Optional[str] = None) -> str:
+    """Turn ``auto`` (or the env setting) into a concrete encoder kind."""
+    from app.services.embeddings.onnx_encoder import MODEL_DIR, ONNX_FILE, ONNX_INT8_FILE
+
+    kind = (kind or os.environ.get(ENCODER_ENV) or "auto").lower()
+    if kind not in ENCODER_CHOICES:
+        raise ValueError(f"Unknown encoder {kind!r}; choose from {', '.join(ENCODER_CHOICES)}")
+    if kind != "auto":
+        return kind
+    if (MODEL_DIR / ONNX_INT8_FILE).exists():
+        return "onnx-int8"
+    if (MODEL_DIR / ONNX_FILE).exists():
+        return "onnx"
+    return "torch"
+
+
+def load_encoder(kind: Optional[str] = None):
+    """Build a new encoder of the given kind (not the shared one)."""
+    kind = resolve_encoder_kind(kind)
+    if kind in ("onnx", "onnx-int8"):
+        from app.services.embeddings.onnx_encoder import OnnxEncoder
+
+        return OnnxEncoder(quantized=kind == "onnx-int8")
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(MODEL_NAME)
+
+
+def get_embedder():
+    """Get the shared encoder, loading it on first call."""
+    global _embedder, _encoder_kind
+    if _embedder is None:
+        with _lock:
+            if _embedder is None:
+                with startup_timer.phase("model_load"):
+                    kind = resolve_encoder_kind()
+                    _embedder = load_encoder(kind)
+                    _encoder_kind = kind
+                logger.info(f"Loaded {kind} encoder for {MODEL_NAME}")
+    return _embedder
+
+
+def encoder_kind() -> Optional[str]:
+    """Which implementation the shared encoder uses, once loaded."""
+    return _encoder_kind
+
+
+def is_loaded() -> bool:
+    return _embedder is not None
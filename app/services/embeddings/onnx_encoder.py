@@ -0,0 +1,146 @@
+"""Sentence encoder backed by ONNX Runtime instead of PyTorch.
+
+Runs the transformer exported by ``export_onnx`` (optionally int8-quantized)
+on CPU, then applies the sentence-transformers pipeline itself: tokenization
+with the vendored ``tokenizer.json``, pooling as configured in
+``1_Pooling/config.json`` and L2 normalization when ``modules.json`` lists a
+Normalize module. Neither torch nor sentence_transformers is imported.
+
+``encode`` accepts the same arguments as ``SentenceTransformer.encode`` that
+this codebase uses, so it is a drop-in replacement behind ``get_embedder``.
+"""
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = Path("app/models/all-MiniLM-L6-v2")
+ONNX_FILE = "onnx/model.onnx"
+ONNX_INT8_FILE = "onnx/model_int8.onnx"
+DEFAULT_BATCH_SIZE = 32
+
+
+def _read_json(path: Path, default: Optional[Dict[str, Any]] = None) -> Any:
+    if not path.exists():
+        return default
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def pool(token_embeddings: np.ndarray, attention_mask: np.ndarray, config: Dict[str, Any]) -> np.ndarray:
+    """sentence-transformers Pooling over (batch, tokens, dim) outputs.
+
+    Several enabled modes are concatenated in the same order as upstream:
+    cls, max, mean, mean_sqrt_len.
+    """
+    mask = attention_mask[..., None].astype(token_embeddings.dtype)
+    parts = []
+    if config.get("pooling_mode_cls_token"):
+        parts.append(token_embeddings[:, 0])
+    if config.get("pooling_mode_max_tokens"):
+        masked = np.where(mask > 0, token_embeddings, -1e9)
+        parts.append(masked.max(axis=1))
+    if config.get("pooling_mode_mean_tokens") or config.get("pooling_mode_mean_sqrt_len_tokens"):
+        summed = (token_embeddings * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        if config.get("pooling_mode_mean_tokens"):
+            parts.append(summed / counts)
+        if config.get("pooling_mode_mean_sqrt_len_tokens"):
+            parts.append(summed / np.sqrt(counts))
+    if not parts:
+        raise ValueError(f"No supported pooling mode enabled in {config}")
+    return np.concatenate(parts, axis=1) if len(parts) > 1 else parts[0]
+
+
+class OnnxEncoder:
+    def __init__(
+        self,
+        model_dir: Union[str, Path] = MODEL_DIR,
+        quantized: bool = True,
+        model_file: Optional[str] = None,
+        session=None,
+        intra_op_threads: Optional[int] = None,
+    ):
+        from tokenizers import Tokenizer
+
+        self.model_dir = Path(model_dir)
+        self.model_file = self.model_dir / (model_file or (ONNX_INT8_FILE if quantized else ONNX_FILE))
+
+        bert_config = _read_json(self.model_dir / "sentence_bert_config.json", {})
+        model_config = _read_json(self.model_dir / "config.json", {})
+        self.max_seq_length = bert_config.get("max_seq_length", 256)
+        self.pooling_config = _read_json(
+            self.model_dir / "1_Pooling" / "config.json", {"pooling_mode_mean_tokens": True}
+        )
+        modules = _read_json(self.model_dir / "modules.json", [])
+        self.normalize = any(m.get("type", "").endswith("Normalize") for m in modules)
+        self.dimension = self.pooling_config.get("word_embedding_dimension") or model_config.get("hidden_size")
+
+        # Pad to the longest sentence in each batch, as SentenceTransformer does
+        self.tokenizer = Tokenizer.from_file(str(self.model_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self.tokenizer.enable_padding(pad_id=model_config.get("pad_token_id", 0), pad_token="[PAD]")
+
+        if session is None:
+            session = self._create_session(intra_op_threads)
+        self.session = session
+        self.input_names = {i.name for i in session.get_inputs()}
+
+    def _create_session(self, intra_op_threads: Optional[int]):
+        import onnxruntime as ort
+
+        if not self.model_file.exists():
+            raise FileNotFoundError(
+                f"{self.model_file} not found; run `python -m app.services.embeddings.export_onnx`"
+            )
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = intra_op_threads or int(os.environ.get("TVSHOWCHAT_ONNX_THREADS", 0))
+        if threads:
+            options.intra_op_num_threads = threads
+        logger.info(f"Loading ONNX encoder {self.model_file}")
+        return ort.InferenceSession(str(self.model_file), options, providers=["CPUExecutionProvider"])
+
+    def _encode_batch(self, sentences: List[str], normalize: bool) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(sentences)
+        input_ids = np.asarray([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.asarray([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.asarray([e.type_ids for e in encodings], dtype=np.int64)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+        embeddings = pool(token_embeddings, attention_mask, self.pooling_config).astype(np.float32)
+        if normalize:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.clip(norms, 1e-12, None)
+        return embeddings
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        normalize_embeddings: Optional[bool] = None,
+        **kwargs,
+    ) -> np.ndarray:
+        """Embed one sentence (returns a vector) or a list (returns a matrix)."""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        # The Normalize module is part of the model, so it applies by default
+        normalize = self.normalize if normalize_embeddings is None else (normalize_embeddings or self.normalize)
+        batches = [
+            self._encode_batch(texts[i:i + batch_size], normalize)
+            for i in range(0, len(texts), batch_size)
+        ]
+        embeddings = np.concatenate(batches)
+        return embeddings[0] if single else embeddings
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
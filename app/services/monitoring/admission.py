@@ -0,0 +1,290 @@
+"""Admission control and load shedding for the search endpoints.
+
+At most ``max_concurrent`` searches run at once; up to ``max_queue`` more
+wait for a slot in arrival order. A request is turned away with 503 and
+``Retry-After`` instead of being queued when:
+
+* the queue is full, or
+* its expected wait plus the expected search time (a moving average of
+  recent searches) would overrun its deadline.
+
+A queued request that reaches the point where it could no longer finish in
+time is dropped from the queue the same way. The deadline is
+``TVSHOWCHAT_SEARCH_DEADLINE_MS`` from arrival, or sooner if the client
+sends ``X-Request-Timeout-Ms``.
+
+Each ``AdmissionMiddleware`` gates its paths through one named pool.
+Interactive searches share the "search" pool; ``/api/search/batch`` jobs
+get their own "batch" pool (one at a time by default), so a bulk job can
+neither starve interactive searches nor be starved by them. Settings come
+from ``TVSHOWCHAT_<POOL>_CONCURRENCY``, ``_QUEUE`` and ``_DEADLINE_MS``.
+
+Only the gated paths are held back, so health checks, metrics and the
+admin endpoints always get through (the priority lane), and with the pools'
+concurrency kept below the threadpool size they always find a free worker
+thread.
+
+Slots are handed over under a thread lock and waiters are woken with
+``call_soon_threadsafe``, so one controller can serve several event loops
+(as the test client uses).
+"""
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Optional
+
+from app.services.monitoring.metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_WAIT_SECONDS,
+    REQUESTS_SHED,
+)
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_QUEUE = 64
+DEFAULT_DEADLINE_MS = 5000
+# pool -> (concurrency, queue, deadline ms) unless overridden by TVSHOWCHAT_<POOL>_*
+POOLS = {
+    "search": (DEFAULT_CONCURRENCY, DEFAULT_QUEUE, DEFAULT_DEADLINE_MS),
+    # A batch of thousands of queries runs for seconds; queue a few, not many
+    "batch": (1, 4, 120_000),
+}
+TIMEOUT_HEADER = b"x-request-timeout-ms"
+# Weight of the newest search in the service time average
+SERVICE_TIME_ALPHA = 0.2
+
+SEARCH_PATHS = ("/search", "/api/search", "/api/search/stream")
+BATCH_PATHS = ("/api/search/batch",)
+
+
+class Overloaded(Exception):
+    """Raised instead of admitting a request; ``retry_after`` is in seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.granted = False
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        name: str = "search",
+        max_concurrent: int = DEFAULT_CONCURRENCY,
+        max_queue: int = DEFAULT_QUEUE,
+        deadline: float = DEFAULT_DEADLINE_MS / 1000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.deadline = deadline
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters: Deque[_Waiter] = deque()
+        # Unknown until the first search finishes; until then only the queue bound applies
+        self._service_time = 0.0
+        self.admitted = 0
+        self.shed: Dict[str, int] = {"queue_full": 0, "deadline": 0}
+        self._publish()
+
+    def _publish(self):
+        ADMISSION_IN_FLIGHT.set(self._active, pool=self.name)
+        ADMISSION_QUEUE_DEPTH.set(len(self._waiters), pool=self.name)
+
+    def _expected_wait(self, position: int) -> float:
+        # Searches ahead of us drain max_concurrent at a time
+        return (position // self.max_concurrent + 1) * self._service_time
+
+    def _reject(self, reason: str, wait: float) -> Overloaded:
+        self.shed[reason] += 1
+        REQUESTS_SHED.inc(pool=self.name, reason=reason)
+        return Overloaded(reason, max(1, math.ceil(wait)))
+
+    async def acquire(self, timeout: Optional[float] = None):
+        """Wait for a slot; raises ``Overloaded`` if the request should be shed.
+
+        ``timeout`` (seconds) can only shorten the configured deadline.
+        """
+        start = self._clock()
+        budget = self.deadline if timeout is None else min(timeout, self.deadline)
+        with self._lock:
+            if self._active < self.max_concurrent and not self._waiters:
+                self._active += 1
+                self.admitted += 1
+                self._publish()
+                ADMISSION_WAIT_SECONDS.observe(0.0, pool=self.name)
+                return
+            position = len(self._waiters)
+            wait = self._expected_wait(position)
+            if position >= self.max_queue:
+                raise self._reject("queue_full", wait)
+            if wait + self._service_time > budget:
+                raise self._reject("deadline", wait)
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._waiters.append(waiter)
+            # Give up early enough to still finish within the deadline
+            patience = budget - self._service_time
+            self._publish()
+
+        try:
+            await asyncio.wait_for(waiter.future, patience)
+        except asyncio.TimeoutError:
+            with self._lock:
+                if not waiter.granted:
+                    self._waiters.remove(waiter)
+                    self._publish()
+                    raise self._reject("deadline", self._expected_wait(len(self._waiters)))
+        except BaseException:
+            # Client went away while queued; hand on the slot if it was already ours
+            with self._lock:
+                if waiter.granted:
+                    self._release_locked(None)
+                else:
+                    self._waiters.remove(waiter)
+                    self._publish()
+            raise
+        ADMISSION_WAIT_SECONDS.observe(self._clock() - start, pool=self.name)
+
+    def release(self, elapsed: Optional[float] = None):
+        """Free a slot; ``elapsed`` (seconds) updates the service time estimate."""
+        with self._lock:
+            self._release_locked(elapsed)
+
+    def _release_locked(self, elapsed: Optional[float]):
+        if elapsed is not None:
+            if self._service_time:
+                self._service_time += SERVICE_TIME_ALPHA * (elapsed - self._service_time)
+            else:
+                self._service_time = elapsed
+        if self._waiters:
+            # Hand the slot straight to the next waiter; _active is unchanged
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+            self.admitted += 1
+            waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+        else:
+            self._active -= 1
+        self._publish()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pool": self.name,
+                "in_flight": self._active,
+                "queued": len(self._waiters),
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "deadline_ms": round(self.deadline * 1000),
+                "service_time_ms": round(self._service_time * 1000, 3),
+                "admitted": self.admitted,
+                "shed": dict(self.shed),
+            }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware gating ``paths`` through ``get_admission_controller(pool)``.
+
+    The slot is held until the response body has been sent, so streamed
+    searches count for their whole duration.
+    """
+
+    def __init__(self, app, paths: Iterable[str] = SEARCH_PATHS, pool: str = "search"):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.pool = pool
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        controller = get_admission_controller(self.pool)
+        try:
+            await controller.acquire(_timeout(scope))
+        except Overloaded as e:
+            await _send_overloaded(send, e)
+            return
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(time.perf_counter() - start)
+
+
+def _timeout(scope) -> Optional[float]:
+    for name, value in scope.get("headers", ()):
+        if name == TIMEOUT_HEADER:
+            try:
+                return max(0.0, float(value) / 1000)
+            except ValueError:
+                return None
+    return None
+
+
+async def _send_overloaded(send, error: Overloaded):
+    # Same body shape as the /search error responses
+    body = json.dumps({"status": "error", "data": f"Server overloaded ({error.reason}), retry later"}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(error.retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+_controllers: Dict[str, AdmissionController] = {}
+_controller_lock = threading.Lock()
+
+
+def build_admission_controller(pool: str = "search") -> AdmissionController:
+    """Controller for ``pool`` configured from the environment."""
+    concurrency, queue, deadline_ms = POOLS[pool]
+    prefix = f"TVSHOWCHAT_{pool.upper()}"
+    return AdmissionController(
+        name=pool,
+        max_concurrent=int(os.environ.get(f"{prefix}_CONCURRENCY") or concurrency),
+        max_queue=int(os.environ.get(f"{prefix}_QUEUE") or queue),
+        deadline=int(os.environ.get(f"{prefix}_DEADLINE_MS") or deadline_ms) / 1000,
+    )
+
+
+def get_admission_controller(pool: str = "search") -> AdmissionController:
+    controller = _controllers.get(pool)
+    if controller is None:
+        with _controller_lock:
+            controller = _controllers.get(pool)
+            if controller is None:
+                controller = _controllers[pool] = build_admission_controller(pool)
+    return controller
+
+
+def set_admission_controller(controller: Optional[AdmissionController], pool: str = "search"):
+    """Replace a pool's shared controller; ``None`` re-reads the environment on next use."""
+    with _controller_lock:
+        if controller is None:
+            _controllers.pop(pool, None)
+        else:
+            _controllers[pool] = controller
@@ -0,0 +1,187 @@
+"""Background health monitor for Redis, the model, the store and the vector index.
+
+A daemon thread runs every probe each ``TVSHOWCHAT_HEALTH_INTERVAL_SECONDS``
+(default 15) and keeps the latest result plus a short latency history per
+service. Health endpoints only read the cached result, so a probe request
+costs a dict copy instead of a Redis round trip or a model forward pass.
+
+A probe is a callable that returns on success and raises on failure. A
+service whose last check is older than ``STALE_AFTER_INTERVALS`` intervals
+is reported unhealthy, so a stuck monitor cannot keep serving an old
+"healthy".
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import redis
+
+from app.services import embed
+from app.services.monitoring.metrics import HEALTH_PROBE_SECONDS, HEALTH_STATUS
+
+logger = logging.getLogger(__name__)
+
+INTERVAL_ENV = "TVSHOWCHAT_HEALTH_INTERVAL_SECONDS"
+DEFAULT_INTERVAL = 15.0
+HISTORY_LENGTH = 40
+STALE_AFTER_INTERVALS = 3
+
+HEALTHY = "healthy"
+UNHEALTHY = "unhealthy"
+UNKNOWN = "unknown"
+
+
+class HealthMonitor:
+    def __init__(
+        self,
+        probes: Dict[str, Callable[[], Any]],
+        interval: float = DEFAULT_INTERVAL,
+        history: int = HISTORY_LENGTH,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.probes = dict(probes)
+        self.interval = interval
+        self._clock = clock
+        # Entries are replaced, never mutated, so readers need no lock
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._history: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._history_length = history
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        for name in self.probes:
+            self._status[name] = {"status": UNKNOWN, "error": None}
+
+    def record(self, name: str, error: Optional[str] = None, latency: Optional[float] = None):
+        """Store a check result (from a probe, or from startup)."""
+        now = self._clock()
+        previous = self._status.get(name, {})
+        healthy = error is None
+        self._status[name] = {
+            "status": HEALTHY if healthy else UNHEALTHY,
+            "error": error,
+            "checked_at": now,
+            "latency_ms": round(latency * 1000, 3) if latency is not None else None,
+            "last_healthy_at": now if healthy else previous.get("last_healthy_at"),
+        }
+        if latency is not None:
+            history = self._history.setdefault(name, deque(maxlen=self._history_length))
+            history.append({"at": now, "latency_ms": round(latency * 1000, 3), "ok": healthy})
+            HEALTH_PROBE_SECONDS.observe(latency, service=name)
+        HEALTH_STATUS.set(1 if healthy else 0, service=name)
+
+    def check(self, name: str) -> Dict[str, Any]:
+        """Run one probe now and return its fresh status."""
+        start = time.perf_counter()
+        error = None
+        try:
+            self.probes[name]()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        latency = time.perf_counter() - start
+        if error and self._status.get(name, {}).get("status") != UNHEALTHY:
+            logger.warning(f"Health check {name} failed: {error}")
+        self.record(name, error, latency)
+        return self.status(name)
+
+    def check_all(self):
+        for name in self.probes:
+            self.check(name)
+
+    def status(self, name: str) -> Dict[str, Any]:
+        entry = dict(self._status.get(name) or {"status": UNKNOWN, "error": None})
+        checked_at = entry.get("checked_at")
+        if (
+            self._thread is not None
+            and checked_at is not None
+            and self._clock() - checked_at > STALE_AFTER_INTERVALS * self.interval
+        ):
+            entry["status"] = UNHEALTHY
+            entry["error"] = f"No health check for {self._clock() - checked_at:.0f}s"
+        return entry
+
+    def statuses(self) -> Dict[str, Dict[str, Any]]:
+        return {name: self.status(name) for name in list(self._status)}
+
+    def healthy(self, name: str) -> bool:
+        return self.status(name)["status"] == HEALTHY
+
+    def history(self) -> Dict[str, List[Dict[str, Any]]]:
+        return {name: list(entries) for name, entries in list(self._history.items())}
+
+    def start(self):
+        """Start the background probe thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check_all()
+            except Exception as e:
+                logger.error(f"Health monitor iteration failed: {e}")
+
+
+def default_probes(redis_client=None) -> Dict[str, Callable[[], Any]]:
+    """Probes for the API's dependencies.
+
+    Redis gets its own client with short socket timeouts, so a stalled
+    server fails the probe instead of blocking the monitor.
+    """
+    from app.services.embeddings.model import get_embedder
+    from app.services.search.service import get_backend
+    from app.services.storage.document_store import get_store
+
+    if redis_client is None:
+        redis_client = redis.Redis(
+            host=embed.REDIS_HOST,
+            port=embed.REDIS_PORT,
+            socket_timeout=embed.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=embed.REDIS_SOCKET_TIMEOUT,
+        )
+
+    def store():
+        store = get_store()
+        store.data_version()
+        if next(store.episodes_path.glob("season_*.json"), None) is None:
+            raise RuntimeError("No episodes in the document store")
+
+    return {
+        "redis": redis_client.ping,
+        "model": lambda: get_embedder().encode("health check"),
+        "data": lambda: get_backend().stats(),
+        "store": store,
+    }
+
+
+_monitor: Optional[HealthMonitor] = None
+_monitor_lock = threading.Lock()
+
+
+def get_health_monitor() -> HealthMonitor:
+    """The shared monitor; probes are built on first use but not run until ``start``."""
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                interval = float(os.environ.get(INTERVAL_ENV) or DEFAULT_INTERVAL)
+                _monitor = HealthMonitor(default_probes(), interval=interval)
+    return _monitor
+
+
+def set_health_monitor(monitor: Optional[HealthMonitor]):
+    global _monitor
+    with _monitor_lock:
+        if _monitor is not None and _monitor is not monitor:
+            _monitor.stop()
+        _monitor = monitor
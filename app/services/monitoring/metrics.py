@@ -0,0 +1,322 @@
+"""In-process metrics with Prometheus text exposition.
+
+Recording is lock-free on the hot path: every thread writes into its own
+shard (a plain dict of label tuple -> counts), and shards are only merged
+when ``/metrics`` is scraped. The lock is taken once per thread per metric,
+when its shard is first created.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+# Seconds; tuned for sub-millisecond scans up to multi-second model loads
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelKey = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(v: float) -> str:
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._local = threading.local()
+        self._shards: List[Dict[LabelKey, list]] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> Dict[LabelKey, list]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def _key(self, labels: Dict[str, object]) -> LabelKey:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def _merged(self) -> Dict[LabelKey, list]:
+        with self._lock:
+            shards = list(self._shards)
+        merged: Dict[LabelKey, list] = {}
+        for shard in shards:
+            for key, series in list(shard.items()):
+                if key in merged:
+                    merged[key] = [a + b for a, b in zip(merged[key], series)]
+                else:
+                    merged[key] = list(series)
+        return merged
+
+    def collect(self) -> Dict[LabelKey, list]:
+        """Merged series for this metric, keyed by label values."""
+        return self._merged()
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type_name}"]
+        for key, series in sorted(self._merged().items()):
+            lines.extend(self._expose_series(key, series))
+        return lines
+
+    def _expose_series(self, key: LabelKey, series: list) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        series = shard.get(key)
+        if series is None:
+            series = shard[key] = [0]
+        series[0] += amount
+
+    def _expose_series(self, key: LabelKey, series: list) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(series[0])}"]
+
+
+class Gauge(_Metric):
+    """A value that is set rather than accumulated (queue depth, in-flight work)."""
+    type_name = "gauge"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        super().__init__(name, description, labels)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def collect(self) -> Dict[LabelKey, list]:
+        return {k: [v] for k, v in list(self._values.items())}
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type_name}"]
+        for key, value in sorted(list(self._values.items())):
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        series = shard.get(key)
+        if series is None:
+            # One slot per bucket, one for +Inf, then the running sum
+            series = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _expose_series(self, key: LabelKey, series: list) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            le_label = f'le="{le}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le_label)} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(series[-1])}")
+        lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+def result_count_bucket(count: int) -> str:
+    """Label value for a result count: ``0``, ``1-5``, ``6-20`` or ``>20``."""
+    low = 0
+    for high in RESULT_COUNT_BUCKETS:
+        if count <= high:
+            return str(high) if high == low else f"{low}-{high}"
+        low = high + 1
+    return f">{RESULT_COUNT_BUCKETS[-1]}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric {metric.name} already registered as {existing.type_name}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, description: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, description, labels))
+
+    def gauge(self, name: str, description: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, description, labels))
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, description, labels, buckets))
+
+    def expose(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Search: one histogram per stage, one for the end-to-end request
+SEARCH_STAGE_SECONDS = REGISTRY.histogram(
+    "tvshowchat_search_stage_seconds",
+    "Time spent in each stage of a search (encode, knn, scan, assemble, serialize).",
+    labels=("backend", "stage"),
+)
+SEARCH_LATENCY_SECONDS = REGISTRY.histogram(
+    "tvshowchat_search_latency_seconds",
+    "End-to-end search handler latency.",
+    labels=("endpoint", "backend", "result_count"),
+)
+# Upper bounds of the result_count label's buckets; keeps its cardinality fixed
+RESULT_COUNT_BUCKETS = (0, 5, 20)
+SEARCH_REQUESTS = REGISTRY.counter(
+    "tvshowchat_search_requests_total",
+    "Search requests by outcome.",
+    labels=("endpoint", "backend", "status"),
+)
+
+# Ingest: embedding, Redis pipeline and crawler stages
+INGEST_STAGE_SECONDS = REGISTRY.histogram(
+    "tvshowchat_ingest_stage_seconds",
+    "Time spent in each ingest stage.",
+    labels=("source", "stage"),
+)
+INGEST_EPISODES = REGISTRY.counter(
+    "tvshowchat_ingest_episodes_total",
+    "Episodes processed by ingest jobs.",
+    labels=("source",),
+)
+
+INGEST_TOKENS = REGISTRY.counter(
+    "tvshowchat_ingest_tokens_total",
+    "Tokens embedded by ingest jobs (excluding padding).",
+    labels=("source",),
+)
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "tvshowchat_http_request_seconds",
+    "HTTP request latency by route.",
+    labels=("method", "path", "status"),
+)
+
+# Vector backends: circuit breaker state (0 closed, 1 half-open, 2 open) and failovers
+CIRCUIT_STATE = REGISTRY.gauge(
+    "tvshowchat_circuit_state",
+    "Circuit breaker state: 0 closed, 1 half-open, 2 open.",
+    labels=("name",),
+)
+BACKEND_FAILOVERS = REGISTRY.counter(
+    "tvshowchat_backend_failovers_total",
+    "Queries served by the fallback backend.",
+    labels=("primary", "fallback", "reason"),
+)
+
+# Search result cache: lookups by tier (local, shared) and result (hit, miss, error)
+RESULT_CACHE_LOOKUPS = REGISTRY.counter(
+    "tvshowchat_result_cache_lookups_total",
+    "Search result cache lookups.",
+    labels=("tier", "result"),
+)
+SEARCHES_COALESCED = REGISTRY.counter(
+    "tvshowchat_searches_coalesced_total",
+    "Searches that waited for an identical in-flight search instead of running their own.",
+    labels=("backend",),
+)
+
+# Admission control in front of the search endpoints
+ADMISSION_IN_FLIGHT = REGISTRY.gauge(
+    "tvshowchat_admission_in_flight",
+    "Admitted requests currently running.",
+    labels=("pool",),
+)
+ADMISSION_QUEUE_DEPTH = REGISTRY.gauge(
+    "tvshowchat_admission_queue_depth",
+    "Requests waiting for a slot.",
+    labels=("pool",),
+)
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram(
+    "tvshowchat_admission_wait_seconds",
+    "Time admitted requests spent waiting for a slot.",
+    labels=("pool",),
+)
+REQUESTS_SHED = REGISTRY.counter(
+    "tvshowchat_requests_shed_total",
+    "Requests rejected with 503 instead of being queued (queue_full, deadline).",
+    labels=("pool", "reason"),
+)
+
+# Background health monitor: probe latency and the latest result (1 healthy, 0 not)
+HEALTH_PROBE_SECONDS = REGISTRY.histogram(
+    "tvshowchat_health_probe_seconds",
+    "Latency of background health probes.",
+    labels=("service",),
+)
+HEALTH_STATUS = REGISTRY.gauge(
+    "tvshowchat_health_status",
+    "Latest health check result: 1 healthy, 0 unhealthy.",
+    labels=("service",),
+)
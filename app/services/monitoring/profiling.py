@@ -0,0 +1,235 @@
+"""Opt-in request profiling and memory snapshots for admins.
+
+Nothing here runs unless asked: a request is profiled only when it carries
+a valid admin token *and* ``X-Profile: 1`` (or ``?profile=1``), and
+tracemalloc is only started by the admin memory endpoints. Set
+``TVSHOWCHAT_ADMIN_TOKEN`` to enable the admin surface at all.
+"""
+import cProfile
+import hmac
+import io
+import itertools
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+ADMIN_TOKEN_ENV = "TVSHOWCHAT_ADMIN_TOKEN"
+ADMIN_TOKEN_HEADER = "x-admin-token"
+PROFILE_HEADER = "x-profile"
+MAX_STORED_PROFILES = 20
+MAX_STORED_SNAPSHOTS = 5
+TOP_FRAMES = 25
+
+# Which part of the process a traced allocation belongs to, by file path
+MEMORY_CATEGORIES = (
+    ("document_store", ("app/services/storage", "json/decoder.py", "json/__init__.py")),
+    ("model", ("sentence_transformers", "transformers", "torch", "tokenizers", "onnxruntime")),
+    ("responses", ("app/api", "pydantic", "fastapi", "starlette", "orjson")),
+    ("redis", ("redis",)),
+    ("numpy", ("numpy",)),
+)
+
+
+def admin_enabled() -> bool:
+    return bool(os.environ.get(ADMIN_TOKEN_ENV))
+
+
+def is_admin(headers) -> bool:
+    """Check the admin token header against TVSHOWCHAT_ADMIN_TOKEN."""
+    expected = os.environ.get(ADMIN_TOKEN_ENV)
+    supplied = headers.get(ADMIN_TOKEN_HEADER)
+    if not expected or not supplied:
+        return False
+    return hmac.compare_digest(expected.encode(), supplied.encode())
+
+
+def profile_requested(request) -> bool:
+    """True if this request asked to be profiled and is allowed to."""
+    if not admin_enabled():
+        return False
+    flag = request.headers.get(PROFILE_HEADER) or request.query_params.get("profile")
+    return flag in ("1", "true") and is_admin(request.headers)
+
+
+# --- Request profiles ---
+
+_profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_profiles_lock = threading.Lock()
+_profile_ids = itertools.count(1)
+
+
+def _top_frames(profiler: cProfile.Profile, limit: int = TOP_FRAMES) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():
+        rows.append({
+            "function": f"{filename}:{line}({func})",
+            "calls": nc,
+            "primitive_calls": cc,
+            "total_time": round(tt, 6),
+            "cumulative_time": round(ct, 6),
+        })
+    rows.sort(key=lambda r: r["cumulative_time"], reverse=True)
+    return rows[:limit]
+
+
+class RequestProfile:
+    """Handle yielded by profile_request; ``id`` is set once profiling finishes."""
+    def __init__(self, label: str):
+        self.label = label
+        self.id: Optional[str] = None
+
+
+@contextmanager
+def profile_request(request, label: str):
+    """Run the block under cProfile if the request asked for it.
+
+    Yields None when profiling is off, so the only cost is the flag check.
+    cProfile only sees the current thread, so this must wrap the actual work
+    (e.g. inside a sync handler running in the threadpool).
+    """
+    if not profile_requested(request):
+        yield None
+        return
+
+    handle = RequestProfile(label)
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield handle
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+        profile_id = str(next(_profile_ids))
+        with _profiles_lock:
+            _profiles[profile_id] = {
+                "id": profile_id,
+                "label": label,
+                "created": time.time(),
+                "wall_time": round(elapsed, 6),
+                "top_frames": _top_frames(profiler),
+            }
+            while len(_profiles) > MAX_STORED_PROFILES:
+                _profiles.popitem(last=False)
+        handle.id = profile_id
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    with _profiles_lock:
+        return [
+            {k: p[k] for k in ("id", "label", "created", "wall_time")}
+            for p in _profiles.values()
+        ]
+
+
+def get_profile(profile_id: str) -> Optional[Dict[str, Any]]:
+    with _profiles_lock:
+        return _profiles.get(profile_id)
+
+
+# --- Memory snapshots ---
+
+_snapshots: "deque[Dict[str, Any]]" = deque(maxlen=MAX_STORED_SNAPSHOTS)
+_snapshot_ids = itertools.count(1)
+_snapshots_lock = threading.Lock()
+
+
+def _categorize(filename: str) -> str:
+    normalized = filename.replace(os.sep, "/")
+    for category, needles in MEMORY_CATEGORIES:
+        if any(n in normalized for n in needles):
+            return category
+    return "other"
+
+
+def _summarize(snapshot: tracemalloc.Snapshot, top: int) -> Dict[str, Any]:
+    stats = snapshot.statistics("filename")
+    by_category: Dict[str, int] = {}
+    for stat in stats:
+        category = _categorize(stat.traceback[0].filename)
+        by_category[category] = by_category.get(category, 0) + stat.size
+    return {
+        "total_bytes": sum(s.size for s in stats),
+        "by_category": dict(sorted(by_category.items(), key=lambda kv: -kv[1])),
+        "top": [
+            {"location": str(s.traceback[0]), "bytes": s.size, "count": s.count}
+            for s in snapshot.statistics("lineno")[:top]
+        ],
+    }
+
+
+def start_tracing(frames: int = 1) -> bool:
+    """Start tracemalloc if needed. Returns True if it was already running."""
+    if tracemalloc.is_tracing():
+        return True
+    tracemalloc.start(frames)
+    return False
+
+
+def stop_tracing():
+    """Stop tracemalloc and drop stored snapshots."""
+    tracemalloc.stop()
+    with _snapshots_lock:
+        _snapshots.clear()
+
+
+def take_snapshot(top: int = 20) -> Dict[str, Any]:
+    """Take a tracemalloc snapshot, store it and return a summary.
+
+    Only allocations made after tracing started are visible, so start
+    tracing (or take a first snapshot) before the workload of interest.
+    """
+    start_tracing()
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    snapshot_id = str(next(_snapshot_ids))
+    with _snapshots_lock:
+        _snapshots.append({"id": snapshot_id, "created": time.time(), "snapshot": snapshot})
+    return {"id": snapshot_id, **_summarize(snapshot, top)}
+
+
+def _find_snapshot(snapshot_id: str) -> Optional[tracemalloc.Snapshot]:
+    with _snapshots_lock:
+        for entry in _snapshots:
+            if entry["id"] == snapshot_id:
+                return entry["snapshot"]
+    return None
+
+
+def diff_snapshots(base_id: str, target_id: Optional[str] = None, top: int = 20) -> Dict[str, Any]:
+    """Compare a stored snapshot with another (or a fresh one)."""
+    base = _find_snapshot(base_id)
+    if base is None:
+        raise KeyError(base_id)
+    if target_id is None:
+        target_id = take_snapshot(top=0)["id"]
+    target = _find_snapshot(target_id)
+    if target is None:
+        raise KeyError(target_id)
+
+    growth_by_category: Dict[str, int] = {}
+    for stat in target.compare_to(base, "filename"):
+        category = _categorize(stat.traceback[0].filename)
+        growth_by_category[category] = growth_by_category.get(category, 0) + stat.size_diff
+    return {
+        "base": base_id,
+        "target": target_id,
+        "growth_by_category": dict(sorted(growth_by_category.items(), key=lambda kv: -kv[1])),
+        "top": [
+            {
+                "location": str(stat.traceback[0]),
+                "size_diff": stat.size_diff,
+                "size": stat.size,
+                "count_diff": stat.count_diff,
+            }
+            for stat in target.compare_to(base, "lineno")[:top]
+        ],
+    }
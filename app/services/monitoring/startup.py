@@ -0,0 +1,70 @@
+"""Boot-time breakdown for the API process.
+
+A single module-level StartupTimer is created the first time this module is
+imported (main.py imports it before anything else), so offsets are measured
+from the start of ``import app.api.main``. Phases are recorded with
+``startup_timer.phase(name)`` or ``startup_timer.mark(name)`` and served by
+``/health/startup``.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+
+class StartupTimer:
+    def __init__(self):
+        self._t0 = time.perf_counter()
+        self._last_mark = self._t0
+        self._lock = threading.Lock()
+        self.phases: List[Dict[str, Any]] = []
+        self.ready_at: Optional[float] = None
+
+    def _add(self, name: str, start: float, end: float):
+        with self._lock:
+            self.phases.append({
+                "phase": name,
+                "start_seconds": round(start - self._t0, 4),
+                "duration_seconds": round(end - start, 4),
+            })
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block as a named phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, start, time.perf_counter())
+
+    def mark(self, name: str):
+        """Record the time since the previous mark as a named phase."""
+        now = time.perf_counter()
+        self._add(name, self._last_mark, now)
+        self._last_mark = now
+
+    def ready(self):
+        """Mark the process as ready to serve requests."""
+        self.ready_at = time.perf_counter()
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            phases = list(self.phases)
+        return {
+            "time_to_ready_seconds": (
+                round(self.ready_at - self._t0, 4) if self.ready_at is not None else None
+            ),
+            "uptime_seconds": round(time.perf_counter() - self._t0, 4),
+            "phases": phases,
+        }
+
+    def log_report(self, logger):
+        report = self.report()
+        logger.info(f"Startup ready in {report['time_to_ready_seconds']}s")
+        for p in report["phases"]:
+            logger.info(
+                f"  {p['phase']:<16} {p['duration_seconds']:>8.3f}s (at +{p['start_seconds']:.3f}s)"
+            )
+
+
+startup_timer = StartupTimer()
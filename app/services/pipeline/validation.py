@@ -1,12 +1,22 @@
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+from datetime import datetime, date
 import re
+import numpy as np
 from pydantic import BaseModel, Field, validator
 
+VECTOR_DIMENSION = 384  # all-MiniLM-L6-v2 dimension
+EMBEDDING_FIELDS = ('summary_embedding', 'synopsis_embedding', 'quotes_embedding')
+# all-MiniLM-L6-v2 ends in a Normalize module, so vectors should be unit length
+EMBEDDING_NORM_RANGE = (0.98, 1.02)
+
+# Validation modes: "full" runs every record through the pydantic models,
+# "fast" uses the precompiled checks below and one NumPy pass for vectors.
+VALIDATION_MODES = ("full", "fast")
+
 class EpisodeSummary(BaseModel):
     """Validates a single episode's summary data."""
     # Basic metadata
-    episode_number: str = Field(..., pattern=r'^\d{2}$')
+    episode_number: str = Field(..., regex=r'^\d{2}$')
     episode_airdate: str
     episode_title: str
     season_number: int = Field(..., ge=1, le=7)
@@ -61,20 +71,31 @@ class EpisodeSummary(BaseModel):
         """Validate embedding vector."""
         if not v:
             raise ValueError('Embedding cannot be empty')
-        if len(v) != 384:  # all-MiniLM-L6-v2 dimension
-            raise ValueError(f'Invalid embedding dimension. Expected 384, got {len(v)}')
+        if len(v) != VECTOR_DIMENSION:
+            raise ValueError(f'Invalid embedding dimension. Expected {VECTOR_DIMENSION}, got {len(v)}')
+        _check_vector_values(v, 'summary_embedding')
         return v
 
     @validator('synopsis_embedding', 'quotes_embedding')
-    def validate_optional_embeddings(cls, v: Optional[List[float]]) -> Optional[List[float]]:
+    def validate_optional_embeddings(cls, v: Optional[List[float]], field) -> Optional[List[float]]:
         """Validate optional embedding vectors."""
         if v is not None:
             if not v:
                 raise ValueError('Optional embedding cannot be empty if provided')
-            if len(v) != 384:
-                raise ValueError(f'Invalid optional embedding dimension. Expected 384, got {len(v)}')
+            if len(v) != VECTOR_DIMENSION:
+                raise ValueError(f'Invalid optional embedding dimension. Expected {VECTOR_DIMENSION}, got {len(v)}')
+            _check_vector_values(v, field.name)
         return v
 
+def _check_vector_values(v: List[float], field: str) -> None:
+    """The finiteness and norm rules of check_embeddings, for one vector."""
+    vector = np.asarray(v, dtype=np.float32)
+    if not np.isfinite(vector).all():
+        raise ValueError(f'{field} contains non-finite values')
+    norm = float(np.linalg.norm(vector))
+    if not EMBEDDING_NORM_RANGE[0] <= norm <= EMBEDDING_NORM_RANGE[1]:
+        raise ValueError(f'{field} norm {norm:.4f} outside {EMBEDDING_NORM_RANGE}')
+
 class SeasonData(BaseModel):
     """Validates a season's episode data."""
     __root__: Dict[str, EpisodeSummary]
@@ -102,10 +123,208 @@ class BuffyData(BaseModel):
                 return False
         return True
 
-def validate_episode_data(data: Dict[str, Any]) -> BuffyData:
-    """Validate the complete episode dataset."""
+# --- Fast path ---
+
+_EPISODE_NUMBER_RE = re.compile(r'^\d{2}$')
+_MONTHS = {
+    name: i for i, name in enumerate(
+        ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+         'August', 'September', 'October', 'November', 'December'], 1)
+}
+_AIRDATE_RE = re.compile(r'^(' + '|'.join(_MONTHS) + r') (\d{1,2}), (\d{4})$')
+_OPTIONAL_STR_FIELDS = ('director', 'writer', 'production_code')
+_OPTIONAL_LIST_FIELDS = (
+    'episode_synopsis', 'episode_quotes', 'episode_trivia', 'guest_stars',
+    'recurring_characters', 'first_appearances', 'continuity_notes',
+    'cultural_references', 'music',
+)
+
+
+def _is_str_list(v: Any) -> bool:
+    return isinstance(v, list) and all(isinstance(p, str) for p in v)
+
+
+def check_episode_fields(data: Dict[str, Any]) -> None:
+    """Check an episode's scalar and text fields without building a model.
+
+    Mirrors the EpisodeSummary field rules, minus the embeddings which are
+    handled by check_embeddings. Raises ValueError on the first problem.
+    """
+    number = data.get('episode_number')
+    if not isinstance(number, str) or not _EPISODE_NUMBER_RE.match(number):
+        raise ValueError(f'Invalid episode_number: {number!r}')
+
+    airdate = data.get('episode_airdate')
+    match = _AIRDATE_RE.match(airdate) if isinstance(airdate, str) else None
+    if not match:
+        raise ValueError('Invalid date format. Expected format: "Month DD, YYYY"')
     try:
-        buffy_data = BuffyData(__root__=data)
+        date(int(match.group(3)), _MONTHS[match.group(1)], int(match.group(2)))
+    except ValueError:
+        raise ValueError('Invalid date format. Expected format: "Month DD, YYYY"')
+
+    if not isinstance(data.get('episode_title'), str):
+        raise ValueError('episode_title must be a string')
+
+    season = data.get('season_number')
+    if not isinstance(season, int) or isinstance(season, bool) or not 1 <= season <= 7:
+        raise ValueError(f'Invalid season_number: {season!r}')
+
+    summary = data.get('episode_summary')
+    if not _is_str_list(summary) or not summary:
+        raise ValueError('Summary cannot be empty')
+    if any(len(p) < 10 for p in summary):
+        raise ValueError('Summary paragraphs too short')
+
+    for key in _OPTIONAL_STR_FIELDS:
+        if data.get(key) is not None and not isinstance(data[key], str):
+            raise ValueError(f'{key} must be a string')
+    for key in _OPTIONAL_LIST_FIELDS:
+        if data.get(key) is not None and not _is_str_list(data[key]):
+            raise ValueError(f'{key} must be a list of strings')
+    viewers = data.get('us_viewers_millions')
+    if viewers is not None and not isinstance(viewers, (int, float)):
+        raise ValueError('us_viewers_millions must be a number')
+
+
+def embedding_errors(
+    records: Iterable[Tuple[str, Dict[str, Any]]],
+    dimension: int = VECTOR_DIMENSION,
+    norm_range: Tuple[float, float] = EMBEDDING_NORM_RANGE,
+) -> Dict[str, List[str]]:
+    """Check all embedding fields of many records in one vectorized pass.
+
+    ``records`` yields (label, episode data) pairs. Each embedding field is
+    stacked into a single (n, dimension) float32 matrix and checked for
+    finiteness and norm range. Returns the problems found per label; labels
+    of valid records are absent.
+    """
+    records = list(records)
+    errors: Dict[str, List[str]] = {}
+    for field in EMBEDDING_FIELDS:
+        labels, vectors = [], []
+        for label, data in records:
+            v = data.get(field)
+            if v is None:
+                if field == 'summary_embedding':
+                    errors.setdefault(label, []).append(f'{field} is required')
+                continue
+            if len(v) != dimension:
+                errors.setdefault(label, []).append(
+                    f'Invalid {field} dimension. Expected {dimension}, got {len(v)}'
+                )
+                continue
+            labels.append(label)
+            vectors.append(v)
+        if not vectors:
+            continue
+
+        unparsable = set()
+        try:
+            matrix = np.asarray(vectors, dtype=np.float32)
+        except (TypeError, ValueError):
+            # Find the offending rows; the others are still checked below
+            rows = []
+            for i, v in enumerate(vectors):
+                try:
+                    rows.append(np.asarray(v, dtype=np.float32))
+                except (TypeError, ValueError) as e:
+                    errors.setdefault(labels[i], []).append(f'{field} has non-numeric values ({e})')
+                    unparsable.add(i)
+                    rows.append(np.full(dimension, np.nan, dtype=np.float32))
+            matrix = np.stack(rows)
+        finite = np.isfinite(matrix).all(axis=1)
+        norms = np.linalg.norm(np.where(finite[:, None], matrix, 0), axis=1)
+        in_range = (norms >= norm_range[0]) & (norms <= norm_range[1])
+        for i in np.flatnonzero(~finite):
+            if i not in unparsable:
+                errors.setdefault(labels[i], []).append(f'{field} contains non-finite values')
+        for i in np.flatnonzero(finite & ~in_range):
+            errors.setdefault(labels[i], []).append(f'{field} norm {norms[i]:.4f} outside {norm_range}')
+    return errors
+
+
+def check_embeddings(
+    records: Iterable[Tuple[str, Dict[str, Any]]],
+    dimension: int = VECTOR_DIMENSION,
+    norm_range: Tuple[float, float] = EMBEDDING_NORM_RANGE,
+) -> None:
+    """Like embedding_errors, but raises ValueError listing every problem."""
+    errors = embedding_errors(records, dimension, norm_range)
+    if errors:
+        raise ValueError('; '.join(f'{label}: {e}' for label, problems in errors.items() for e in problems))
+
+
+def drop_invalid_embeddings(data: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Remove episodes with invalid embeddings from season -> episode data, in place.
+
+    The rest of the dataset is kept, so one bad vector does not cost a whole
+    crawl. Seasons left empty are removed. Returns one message per dropped
+    episode.
+    """
+    records = [
+        (f"{season_key}/{ep_key}", ep if isinstance(ep, dict) else ep.dict())
+        for season_key, season in data.items()
+        for ep_key, ep in season.items()
+    ]
+    errors = embedding_errors(records)
+    for label, problems in errors.items():
+        season_key, ep_key = label.split('/')
+        del data[season_key][ep_key]
+        if not data[season_key]:
+            del data[season_key]
+    return [f"{label}: {'; '.join(problems)}" for label, problems in errors.items()]
+
+
+def _construct_episode(data: Dict[str, Any]) -> EpisodeSummary:
+    """Build an EpisodeSummary from checked data, dropping unknown keys like pydantic does."""
+    return EpisodeSummary.construct(**{k: v for k, v in data.items() if k in EpisodeSummary.__fields__})
+
+
+def _construct_dataset(data: Dict[str, Any]) -> BuffyData:
+    """Build BuffyData from already-checked records without re-validating."""
+    seasons = {}
+    for season_key, season in data.items():
+        episodes = {
+            ep_key: ep if isinstance(ep, EpisodeSummary) else _construct_episode(ep)
+            for ep_key, ep in season.items()
+        }
+        seasons[season_key] = SeasonData.construct(__root__=episodes)
+    return BuffyData.construct(__root__=seasons)
+
+
+def validate_episode_data(
+    data: Dict[str, Any], mode: str = "full", prevalidated: bool = False
+) -> BuffyData:
+    """Validate the complete episode dataset.
+
+    In ``fast`` mode scalar fields go through check_episode_fields and all
+    embeddings are checked together by check_embeddings. ``prevalidated``
+    means every episode already passed validate_single_episode, so only the
+    dataset-level checks run (plus the embedding pass in fast mode, which
+    validate_single_episode defers when called with check_vectors=False).
+    """
+    if mode not in VALIDATION_MODES:
+        raise ValueError(f"Unknown validation mode: {mode}")
+    try:
+        if mode == "fast":
+            records = [
+                (f"{season_key}/{ep_key}", ep if isinstance(ep, dict) else ep.dict())
+                for season_key, season in data.items()
+                for ep_key, ep in season.items()
+            ]
+            if not prevalidated:
+                for label, ep in records:
+                    try:
+                        check_episode_fields(ep)
+                    except ValueError as e:
+                        raise ValueError(f"{label}: {e}")
+            check_embeddings(records)
+            buffy_data = _construct_dataset(data)
+        elif prevalidated:
+            buffy_data = _construct_dataset(data)
+        else:
+            buffy_data = BuffyData(__root__=data)
         
         # Additional validations
         if not buffy_data.validate_season_numbers():
@@ -117,9 +336,22 @@ def validate_episode_data(data: Dict[str, Any]) -> BuffyData:
     except Exception as e:
         raise ValueError(f"Data validation failed: {str(e)}")
 
-def validate_single_episode(data: Dict[str, Any]) -> EpisodeSummary:
-    """Validate a single episode's data."""
+def validate_single_episode(
+    data: Dict[str, Any], mode: str = "full", check_vectors: bool = True
+) -> EpisodeSummary:
+    """Validate a single episode's data.
+
+    With ``mode="fast"`` and ``check_vectors=False`` the embeddings are left
+    for a later dataset-wide validate_episode_data(..., mode="fast") pass.
+    """
+    if mode not in VALIDATION_MODES:
+        raise ValueError(f"Unknown validation mode: {mode}")
     try:
+        if mode == "fast":
+            check_episode_fields(data)
+            if check_vectors:
+                check_embeddings([(data.get('episode_number'), data)])
+            return _construct_episode(data)
         return EpisodeSummary(**data)
     except Exception as e:
-        raise ValueError(f"Episode validation failed: {str(e)}") 
\ No newline at end of file
+        raise ValueError(f"Episode validation failed: {str(e)}")
@@ -1,15 +1,17 @@
 import json
 import requests
 from bs4 import BeautifulSoup
-from sentence_transformers import SentenceTransformer
 from typing import Dict, Optional, Any
 import time
 import re
-from numpy import float32
 import logging
 from ratelimit import limits, sleep_and_retry
 from tenacity import retry, stop_after_attempt, wait_exponential
-from app.services.pipeline.validation import validate_single_episode, validate_episode_data
+from app.services.pipeline.validation import drop_invalid_embeddings, validate_single_episode, validate_episode_data
+from app.services.storage.episode_jsonl import iter_nested, write_snapshot
+from app.services.storage.snapshot_store import SnapshotStore
+from app.services.embeddings.batch import embed_episodes
+from app.services.monitoring.metrics import INGEST_EPISODES, INGEST_STAGE_SECONDS
 
 # Configure logging
 logging.basicConfig(
@@ -50,7 +52,8 @@ def clean_text(text: str) -> str:
 def extract_episode(url: str) -> Dict[str, Any]:
     """Extract episode data with improved error handling."""
     try:
-        response = make_request(url)
+        with INGEST_STAGE_SECONDS.time(source="crawl", stage="fetch"):
+            response = make_request(url)
         if not response:
             return {}
 
@@ -194,8 +197,13 @@ def extract_episode(url: str) -> Dict[str, Any]:
         logger.error(f"Error extracting episode data from {url}: {str(e)}")
         return {}
 
-def fetch_parse_save_episodes():
-    """Main function to fetch, parse, and save episode data with validation."""
+def fetch_parse_save_episodes(output_format: str = "snapshot"):
+    """Main function to fetch, parse, and save episode data with validation.
+
+    ``output_format`` is ``"snapshot"`` (content-addressed manifest, only
+    changed episodes are written), ``"jsonl"`` (streaming snapshot, one
+    episode per line) or ``"json"`` (the legacy single nested document).
+    """
     try:
         url = f"{BASE_URL}wiki/List_of_Buffy_the_Vampire_Slayer_episodes"
         response = make_request(url)
@@ -203,7 +211,6 @@ def fetch_parse_save_episodes():
             return
 
         soup = BeautifulSoup(response.content, "lxml")
-        embedder = SentenceTransformer("all-MiniLM-L6-v2")
         result = {}
         validation_errors = []
 
@@ -248,7 +255,8 @@ def fetch_parse_save_episodes():
                     full_url = BASE_URL + episode_link
                     logger.info(f"Crawling season {season_num} - episode {episode_number}")
                     
-                    episode_page_data = extract_episode(full_url)
+                    with INGEST_STAGE_SECONDS.time(source="crawl", stage="extract"):
+                        episode_page_data = extract_episode(full_url)
                     if not episode_page_data.get("summary"):
                         logger.warning(f"No summary found for episode {episode_number}")
                         continue
@@ -271,22 +279,15 @@ def fetch_parse_save_episodes():
                         "music": episode_page_data.get("music")
                     })
                     
-                    # Generate embeddings
-                    summary_text = " ".join(episode_page_data.get("summary", []))
-                    episode_data["summary_embedding"] = embedder.encode(summary_text).astype(float32).tolist()
-                    
-                    if episode_page_data.get("synopsis"):
-                        synopsis_text = " ".join(episode_page_data["synopsis"])
-                        episode_data["synopsis_embedding"] = embedder.encode(synopsis_text).astype(float32).tolist()
-                    
-                    if episode_page_data.get("quotes"):
-                        quotes_text = " ".join(episode_page_data["quotes"])
-                        episode_data["quotes_embedding"] = embedder.encode(quotes_text).astype(float32).tolist()
-
                     # Validate episode data
                     try:
-                        validated_episode = validate_single_episode(episode_data)
+                        # Embeddings are added and checked for the whole dataset below
+                        with INGEST_STAGE_SECONDS.time(source="crawl", stage="validate"):
+                            validated_episode = validate_single_episode(
+                                episode_data, mode="fast", check_vectors=False
+                            )
                         curr_season[episode_number.zfill(2)] = validated_episode.dict()
+                        INGEST_EPISODES.inc(source="crawl")
                     except ValueError as e:
                         validation_errors.append(f"Season {season_num}, Episode {episode_number}: {str(e)}")
                         continue
@@ -298,14 +299,31 @@ def fetch_parse_save_episodes():
             if curr_season:
                 result[f"season_{season_num}"] = curr_season
 
+        # Embed all episodes at once, in length-sorted batches
+        embed_episodes(
+            (episode for season in result.values() for episode in season.values()),
+            source="crawl",
+        )
+
         # Validate and save complete dataset
         try:
-            validated_data = validate_episode_data(result)
+            with INGEST_STAGE_SECONDS.time(source="crawl", stage="validate_dataset"):
+                # Episodes with bad vectors are skipped like any other invalid episode
+                validation_errors.extend(drop_invalid_embeddings(result))
+                validated_data = validate_episode_data(result, mode="fast", prevalidated=True)
             timestamp = str(int(time.time()))
-            save_to_filename = f"app/content/buffy_all_seasons_{timestamp}.json"
-
-            with open(save_to_filename, "w") as f:
-                json.dump(validated_data.dict()["__root__"], f, indent=4)
+            save_to_filename = f"app/content/buffy_all_seasons_{timestamp}.{output_format}"
+
+            with INGEST_STAGE_SECONDS.time(source="crawl", stage="write"):
+                if output_format == "snapshot":
+                    save_to_filename = SnapshotStore().commit(
+                        iter_nested(validated_data.dict()["__root__"]), kind="crawl"
+                    )
+                elif output_format == "jsonl":
+                    write_snapshot(iter_nested(validated_data.dict()["__root__"]), save_to_filename)
+                else:
+                    with open(save_to_filename, "w") as f:
+                        json.dump(validated_data.dict()["__root__"], f, indent=4)
 
             logger.info(f"Saved validated crawl results to {save_to_filename}")
             
@@ -0,0 +1,515 @@
+"""Vector search backends.
+
+A ``VectorBackend`` stores one or more named vectors per episode (e.g.
+``summary_embedding``) and answers cosine KNN queries, optionally limited to
+some seasons. Two implementations:
+
+* ``NumpyBackend`` keeps normalized float32 matrices in process; a query is
+  one matrix-vector product, with no network hop. With ``reduced_dim`` the
+  scan runs over PCA-projected vectors and the best candidates are reranked
+  with the full ones (see ``projection``).
+* ``RedisBackend`` stores episodes as RedisJSON documents and queries the
+  RediSearch vector index.
+
+Hits carry a cosine similarity (higher is better) whatever the backend.
+"""
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import redis
+from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+from redis.commands.search.query import Query
+
+from app.services import embed
+from app.services.monitoring.metrics import SEARCH_STAGE_SECONDS
+from app.services.search.projection import Projection, fit_pca
+from app.services.storage.episode_jsonl import EpisodeRecord
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIELD = "summary_embedding"
+VECTOR_FIELDS = ("summary_embedding", "synopsis_embedding", "quotes_embedding")
+UPSERT_BATCH = 500
+# Bound on the (queries x items) score matrix of one knn_batch pass
+BATCH_SCORE_BYTES = 64 * 1024 * 1024
+
+
+def episode_key(season: int, episode: str) -> str:
+    """Key shared by all backends, e.g. ``buffy:s03:e01``."""
+    return f"{embed.KEY_PREFIX}s{season:02}:e{episode}"
+
+
+def parse_key(key: str) -> Tuple[int, str]:
+    """Inverse of episode_key: ``buffy:s03:e01`` -> (3, "01")."""
+    _, season_part, episode_part = key.rsplit(":", 2)
+    return int(season_part[1:]), episode_part[1:]
+
+
+@dataclass
+class VectorItem:
+    key: str
+    season: int
+    episode: str
+    vectors: Dict[str, Optional[np.ndarray]]
+    # Extra fields stored alongside the vectors by backends that keep documents (Redis)
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class VectorHit:
+    key: str
+    season: int
+    episode: str
+    score: float
+
+
+def items_from_records(records: Iterable[EpisodeRecord]) -> Iterator[VectorItem]:
+    """Build items from document store records, reusing their stored embeddings."""
+    for season_label, episode_num, episode in records:
+        season_num = int(season_label.split("_")[1])
+        vectors = {
+            name: np.asarray(episode[name], dtype=np.float32) if episode.get(name) else None
+            for name in VECTOR_FIELDS
+        }
+        payload = {
+            "synopsis": " ".join(episode.get("synopsis") or []),
+            "summary": " ".join(episode.get("summary") or []),
+            "metadata": {
+                "season": season_num,
+                "episode": episode_num,
+                "title": episode.get("title"),
+                "airdate": episode.get("airdate"),
+            },
+        }
+        yield VectorItem(episode_key(season_num, episode_num), season_num, episode_num, vectors, payload)
+
+
+class VectorBackend(ABC):
+    name = ""
+    # False for backends that lose their contents on restart and must be reloaded
+    persistent = True
+
+    @abstractmethod
+    def upsert(self, items: Iterable[VectorItem]) -> int:
+        """Insert or replace items. Returns the number written."""
+
+    @abstractmethod
+    def delete(self, keys: Iterable[str]) -> int:
+        """Remove items by key. Returns the number removed."""
+
+    @abstractmethod
+    def knn(
+        self,
+        vector: np.ndarray,
+        k: int,
+        field: str = DEFAULT_FIELD,
+        seasons: Optional[Iterable[int]] = None,
+        keys: Optional[Collection[str]] = None,
+    ) -> List[VectorHit]:
+        """The ``k`` nearest items by cosine similarity, best first.
+
+        ``seasons`` restricts the search to those seasons (filtered KNN).
+        ``keys`` restricts it to those items (e.g. from the entity index),
+        which are scored exactly, without scanning the rest.
+        """
+
+    def knn_batch(
+        self,
+        vectors: np.ndarray,
+        k: int,
+        field: str = DEFAULT_FIELD,
+        seasons: Optional[Sequence[Optional[Iterable[int]]]] = None,
+        keys: Optional[Sequence[Optional[Collection[str]]]] = None,
+    ) -> List[List[VectorHit]]:
+        """``knn`` for each row of ``vectors``; ``seasons``/``keys`` hold one filter (or None) per row.
+
+        This default runs the queries one by one.
+        """
+        return [
+            self.knn(
+                vector, k, field,
+                seasons[i] if seasons is not None else None,
+                keys[i] if keys is not None else None,
+            )
+            for i, vector in enumerate(vectors)
+        ]
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Size and health information for /api/test and the admin endpoints."""
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _map_array(array: np.ndarray, path: Path) -> np.ndarray:
+    # Written aside and renamed, so processes still mapping the old file keep a consistent copy
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, np.ascontiguousarray(array))
+    os.replace(tmp, path)
+    return np.load(path, mmap_mode="r")
+
+
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+@dataclass
+class _FieldIndex:
+    keys: List[str]
+    seasons: np.ndarray
+    matrix: np.ndarray  # (n, dim) float32, rows normalized
+    rows: Dict[str, int] = field(default_factory=dict)
+    # First-pass scan over PCA-projected rows, when the backend has reduced_dim
+    reduced: Optional[np.ndarray] = None  # (n, reduced_dim) float32
+    projection: Optional[Projection] = None
+
+
+class NumpyBackend(VectorBackend):
+    """In-process exact KNN over normalized float32 matrices.
+
+    Writes only mark the index dirty; matrices are rebuilt on the next query,
+    so bulk loads cost one rebuild. Queries read an immutable snapshot of the
+    matrices and need no lock.
+
+    ``reduced_dim`` enables the two-pass scan: ``k * rerank`` candidates from
+    the projected matrix, rescored exactly. Projections come from
+    ``projections`` (field -> Projection) or are fitted on the first rebuild
+    and kept there, so new items are projected consistently.
+    """
+
+    name = "numpy"
+    persistent = False
+
+    def __init__(
+        self,
+        reduced_dim: Optional[int] = None,
+        rerank: int = 4,
+        projections: Optional[Dict[str, Projection]] = None,
+    ):
+        self.reduced_dim = reduced_dim or None
+        self.rerank = max(rerank, 1)
+        self.projections: Dict[str, Projection] = dict(projections or {})
+        self._items: Dict[str, VectorItem] = {}
+        self._fields: Dict[str, _FieldIndex] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def upsert(self, items: Iterable[VectorItem]) -> int:
+        written = 0
+        with self._lock:
+            for item in items:
+                # Only vectors are kept; payloads are served by the document store
+                self._items[item.key] = VectorItem(item.key, item.season, item.episode, item.vectors)
+                written += 1
+            self._dirty = True
+        return written
+
+    def delete(self, keys: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for key in keys:
+                removed += self._items.pop(key, None) is not None
+            self._dirty = True
+        return removed
+
+    def _index(self) -> Dict[str, _FieldIndex]:
+        if not self._dirty:
+            return self._fields
+        with self._lock:
+            if self._dirty:
+                fields: Dict[str, _FieldIndex] = {}
+                for name in VECTOR_FIELDS:
+                    rows = [item for item in self._items.values() if item.vectors.get(name) is not None]
+                    if not rows:
+                        continue
+                    matrix = _normalize(np.asarray([item.vectors[name] for item in rows], dtype=np.float32))
+                    fields[name] = _FieldIndex(
+                        keys=[item.key for item in rows],
+                        seasons=np.asarray([item.season for item in rows], dtype=np.int32),
+                        matrix=matrix,
+                        rows={item.key: i for i, item in enumerate(rows)},
+                    )
+                    if self.reduced_dim and self.reduced_dim < matrix.shape[1]:
+                        projection = self._projection(name, matrix)
+                        fields[name].projection = projection
+                        fields[name].reduced = projection.transform_items(matrix, self.reduced_dim)
+                self._fields = fields
+                self._dirty = False
+        return self._fields
+
+    def _projection(self, name: str, matrix: np.ndarray) -> Projection:
+        projection = self.projections.get(name)
+        if (
+            projection is None
+            or projection.source_dimension != matrix.shape[1]
+            or projection.max_dimension < self.reduced_dim
+        ):
+            projection = fit_pca(matrix, self.reduced_dim, field=name)
+            self.projections[name] = projection
+            logger.info(
+                f"Fitted {self.reduced_dim}-d projection for {name} on {len(matrix)} vectors "
+                f"({projection.retained_variance(self.reduced_dim):.1%} variance retained)"
+            )
+        return projection
+
+    def knn(
+        self,
+        vector: np.ndarray,
+        k: int,
+        field: str = DEFAULT_FIELD,
+        seasons: Optional[Iterable[int]] = None,
+        keys: Optional[Collection[str]] = None,
+    ) -> List[VectorHit]:
+        with SEARCH_STAGE_SECONDS.time(backend=self.name, stage="knn"):
+            index = self._index().get(field)
+            if index is None or k <= 0:
+                return []
+            query = _normalize(np.asarray(vector, dtype=np.float32))
+            if keys is not None:
+                rows = np.asarray(sorted(index.rows[key] for key in keys if key in index.rows), dtype=np.int64)
+                if seasons is not None and len(rows):
+                    rows = rows[np.isin(index.seasons[rows], list(seasons))]
+                exact = index.matrix[rows] @ query
+                top = _top(exact, k)
+                ranked = zip(rows[top], exact[top])
+            elif index.reduced is None:
+                scores = self._filter(index, index.matrix @ query, seasons)
+                top = _top(scores, k)
+                ranked = zip(top, scores[top])
+            else:
+                reduced_query = index.projection.transform_query(query, self.reduced_dim)
+                approx = self._filter(index, index.reduced @ reduced_query, seasons)
+                candidates = _top(approx, k * self.rerank)
+                candidates = candidates[approx[candidates] > -np.inf]
+                exact = index.matrix[candidates] @ query
+                top = _top(exact, k)
+                ranked = zip(candidates[top], exact[top])
+            hits = []
+            for i, score in ranked:
+                if score == -np.inf:
+                    break
+                season, episode = parse_key(index.keys[i])
+                hits.append(VectorHit(index.keys[i], season, episode, float(score)))
+            return hits
+
+    def knn_batch(
+        self,
+        vectors: np.ndarray,
+        k: int,
+        field: str = DEFAULT_FIELD,
+        seasons: Optional[Sequence[Optional[Iterable[int]]]] = None,
+        keys: Optional[Sequence[Optional[Collection[str]]]] = None,
+    ) -> List[List[VectorHit]]:
+        """All queries scored with one matrix-matrix product per chunk, then a row-wise top-k.
+
+        Always exact: with many queries the full matrix product costs little
+        more than the reduced one, so the PCA first pass is skipped.
+        """
+        queries = _normalize(np.atleast_2d(np.asarray(vectors, dtype=np.float32)))
+        index = self._index().get(field)
+        if index is None or k <= 0 or not len(index.keys):
+            return [[] for _ in range(len(queries))]
+        k = min(k, len(index.keys))
+        chunk = max(1, BATCH_SCORE_BYTES // (4 * len(index.keys)))
+        results: List[List[VectorHit]] = []
+        for start in range(0, len(queries), chunk):
+            with SEARCH_STAGE_SECONDS.time(backend=self.name, stage="knn_batch"):
+                scores = queries[start:start + chunk] @ index.matrix.T
+                for row in range(len(scores)):
+                    i = start + row
+                    row_seasons = seasons[i] if seasons is not None else None
+                    row_keys = keys[i] if keys is not None else None
+                    if row_seasons is not None:
+                        scores[row, ~np.isin(index.seasons, list(row_seasons))] = -np.inf
+                    if row_keys is not None:
+                        allowed = np.zeros(len(index.keys), dtype=bool)
+                        allowed[[index.rows[key] for key in row_keys if key in index.rows]] = True
+                        scores[row, ~allowed] = -np.inf
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                top_scores = np.take_along_axis(scores, top, axis=1)
+                order = np.argsort(-top_scores, axis=1)
+                top = np.take_along_axis(top, order, axis=1)
+                top_scores = np.take_along_axis(top_scores, order, axis=1)
+            for row_top, row_scores in zip(top.tolist(), top_scores.tolist()):
+                hits = []
+                for i, score in zip(row_top, row_scores):
+                    if score == -np.inf:
+                        break
+                    season, episode = parse_key(index.keys[i])
+                    hits.append(VectorHit(index.keys[i], season, episode, float(score)))
+                results.append(hits)
+        return results
+
+    @staticmethod
+    def _filter(index: _FieldIndex, scores: np.ndarray, seasons: Optional[Iterable[int]]) -> np.ndarray:
+        if seasons is None:
+            return scores
+        return np.where(np.isin(index.seasons, list(seasons)), scores, -np.inf)
+
+    def map_matrices(self, directory: Path) -> int:
+        """Move the current matrices into read-only memory-mapped files under ``directory``.
+
+        Processes forked afterwards (and any other process mapping the same
+        files) share one copy through the page cache, and since the mapping
+        is read-only it can never be copied on write. A later upsert rebuilds
+        ordinary in-memory matrices. Returns the number of bytes mapped.
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        mapped = 0
+        for name, index in self._index().items():
+            index.matrix = _map_array(index.matrix, directory / f"vectors_{name}.npy")
+            mapped += index.matrix.nbytes
+            if index.reduced is not None:
+                index.reduced = _map_array(index.reduced, directory / f"vectors_{name}_reduced.npy")
+                mapped += index.reduced.nbytes
+        return mapped
+
+    def stats(self) -> Dict[str, Any]:
+        fields = self._index()
+        return {
+            "backend": self.name,
+            "items": len(self._items),
+            "fields": {name: len(index.keys) for name, index in fields.items()},
+            "memory_bytes": sum(index.matrix.nbytes for index in fields.values()),
+            "memory_mapped": any(isinstance(index.matrix, np.memmap) for index in fields.values()),
+            "reduced_dim": self.reduced_dim,
+            "reduced_memory_bytes": sum(
+                index.reduced.nbytes for index in fields.values() if index.reduced is not None
+            ),
+        }
+
+
+class RedisBackend(VectorBackend):
+    """RediSearch vector index over RedisJSON episode documents.
+
+    Uses its own client with short socket timeouts, so a stalled Redis
+    raises quickly instead of holding up the request.
+    """
+
+    name = "redis"
+
+    def __init__(self, client=None):
+        if client is None:
+            client = redis.Redis(
+                host=embed.REDIS_HOST,
+                port=embed.REDIS_PORT,
+                decode_responses=True,
+                socket_timeout=embed.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=embed.REDIS_SOCKET_TIMEOUT,
+            )
+        self.client = client
+
+    def upsert(self, items: Iterable[VectorItem]) -> int:
+        written = 0
+        pipeline = self.client.pipeline()
+        for item in items:
+            obj = dict(item.payload)
+            obj.setdefault("metadata", {"season": item.season, "episode": item.episode})
+            for name, vector in item.vectors.items():
+                obj[name] = vector.astype(np.float32).tolist() if vector is not None else None
+            pipeline.json().set(item.key, "$", obj)
+            written += 1
+            if written % UPSERT_BATCH == 0:
+                pipeline.execute()
+        pipeline.execute()
+        return written
+
+    def delete(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        return self.client.delete(*keys) if keys else 0
+
+    def create_index(self) -> Dict[str, Any]:
+        definition = IndexDefinition(prefix=[embed.KEY_PREFIX], index_type=IndexType.JSON)
+        self.client.ft(embed.INDEX_NAME).create_index(
+            fields=embed.index_schema(), definition=definition
+        )
+        return self.client.ft(embed.INDEX_NAME).info()
+
+    @staticmethod
+    def _filter(seasons: Optional[Iterable[int]]) -> str:
+        if seasons is None:
+            return "*"
+        clauses = [f"@season:[{int(s)} {int(s)}]" for s in seasons]
+        # An empty season list matches nothing, as in NumpyBackend
+        return " | ".join(clauses) if clauses else "@season:[-1 -1]"
+
+    def knn(
+        self,
+        vector: np.ndarray,
+        k: int,
+        field: str = DEFAULT_FIELD,
+        seasons: Optional[Iterable[int]] = None,
+        keys: Optional[Collection[str]] = None,
+    ) -> List[VectorHit]:
+        if k <= 0:
+            return []
+        if keys is not None:
+            return self._knn_keys(vector, k, field, seasons, keys)
+        query = (
+            Query(f"({self._filter(seasons)})=>[KNN {int(k)} @{field} $query_vector AS vector_score]")
+            .sort_by("vector_score")
+            .return_fields("vector_score")
+            .paging(0, int(k))
+            .dialect(2)
+        )
+        params = {"query_vector": np.asarray(vector, dtype=np.float32).tobytes()}
+        with SEARCH_STAGE_SECONDS.time(backend=self.name, stage="knn"):
+            docs = self.client.ft(embed.INDEX_NAME).search(query, params).docs
+        hits = []
+        for doc in docs:
+            season, episode = parse_key(doc.id)
+            # RediSearch returns cosine distance
+            hits.append(VectorHit(doc.id, season, episode, 1.0 - float(doc.vector_score)))
+        return hits
+
+    def _knn_keys(
+        self,
+        vector: np.ndarray,
+        k: int,
+        field: str,
+        seasons: Optional[Iterable[int]],
+        keys: Collection[str],
+    ) -> List[VectorHit]:
+        """Score only ``keys``: RediSearch cannot prefilter by key, so fetch their vectors."""
+        keys = sorted(keys)
+        if seasons is not None:
+            allowed = set(seasons)
+            keys = [key for key in keys if parse_key(key)[0] in allowed]
+        if not keys:
+            return []
+        with SEARCH_STAGE_SECONDS.time(backend=self.name, stage="knn"):
+            found = self.client.json().mget(keys, f"$.{field}")
+            present = [(key, value[0]) for key, value in zip(keys, found) if value and value[0]]
+            if not present:
+                return []
+            matrix = _normalize(np.asarray([v for _, v in present], dtype=np.float32))
+            scores = matrix @ _normalize(np.asarray(vector, dtype=np.float32))
+            hits = []
+            for i in _top(scores, k).tolist():
+                season, episode = parse_key(present[i][0])
+                hits.append(VectorHit(present[i][0], season, episode, float(scores[i])))
+        return hits
+
+    def stats(self) -> Dict[str, Any]:
+        info = self.client.ft(embed.INDEX_NAME).info()
+        return {
+            "backend": self.name,
+            "items": int(info.get("num_docs", 0)),
+            "index": info.get("index_name"),
+        }
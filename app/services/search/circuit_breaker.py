@@ -0,0 +1,209 @@
+"""Circuit breaker and failover between vector backends.
+
+The breaker counts consecutive failures of a dependency (errors, or calls
+slower than ``slow_call_seconds``). After ``failure_threshold`` of them it
+opens, and callers skip the dependency entirely for ``reset_timeout``
+seconds. It then lets a single trial call through (half-open): success
+closes it again, failure re-opens it.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Collection, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.monitoring.metrics import BACKEND_FAILOVERS, CIRCUIT_STATE
+from app.services.search.backends import DEFAULT_FIELD, VectorBackend, VectorHit, VectorItem
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency while its circuit is open."""
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        slow_call_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.slow_call_seconds = slow_call_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._last_error: Optional[str] = None
+        CIRCUIT_STATE.set(_STATE_VALUES[CLOSED], name=name)
+
+    def _set_state(self, state: str):
+        if state != self._state:
+            logger.warning(f"Circuit {self.name}: {self._state} -> {state}")
+        self._state = state
+        CIRCUIT_STATE.set(_STATE_VALUES[state], name=self.name)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go through now. In half-open, only one trial at a time."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._set_state(HALF_OPEN)
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            self._set_state(CLOSED)
+
+    def record_failure(self, error: Optional[str] = None):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            self._last_error = error
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+                self._set_state(OPEN)
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call ``fn`` through the breaker; raises CircuitOpenError if it is open.
+
+        A call that succeeds but takes longer than ``slow_call_seconds`` still
+        returns its result, but counts as a failure.
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+        start = self._clock()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(f"{type(e).__name__}: {e}")
+            raise
+        elapsed = self._clock() - start
+        if self.slow_call_seconds is not None and elapsed > self.slow_call_seconds:
+            self.record_failure(f"slow call: {elapsed:.3f}s")
+        else:
+            self.record_success()
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": state,
+                "consecutive_failures": self._failures,
+                "last_error": self._last_error,
+            }
+
+
+class FailoverBackend(VectorBackend):
+    """Query ``primary`` through a circuit breaker, falling back to ``fallback``.
+
+    Writes go to both so the fallback is always ready to serve; a failed
+    primary write is logged and counted by the breaker, not raised.
+    """
+
+    name = "failover"
+
+    def __init__(self, primary: VectorBackend, fallback: VectorBackend, breaker: CircuitBreaker):
+        self.primary = primary
+        self.fallback = fallback
+        self.breaker = breaker
+        self.persistent = primary.persistent and fallback.persistent
+
+    def _primary_write(self, method: str, values: List[Any]) -> Optional[int]:
+        try:
+            return self.breaker.call(getattr(self.primary, method), values)
+        except CircuitOpenError:
+            return None
+        except Exception as e:
+            logger.warning(f"{self.primary.name} {method} failed: {e}")
+            return None
+
+    def upsert(self, items: Iterable[VectorItem]) -> int:
+        items = list(items)
+        self._primary_write("upsert", items)
+        return self.fallback.upsert(items)
+
+    def delete(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        self._primary_write("delete", keys)
+        return self.fallback.delete(keys)
+
+    def knn(
+        self,
+        vector: np.ndarray,
+        k: int,
+        field: str = DEFAULT_FIELD,
+        seasons: Optional[Iterable[int]] = None,
+        keys: Optional[Collection[str]] = None,
+    ) -> List[VectorHit]:
+        seasons = list(seasons) if seasons is not None else None
+        try:
+            return self.breaker.call(self.primary.knn, vector, k, field, seasons, keys)
+        except CircuitOpenError:
+            reason = "circuit_open"
+        except Exception as e:
+            reason = "error"
+            logger.warning(f"{self.primary.name} knn failed, using {self.fallback.name}: {e}")
+        BACKEND_FAILOVERS.inc(primary=self.primary.name, fallback=self.fallback.name, reason=reason)
+        return self.fallback.knn(vector, k, field, seasons, keys)
+
+    def knn_batch(
+        self,
+        vectors: np.ndarray,
+        k: int,
+        field: str = DEFAULT_FIELD,
+        seasons: Optional[Sequence[Optional[Iterable[int]]]] = None,
+        keys: Optional[Sequence[Optional[Collection[str]]]] = None,
+    ) -> List[List[VectorHit]]:
+        seasons = [list(s) if s is not None else None for s in seasons] if seasons is not None else None
+        try:
+            return self.breaker.call(self.primary.knn_batch, vectors, k, field, seasons, keys)
+        except CircuitOpenError:
+            reason = "circuit_open"
+        except Exception as e:
+            reason = "error"
+            logger.warning(f"{self.primary.name} knn_batch failed, using {self.fallback.name}: {e}")
+        BACKEND_FAILOVERS.inc(primary=self.primary.name, fallback=self.fallback.name, reason=reason)
+        return self.fallback.knn_batch(vectors, k, field, seasons, keys)
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            primary = self.primary.stats()
+        except Exception as e:
+            primary = {"backend": self.primary.name, "error": str(e)}
+        return {
+            "backend": self.name,
+            "primary": primary,
+            "fallback": self.fallback.stats(),
+            "circuit": self.breaker.snapshot(),
+        }
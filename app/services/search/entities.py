@@ -0,0 +1,234 @@
+"""Inverted index from characters and cast to episodes.
+
+Built from the cast/character fields of the document store. Names are
+normalized and merged through alias groups, so "Jenny Calendar",
+"Janna Kalderash" and "Ms. Calendar" are one entity. Postings are sorted
+int32 episode ids per (entity, role), so AND/OR/NOT queries are merges of
+sorted arrays. An "appears" role unions every on-screen role ("mentioned"
+is excluded).
+
+Credits of the form "Actor as Character" index both names. The actor is a
+separate entity with the character's appearances.
+"""
+import logging
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.services.search.text import normalize, split_credit
+from app.services.storage.document_store import get_store
+from app.services.storage.episode_jsonl import EpisodeRecord
+
+logger = logging.getLogger(__name__)
+
+EpisodeKey = Tuple[int, str]
+
+# Store field -> role
+ROLE_FIELDS = {
+    "main_cast": "cast",
+    "guest_stars": "guest",
+    "recurring_characters": "recurring",
+    "first_appearances": "first_appearance",
+    "last_appearances": "last_appearance",
+    "characters_introduced": "introduced",
+    "characters_mentioned": "mentioned",
+    "characters_died": "died",
+}
+APPEARS = "appears"
+ANY = "any"
+APPEARANCE_ROLES = ("cast", "guest", "recurring", "first_appearance", "last_appearance", "introduced", "died")
+ROLES = tuple(dict.fromkeys(ROLE_FIELDS.values())) + (APPEARS, ANY)
+
+# Words never used alone as an alias for a longer name
+NOT_SHORT_NAMES = {"the", "mr", "mrs", "ms", "miss", "dr", "principal", "mayor", "agent", "professor", "of"}
+
+# Names that refer to the same character; the first is the canonical id
+ALIAS_GROUPS: Tuple[Tuple[str, ...], ...] = (
+    ("Buffy Summers", "Buffy", "Buffy Anne Summers", "The Slayer"),
+    ("Willow Rosenberg", "Willow"),
+    ("Xander Harris", "Xander", "Alexander Harris", "Alexander LaVelle Harris"),
+    ("Rupert Giles", "Giles", "Ripper"),
+    ("Cordelia Chase", "Cordelia", "Cordy"),
+    ("Angel", "Angelus", "Liam"),
+    ("Spike", "William the Bloody", "William"),
+    ("Jenny Calendar", "Janna Kalderash", "Janna", "Ms Calendar", "Miss Calendar"),
+    ("Anya", "Anyanka", "Anya Jenkins", "Aud"),
+    ("Faith", "Faith Lehane"),
+    ("Oz", "Daniel Osbourne"),
+    ("Joyce Summers", "Joyce"),
+    ("Dawn Summers", "Dawn"),
+    ("Drusilla", "Dru"),
+    ("The Master", "Master", "Heinrich Joseph Nest"),
+    ("Tara Maclay", "Tara"),
+    ("Riley Finn", "Riley"),
+    ("Principal Snyder", "Snyder"),
+    ("Mayor Richard Wilkins", "Richard Wilkins", "The Mayor", "Mayor Wilkins"),
+)
+
+
+@dataclass
+class EntityTerm:
+    name: str
+    role: str = APPEARS
+
+
+def _intersect(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Intersection of two sorted unique arrays: binary search of the shorter in the longer."""
+    if len(a) > len(b):
+        a, b = b, a
+    if not len(a):
+        return a
+    idx = np.searchsorted(b, a).clip(max=len(b) - 1)
+    return a[b[idx] == a]
+
+
+class EntityIndex:
+    """Immutable index; build a new one to pick up store changes."""
+
+    def __init__(self, records: Iterable[EpisodeRecord], alias_groups: Sequence[Sequence[str]] = ALIAS_GROUPS):
+        self.aliases: Dict[str, str] = {}
+        for group in alias_groups:
+            canonical = normalize(group[0])
+            for name in group:
+                self.aliases[normalize(name)] = canonical
+
+        episodes = []
+        for season_key, episode_num, episode in records:
+            episodes.append(((int(season_key.split("_")[1]), episode_num), episode))
+        episodes.sort(key=lambda item: (item[0][0], item[0][1]))
+        self.episodes: List[EpisodeKey] = [key for key, _ in episodes]
+        self.titles: List[str] = [episode.get("title", "") for _, episode in episodes]
+        self._ids = {key: i for i, key in enumerate(self.episodes)}
+
+        postings: Dict[str, Dict[str, Set[int]]] = defaultdict(lambda: defaultdict(set))
+        spellings: Dict[str, Counter] = defaultdict(Counter)
+        for doc, (_, episode) in enumerate(episodes):
+            for field, role in ROLE_FIELDS.items():
+                for entry in episode.get(field) or []:
+                    actor, character = split_credit(entry)
+                    for name in (character, actor):
+                        if not name:
+                            continue
+                        # "Jenny Calendar (flashback)" -> "Jenny Calendar"
+                        name = name.split("(")[0].strip()
+                        entity = self.canonical(name)
+                        if entity:
+                            postings[entity][role].add(doc)
+                            spellings[entity][name] += 1
+        self._add_unique_short_names(postings)
+
+        self._postings: Dict[str, Dict[str, np.ndarray]] = {}
+        for entity, roles in postings.items():
+            arrays = {role: np.fromiter(sorted(docs), dtype=np.int32) for role, docs in roles.items()}
+            appears = set().union(*(roles.get(role, set()) for role in APPEARANCE_ROLES))
+            arrays[APPEARS] = np.fromiter(sorted(appears), dtype=np.int32)
+            arrays[ANY] = np.fromiter(sorted(set().union(*roles.values())), dtype=np.int32)
+            self._postings[entity] = arrays
+        self.display = {entity: counts.most_common(1)[0][0] for entity, counts in spellings.items()}
+
+    @classmethod
+    def from_records(cls, records: Iterable[EpisodeRecord]) -> "EntityIndex":
+        return cls(records)
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def canonical(self, name: str) -> str:
+        """Normalized name with aliases applied (known to the index or not)."""
+        key = normalize(name)
+        return self.aliases.get(key, key)
+
+    def _add_unique_short_names(self, postings: Dict[str, Dict[str, Set[int]]]):
+        """Alias a one-word name to the only multi-word entity starting or ending with it.
+
+        "Snyder" finds "Principal Snyder"; "Summers" stays ambiguous (Buffy, Joyce, Dawn).
+        """
+        owners: Dict[str, Set[str]] = defaultdict(set)
+        for entity in postings:
+            words = entity.split()
+            if len(words) > 1:
+                owners[words[0]].add(entity)
+                owners[words[-1]].add(entity)
+        for word, entities in owners.items():
+            if len(word) < 3 or word in NOT_SHORT_NAMES:
+                continue
+            if len(entities) == 1 and word not in self.aliases and word not in postings:
+                self.aliases[word] = next(iter(entities))
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Canonical entity id for a name or alias, or None if unknown."""
+        entity = self.canonical(name)
+        return entity if entity in self._postings else None
+
+    def postings(self, name: str, role: str = APPEARS) -> np.ndarray:
+        """Sorted episode ids for ``name`` in ``role``; empty if unknown."""
+        if role not in ROLES:
+            raise ValueError(f"Unknown role {role!r}; choose from {', '.join(ROLES)}")
+        entity = self.resolve(name)
+        empty = np.zeros(0, dtype=np.int32)
+        return self._postings[entity].get(role, empty) if entity else empty
+
+    def roles(self, name: str) -> Dict[str, List[EpisodeKey]]:
+        """Every role of an entity with its episodes; empty if unknown."""
+        entity = self.resolve(name)
+        if entity is None:
+            return {}
+        return {role: [self.episodes[i] for i in docs.tolist()] for role, docs in self._postings[entity].items()}
+
+    def query(
+        self,
+        all_of: Sequence[EntityTerm] = (),
+        any_of: Sequence[EntityTerm] = (),
+        none_of: Sequence[EntityTerm] = (),
+        seasons: Optional[Iterable[int]] = None,
+    ) -> List[EpisodeKey]:
+        """Episodes matching every ``all_of`` term, at least one ``any_of`` term and no ``none_of`` term.
+
+        Episode order is by season, then episode number.
+        """
+        if not all_of and not any_of:
+            return []
+        # Rarest first keeps every intersection small
+        required = sorted((self.postings(t.name, t.role) for t in all_of), key=len)
+        if any_of:
+            required.append(np.unique(np.concatenate([self.postings(t.name, t.role) for t in any_of])))
+        docs = required[0]
+        for other in required[1:]:
+            docs = _intersect(docs, other)
+        if none_of and len(docs):
+            excluded = np.unique(np.concatenate([self.postings(t.name, t.role) for t in none_of]))
+            docs = docs[~np.isin(docs, excluded, assume_unique=True)]
+        keys = [self.episodes[i] for i in docs.tolist()]
+        if seasons is not None:
+            allowed = set(seasons)
+            keys = [key for key in keys if key[0] in allowed]
+        return keys
+
+    def title(self, key: EpisodeKey) -> str:
+        return self.titles[self._ids[key]]
+
+
+_index: Optional[EntityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_entity_index() -> EntityIndex:
+    """The shared index, built from the document store on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = EntityIndex.from_records(get_store().iter_records(with_embeddings=False))
+                logger.info(f"Entity index ready ({len(index)} entities, {len(index.episodes)} episodes)")
+                _index = index
+    return _index
+
+
+def set_entity_index(index: Optional[EntityIndex]):
+    """Replace the shared index; ``None`` rebuilds it on next use."""
+    global _index
+    with _index_lock:
+        _index = index
@@ -0,0 +1,216 @@
+"""PCA projection for a reduced first-pass vector scan.
+
+A projection is fitted once on the corpus and persisted next to the index.
+Components are ordered by explained variance, so any prefix of them is a
+valid lower-dimensional projection (Matryoshka-style truncation): one fit
+serves 32, 64, 128... dimensions.
+
+Ranking uses ``v . q = m . q + P(v - m) . Pq`` (for v near the PCA
+subspace), where ``m . q`` is constant per query. So items are stored as
+``P(v - m)``, queries as ``Pq``, and the reduced scores rank like cosine
+similarity on unit vectors. The top candidates are then reranked with the
+full vectors.
+
+Report memory saved and recall lost per dimension:
+
+    python -m app.services.search.projection --dims 32,64,128,256
+    python -m app.services.search.projection --corpus /tmp/corpus_100k.jsonl --k 10
+"""
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+FIT_CHUNK = 65536
+
+
+@dataclass
+class Projection:
+    mean: np.ndarray  # (dim,)
+    components: np.ndarray  # (max_dim, dim), rows by decreasing variance
+    explained_variance_ratio: np.ndarray  # (max_dim,)
+    field: str = ""
+    fitted_on: int = 0
+
+    @property
+    def source_dimension(self) -> int:
+        return self.mean.shape[0]
+
+    @property
+    def max_dimension(self) -> int:
+        return self.components.shape[0]
+
+    def transform_items(self, vectors: np.ndarray, dim: int) -> np.ndarray:
+        return ((vectors - self.mean) @ self.components[:dim].T).astype(np.float32)
+
+    def transform_query(self, vector: np.ndarray, dim: int) -> np.ndarray:
+        return (self.components[:dim] @ vector).astype(np.float32)
+
+    def retained_variance(self, dim: int) -> float:
+        return float(self.explained_variance_ratio[:dim].sum())
+
+    def save(self, path: Union[str, Path]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp.npz")
+        np.savez(
+            tmp,
+            mean=self.mean,
+            components=self.components,
+            explained_variance_ratio=self.explained_variance_ratio,
+            field=np.array(self.field),
+            fitted_on=np.array(self.fitted_on),
+        )
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "Projection":
+        with np.load(path) as data:
+            return cls(
+                mean=data["mean"],
+                components=data["components"],
+                explained_variance_ratio=data["explained_variance_ratio"],
+                field=str(data["field"]),
+                fitted_on=int(data["fitted_on"]),
+            )
+
+
+def fit_pca(vectors: np.ndarray, max_dim: Optional[int] = None, field: str = "") -> Projection:
+    """Fit PCA via the (dim x dim) covariance, accumulated in chunks.
+
+    Never materializes a centered copy of the corpus, so it works for
+    millions of rows.
+    """
+    n, dim = vectors.shape
+    max_dim = min(max_dim or dim, dim)
+    mean = np.zeros(dim, dtype=np.float64)
+    for start in range(0, n, FIT_CHUNK):
+        mean += vectors[start:start + FIT_CHUNK].sum(axis=0, dtype=np.float64)
+    mean /= max(n, 1)
+    cov = np.zeros((dim, dim), dtype=np.float64)
+    for start in range(0, n, FIT_CHUNK):
+        chunk = vectors[start:start + FIT_CHUNK].astype(np.float64) - mean
+        cov += chunk.T @ chunk
+    cov /= max(n - 1, 1)
+    eigenvalues, eigenvectors = np.linalg.eigh(cov)
+    order = np.argsort(eigenvalues)[::-1][:max_dim]
+    total = eigenvalues.clip(min=0).sum() or 1.0
+    return Projection(
+        mean=mean.astype(np.float32),
+        components=eigenvectors[:, order].T.astype(np.float32),
+        explained_variance_ratio=(eigenvalues[order].clip(min=0) / total).astype(np.float32),
+        field=field,
+        fitted_on=n,
+    )
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    k = min(k, scores.shape[-1])
+    top = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    return np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, -1), axis=-1), -1)
+
+
+def evaluate(
+    vectors: np.ndarray,
+    dims: Iterable[int],
+    k: int = 10,
+    n_queries: int = 200,
+    rerank: int = 4,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """Recall@k and memory per dimension, on held-out corpus vectors as queries.
+
+    ``recall`` uses the reduced scan alone; ``recall_reranked`` rescores the
+    top ``k * rerank`` reduced candidates with full vectors, as NumpyBackend does.
+    """
+    rng = np.random.default_rng(seed)
+    vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+    held_out = rng.choice(len(vectors), size=min(n_queries, len(vectors) // 10 or 1), replace=False)
+    mask = np.ones(len(vectors), dtype=bool)
+    mask[held_out] = False
+    queries, index = vectors[held_out], vectors[mask]
+
+    start = time.perf_counter()
+    exact = _top_k(queries @ index.T, k)
+    full_seconds = time.perf_counter() - start
+    projection = fit_pca(index, max(dims))
+
+    rows = [{
+        "dimension": index.shape[1],
+        "index_bytes": index.nbytes,
+        "memory_saved": 0.0,
+        "retained_variance": 1.0,
+        "recall": 1.0,
+        "recall_reranked": 1.0,
+        "scan_ms_per_query": round(full_seconds / len(queries) * 1000, 4),
+    }]
+    for dim in sorted(dims):
+        reduced_index = projection.transform_items(index, dim)
+        reduced_queries = queries @ projection.components[:dim].T
+        start = time.perf_counter()
+        approx_scores = reduced_queries @ reduced_index.T
+        approx = _top_k(approx_scores, k)
+        reduced_seconds = time.perf_counter() - start
+        candidates = _top_k(approx_scores, k * rerank)
+        rescored = np.einsum("qd,qcd->qc", queries, index[candidates])
+        reranked = np.take_along_axis(candidates, _top_k(rescored, k), -1)
+        rows.append({
+            "dimension": dim,
+            "index_bytes": reduced_index.nbytes,
+            "memory_saved": round(1 - reduced_index.nbytes / index.nbytes, 4),
+            "retained_variance": round(projection.retained_variance(dim), 4),
+            "recall": round(_recall(approx, exact), 4),
+            "recall_reranked": round(_recall(reranked, exact), 4),
+            "scan_ms_per_query": round(reduced_seconds / len(queries) * 1000, 4),
+        })
+    return rows
+
+
+def _recall(found: np.ndarray, expected: np.ndarray) -> float:
+    hits = sum(len(set(f) & set(e)) for f, e in zip(found.tolist(), expected.tolist()))
+    return hits / expected.size
+
+
+def _load_vectors(field: str, corpus: Optional[str]) -> np.ndarray:
+    if corpus:
+        from app.services.storage.episode_jsonl import iter_snapshot
+        records = iter_snapshot(corpus)
+    else:
+        from app.services.storage.document_store import get_store
+        records = get_store().iter_records()
+    rows = [episode[field] for _, _, episode in records if episode.get(field)]
+    return np.asarray(rows, dtype=np.float32)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Report recall and memory for PCA-reduced search.")
+    parser.add_argument("--field", default="summary_embedding")
+    parser.add_argument("--dims", default="32,64,128,256")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--rerank", type=int, default=4, help="Candidates per result rescored with full vectors")
+    parser.add_argument("--corpus", help="JSONL snapshot to read instead of the document store")
+    args = parser.parse_args(argv)
+
+    vectors = _load_vectors(args.field, args.corpus)
+    if len(vectors) < 20:
+        print(f"Need at least 20 vectors in {args.field}, found {len(vectors)}")
+        return 1
+    dims = [int(d) for d in args.dims.split(",") if d.strip()]
+    print(f"{len(vectors)} vectors, recall@{args.k}, rerank x{args.rerank}")
+    print(f"  {'dim':>5} {'index MB':>9} {'saved':>7} {'variance':>9} {'recall':>7} {'reranked':>9} {'scan ms':>8}")
+    for row in evaluate(vectors, dims, k=args.k, n_queries=args.queries, rerank=args.rerank):
+        print(
+            f"  {row['dimension']:>5} {row['index_bytes'] / 1e6:>9.2f} {row['memory_saved']:>7.1%} "
+            f"{row['retained_variance']:>9.3f} {row['recall']:>7.3f} {row['recall_reranked']:>9.3f} "
+            f"{row['scan_ms_per_query']:>8.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
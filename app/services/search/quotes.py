@@ -0,0 +1,264 @@
+"""Quote search: each quote on its own, with speaker and episode.
+
+Quote paragraphs are split into lines ("Buffy: Grr, argh."), each keeping
+its speaker. Lines are found three ways:
+
+* ``exact``: intersect the character-trigram postings of the phrase
+  (rarest first), then confirm with a substring check.
+* ``fuzzy``: rank lines by the share of the phrase's trigrams they contain,
+  which tolerates typos and small wording changes.
+* ``semantic``: cosine similarity between per-line vectors and the encoded
+  query. Vectors are computed on first use and cached in
+  ``<store>/index/quote_vectors.npz``, keyed by line text, so unchanged
+  quotes are not re-embedded.
+
+``auto`` tries exact, then fuzzy, then semantic.
+"""
+import hashlib
+import logging
+import re
+import threading
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.embeddings.batch import embed_texts
+from app.services.embeddings.model import get_embedder
+from app.services.search.text import normalize
+from app.services.storage.document_store import get_store
+from app.services.storage.episode_jsonl import EpisodeRecord
+
+logger = logging.getLogger(__name__)
+
+MODES = ("auto", "exact", "fuzzy", "semantic")
+# Share of the query's trigrams a line must contain to count as a fuzzy match
+FUZZY_MIN_SCORE = 0.6
+SEMANTIC_MIN_SCORE = 0.3
+
+_SPEAKER = re.compile(r"^(?P<speaker>[A-Z][\w.'\- ]{0,40}?):\s+(?P<text>.+)$", re.DOTALL)
+# A new "Name: " after the end of a sentence starts a new line of dialogue
+_LINE_BREAK = re.compile(r"(?<=[.!?\"'])\s+(?=[A-Z][\w.'\- ]{0,40}?:\s)")
+_WHO_SAID = re.compile(r"^\s*who\s+said\s+(?P<phrase>.+?)\s*\??\s*$", re.IGNORECASE)
+
+
+@dataclass
+class Quote:
+    text: str
+    speaker: Optional[str]
+    season: int
+    episode: str
+    title: str = ""
+
+
+@dataclass
+class QuoteHit:
+    quote: Quote
+    score: float
+    match: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self.quote), "score": round(self.score, 4), "match": self.match}
+
+
+def split_quote(paragraph: str) -> List[Tuple[Optional[str], str]]:
+    """Split a quote paragraph into (speaker, line) pairs; lines without "Name:" have no speaker."""
+    lines = []
+    for part in _LINE_BREAK.split(paragraph.strip()):
+        match = _SPEAKER.match(part.strip())
+        if match:
+            lines.append((match.group("speaker").strip(), match.group("text").strip()))
+        elif part.strip():
+            lines.append((None, part.strip()))
+    return lines
+
+
+def strip_question(query: str) -> str:
+    """``who said "Grr, argh"?`` -> ``Grr, argh``; other queries pass through."""
+    match = _WHO_SAID.match(query)
+    phrase = match.group("phrase") if match else query
+    return phrase.strip().strip("\"'“”‘’")
+
+
+def _trigrams(text: str) -> List[str]:
+    return sorted({text[i:i + 3] for i in range(len(text) - 2)})
+
+
+class QuoteIndex:
+    """Immutable quote index; build a new one to pick up store changes."""
+
+    def __init__(self, records: Iterable[EpisodeRecord], canonical: Callable[[str], str] = normalize):
+        self.quotes: List[Quote] = []
+        for season_key, episode_num, episode in records:
+            season_num = int(season_key.split("_")[1])
+            for paragraph in episode.get("quotes") or []:
+                for speaker, text in split_quote(paragraph):
+                    self.quotes.append(Quote(text, speaker, season_num, episode_num, episode.get("title", "")))
+        self.quotes.sort(key=lambda q: (q.season, q.episode))
+        self._texts = [normalize(q.text) for q in self.quotes]
+        self._speakers = [canonical(q.speaker) if q.speaker else None for q in self.quotes]
+        self._lengths = np.asarray([len(t) for t in self._texts], dtype=np.int32)
+        self.canonical = canonical
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for i, text in enumerate(self._texts):
+            for gram in _trigrams(text):
+                postings[gram].append(i)
+        self._postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self._vectors: Optional[np.ndarray] = None
+        self._vectors_lock = threading.Lock()
+
+    @classmethod
+    def from_records(cls, records: Iterable[EpisodeRecord], canonical: Callable[[str], str] = normalize) -> "QuoteIndex":
+        return cls(records, canonical)
+
+    def __len__(self) -> int:
+        return len(self.quotes)
+
+    def _allowed(self, speaker: Optional[str]) -> Optional[np.ndarray]:
+        if not speaker:
+            return None
+        wanted = self.canonical(speaker)
+        return np.asarray([s == wanted for s in self._speakers], dtype=bool)
+
+    def _rank(self, ids: np.ndarray, scores: np.ndarray, limit: int, match: str) -> List[QuoteHit]:
+        # Best score first; among equals the shorter line is the closer match
+        order = np.lexsort((self._lengths[ids], -scores))[:limit]
+        return [QuoteHit(self.quotes[ids[i]], float(scores[i]), match) for i in order.tolist()]
+
+    def exact(self, phrase: str, limit: int = 10, speaker: Optional[str] = None) -> List[QuoteHit]:
+        """Lines containing ``phrase`` (after normalization)."""
+        phrase = normalize(phrase)
+        if not phrase:
+            return []
+        grams = _trigrams(phrase)
+        if grams:
+            # Rarest first: an unknown trigram empties the candidates at once
+            lists = sorted((self._postings.get(g, np.zeros(0, dtype=np.int32)) for g in grams), key=len)
+            candidates = lists[0]
+            for other in lists[1:]:
+                if not len(candidates):
+                    break
+                idx = np.searchsorted(other, candidates).clip(max=len(other) - 1)
+                candidates = candidates[other[idx] == candidates]
+        else:
+            # Under three characters there is no trigram to look up
+            candidates = np.arange(len(self.quotes), dtype=np.int32)
+        allowed = self._allowed(speaker)
+        ids = np.asarray(
+            [i for i in candidates.tolist() if phrase in self._texts[i] and (allowed is None or allowed[i])],
+            dtype=np.int32,
+        )
+        # The whole line being the phrase beats the phrase inside a longer line
+        scores = np.asarray([len(phrase) / max(self._lengths[i], 1) for i in ids.tolist()], dtype=np.float64)
+        return self._rank(ids, scores, limit, "exact")
+
+    def fuzzy(self, phrase: str, limit: int = 10, speaker: Optional[str] = None) -> List[QuoteHit]:
+        """Lines sharing at least FUZZY_MIN_SCORE of the phrase's trigrams."""
+        grams = _trigrams(normalize(phrase))
+        lists = [self._postings[g] for g in grams if g in self._postings]
+        if not grams or not lists:
+            return []
+        counts = np.bincount(np.concatenate(lists), minlength=len(self.quotes))
+        scores = counts / len(grams)
+        allowed = self._allowed(speaker)
+        if allowed is not None:
+            scores = np.where(allowed, scores, 0)
+        ids = np.flatnonzero(scores >= FUZZY_MIN_SCORE).astype(np.int32)
+        return self._rank(ids, scores[ids], limit, "fuzzy")
+
+    def _vector_file(self) -> Path:
+        return get_store().base_path / "index" / "quote_vectors.npz"
+
+    def vectors(self, encoder=None) -> np.ndarray:
+        """Normalized per-line vectors, reusing cached ones for unchanged lines."""
+        if self._vectors is not None:
+            return self._vectors
+        with self._vectors_lock:
+            if self._vectors is None:
+                self._vectors = self._load_vectors(encoder)
+        return self._vectors
+
+    def _load_vectors(self, encoder=None) -> np.ndarray:
+        digests = [hashlib.sha1(q.text.encode("utf-8")).hexdigest() for q in self.quotes]
+        cached: Dict[str, np.ndarray] = {}
+        path = self._vector_file()
+        if path.exists():
+            with np.load(path) as data:
+                cached = dict(zip(data["digests"].tolist(), data["vectors"]))
+        missing = [(i, q.text) for i, q in enumerate(self.quotes) if digests[i] not in cached]
+        if missing:
+            for i, vector in embed_texts(missing, encoder=encoder, source="quotes"):
+                if vector is not None:
+                    cached[digests[i]] = vector
+        dim = len(next(iter(cached.values()))) if cached else 0
+        vectors = np.asarray([cached.get(d, np.zeros(dim)) for d in digests], dtype=np.float32).reshape(len(digests), dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors /= norms
+        if missing:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            np.savez(path, digests=np.asarray(digests), vectors=vectors)
+            logger.info(f"Embedded {len(missing)} quotes, {len(digests) - len(missing)} reused from {path}")
+        return vectors
+
+    def semantic(self, query: str, limit: int = 10, speaker: Optional[str] = None, encoder=None) -> List[QuoteHit]:
+        """Lines closest in meaning to ``query``."""
+        if not self.quotes:
+            return []
+        encoder = encoder or get_embedder()
+        vectors = self.vectors(encoder)
+        query_vector = np.asarray(encoder.encode(query), dtype=np.float32)
+        scores = vectors @ (query_vector / (np.linalg.norm(query_vector) or 1.0))
+        allowed = self._allowed(speaker)
+        if allowed is not None:
+            scores = np.where(allowed, scores, -1.0)
+        ids = np.flatnonzero(scores >= SEMANTIC_MIN_SCORE).astype(np.int32)
+        return self._rank(ids, scores[ids], limit, "semantic")
+
+    def search(
+        self, query: str, mode: str = "auto", limit: int = 10, speaker: Optional[str] = None
+    ) -> List[QuoteHit]:
+        """Search in ``mode``; ``auto`` falls through exact -> fuzzy -> semantic until something matches."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode {mode!r}; choose from {', '.join(MODES)}")
+        phrase = strip_question(query)
+        if mode in ("exact", "fuzzy"):
+            return getattr(self, mode)(phrase, limit, speaker)
+        if mode == "semantic":
+            return self.semantic(phrase, limit, speaker)
+        return (
+            self.exact(phrase, limit, speaker)
+            or self.fuzzy(phrase, limit, speaker)
+            or self.semantic(phrase, limit, speaker)
+        )
+
+
+_index: Optional[QuoteIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_quote_index() -> QuoteIndex:
+    """The shared index, built from the document store on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                from app.services.search.entities import get_entity_index
+
+                # Speakers resolve through the entity aliases: "Buffy" == "Buffy Summers"
+                index = QuoteIndex.from_records(
+                    get_store().iter_records(with_embeddings=False), get_entity_index().canonical
+                )
+                logger.info(f"Quote index ready ({len(index)} lines)")
+                _index = index
+    return _index
+
+
+def set_quote_index(index: Optional[QuoteIndex]):
+    """Replace the shared index; ``None`` rebuilds it on next use."""
+    global _index
+    with _index_lock:
+        _index = index
@@ -0,0 +1,203 @@
+"""Cache of whole search result lists.
+
+Keyed by (query, k, filters, field, backend, dataset version), so a hit
+skips both the encode and the scan. The dataset version comes from
+``BuffyDocumentStore.data_version`` and changes on every save, import and
+Redis re-ingest, which makes older entries unreachable rather than stale.
+
+Two tiers:
+
+* an in-process LRU (``TVSHOWCHAT_RESULT_CACHE_SIZE`` entries, default 1024;
+  0 disables caching), emptied whenever the dataset version moves;
+* an optional Redis tier shared by every worker
+  (``TVSHOWCHAT_RESULT_CACHE_REDIS=1``), whose entries expire after
+  ``SHARED_TTL_SECONDS``. Redis errors are logged and treated as misses.
+
+Only the hits (key, season, episode, score) are cached; documents are
+still read from the store, so a cache entry never holds episode text.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Collection, Dict, Iterable, List, Optional
+
+import redis
+
+from app.services import embed
+from app.services.monitoring.metrics import RESULT_CACHE_LOOKUPS
+from app.services.search.backends import VectorHit
+
+logger = logging.getLogger(__name__)
+
+CACHE_SIZE_ENV = "TVSHOWCHAT_RESULT_CACHE_SIZE"
+CACHE_REDIS_ENV = "TVSHOWCHAT_RESULT_CACHE_REDIS"
+DEFAULT_MAX_ENTRIES = 1024
+SHARED_TTL_SECONDS = 3600
+SHARED_PREFIX = "tvshowchat:results:"
+
+
+def result_cache_key(
+    query: str,
+    limit: int,
+    field: str,
+    backend: str,
+    version: str,
+    seasons: Optional[Iterable[int]] = None,
+    keys: Optional[Collection[str]] = None,
+) -> str:
+    """Stable key for one search.
+
+    Only whitespace is normalized: letter case is kept because the encoder
+    may be case-sensitive.
+    """
+    parts = {
+        "q": " ".join(query.split()),
+        "k": limit,
+        "field": field,
+        "backend": backend,
+        "version": version,
+        "seasons": sorted(set(seasons)) if seasons is not None else None,
+        "keys": sorted(keys) if keys is not None else None,
+    }
+    digest = hashlib.sha1(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"{version}:{digest}"
+
+
+class ResultCache:
+    """Bounded LRU of hit lists, optionally backed by a shared Redis tier."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, shared=None, shared_ttl: int = SHARED_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.shared = shared
+        self.shared_ttl = shared_ttl
+        self._entries: "OrderedDict[str, List[VectorHit]]" = OrderedDict()
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _check_version(self, key: str):
+        # Entries of an older dataset version can never be hit again; free them
+        version = key.split(":", 1)[0]
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key: str) -> Optional[List[VectorHit]]:
+        with self._lock:
+            self._check_version(key)
+            hits = self._entries.get(key)
+            if hits is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if hits is not None:
+            RESULT_CACHE_LOOKUPS.inc(tier="local", result="hit")
+            return list(hits)
+        RESULT_CACHE_LOOKUPS.inc(tier="local", result="miss")
+
+        hits = self._shared_get(key)
+        with self._lock:
+            if hits is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._store(key, hits)
+        return hits
+
+    def put(self, key: str, hits: List[VectorHit]):
+        with self._lock:
+            self._check_version(key)
+            self._store(key, list(hits))
+        self._shared_put(key, hits)
+
+    def _store(self, key: str, hits: List[VectorHit]):
+        self._entries[key] = hits
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _shared_get(self, key: str) -> Optional[List[VectorHit]]:
+        if self.shared is None:
+            return None
+        try:
+            raw = self.shared.get(SHARED_PREFIX + key)
+        except Exception as e:
+            RESULT_CACHE_LOOKUPS.inc(tier="shared", result="error")
+            logger.warning(f"Shared result cache read failed: {e}")
+            return None
+        if raw is None:
+            RESULT_CACHE_LOOKUPS.inc(tier="shared", result="miss")
+            return None
+        RESULT_CACHE_LOOKUPS.inc(tier="shared", result="hit")
+        return [VectorHit(*hit) for hit in json.loads(raw)]
+
+    def _shared_put(self, key: str, hits: List[VectorHit]):
+        if self.shared is None:
+            return
+        value = json.dumps([[h.key, h.season, h.episode, h.score] for h in hits])
+        try:
+            self.shared.set(SHARED_PREFIX + key, value, ex=self.shared_ttl)
+        except Exception as e:
+            logger.warning(f"Shared result cache write failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "shared": self.shared is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+
+_cache: Optional[ResultCache] = None
+_cache_lock = threading.Lock()
+_configured = False
+
+
+def build_result_cache() -> Optional[ResultCache]:
+    """Cache configured from the environment; ``None`` when disabled."""
+    size = int(os.environ.get(CACHE_SIZE_ENV) or DEFAULT_MAX_ENTRIES)
+    if size <= 0:
+        return None
+    shared = None
+    if os.environ.get(CACHE_REDIS_ENV, "").lower() in ("1", "true", "yes"):
+        shared = redis.Redis(
+            host=embed.REDIS_HOST,
+            port=embed.REDIS_PORT,
+            decode_responses=True,
+            socket_timeout=embed.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=embed.REDIS_SOCKET_TIMEOUT,
+        )
+    return ResultCache(size, shared=shared)
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """The shared cache, configured on first use; ``None`` when disabled."""
+    global _cache, _configured
+    if not _configured:
+        with _cache_lock:
+            if not _configured:
+                _cache = build_result_cache()
+                _configured = True
+    return _cache
+
+
+def set_result_cache(cache: Optional[ResultCache], configured: bool = True):
+    """Replace the shared cache; ``set_result_cache(None, configured=False)`` re-reads the environment."""
+    global _cache, _configured
+    with _cache_lock:
+        _cache = cache
+        _configured = configured
@@ -0,0 +1,308 @@
+"""Semantic episode search over the configured vector backend.
+
+The backend is chosen per deployment with ``TVSHOWCHAT_VECTOR_BACKEND``:
+
+* ``numpy`` (default): in-process index loaded from the document store.
+* ``redis``: RediSearch only.
+* ``failover``: Redis behind a circuit breaker, with the in-process index
+  as a fallback when Redis errors, times out or is slow.
+
+``TVSHOWCHAT_INDEX_DIM`` (e.g. 128) makes the in-process index scan
+PCA-reduced vectors and rerank with the full ones. The fitted projection is
+saved under ``<store>/index/`` and reused on restart; delete it after a
+re-embed with a different model so it is refitted.
+
+Result lists are cached (see ``result_cache``) under the store's data
+version, so a repeated query skips the encode and the scan. Identical
+searches arriving together share one encode and scan (see ``singleflight``).
+
+Both search endpoints go through ``search_episodes``; only their response
+shapes differ. ``iter_search`` is the same search as a generator, for
+streaming responses.
+"""
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.embeddings.model import get_embedder
+from app.services.monitoring.metrics import SEARCHES_COALESCED, SEARCH_STAGE_SECONDS
+from app.services.search.backends import (
+    DEFAULT_FIELD,
+    VECTOR_FIELDS,
+    NumpyBackend,
+    RedisBackend,
+    VectorBackend,
+    VectorHit,
+    episode_key,
+    items_from_records,
+)
+from app.services.search.circuit_breaker import CircuitBreaker, FailoverBackend
+from app.services.search.projection import Projection
+from app.services.search.result_cache import ResultCache, get_result_cache, result_cache_key
+from app.services.search.singleflight import SingleFlight
+from app.services.storage.document_store import get_store
+from app.services.storage.episode_jsonl import EpisodeRecord
+
+logger = logging.getLogger(__name__)
+
+VECTOR_BACKEND_ENV = "TVSHOWCHAT_VECTOR_BACKEND"
+BACKEND_CHOICES = ("numpy", "redis", "failover")
+INDEX_DIM_ENV = "TVSHOWCHAT_INDEX_DIM"
+RERANK_ENV = "TVSHOWCHAT_INDEX_RERANK"
+# Redis answers a KNN over a few hundred episodes in milliseconds; much slower means trouble
+SLOW_CALL_SECONDS = 0.25
+# Queries encoded and scored together by search_batch
+BATCH_QUERIES = 256
+
+_backend: Optional[VectorBackend] = None
+_backend_lock = threading.Lock()
+_in_flight = SingleFlight()
+
+
+def _numpy_backend() -> NumpyBackend:
+    return NumpyBackend(
+        reduced_dim=int(os.environ.get(INDEX_DIM_ENV) or 0),
+        rerank=int(os.environ.get(RERANK_ENV) or 4),
+    )
+
+
+def build_backend(kind: Optional[str] = None) -> VectorBackend:
+    kind = (kind or os.environ.get(VECTOR_BACKEND_ENV) or "numpy").lower()
+    if kind == "numpy":
+        return _numpy_backend()
+    if kind == "redis":
+        return RedisBackend()
+    if kind == "failover":
+        breaker = CircuitBreaker("redis", slow_call_seconds=SLOW_CALL_SECONDS)
+        return FailoverBackend(RedisBackend(), _numpy_backend(), breaker)
+    raise ValueError(f"Unknown vector backend {kind!r}; choose from {', '.join(BACKEND_CHOICES)}")
+
+
+def backends_of(backend: VectorBackend) -> List[VectorBackend]:
+    """The concrete backends behind ``backend`` (itself, or both sides of a failover)."""
+    if isinstance(backend, FailoverBackend):
+        return backends_of(backend.primary) + backends_of(backend.fallback)
+    return [backend]
+
+
+def projection_path(field: str) -> Path:
+    """Where the fitted projection for ``field`` lives, next to the store it was fitted on."""
+    return get_store().base_path / "index" / f"projection_{field}.npz"
+
+
+def _load_projections(backend: NumpyBackend):
+    for field in VECTOR_FIELDS:
+        path = projection_path(field)
+        if path.exists():
+            backend.projections[field] = Projection.load(path)
+
+
+def _save_projections(backend: NumpyBackend, known: Dict[str, Projection]):
+    backend.stats()  # rebuild now, fitting any missing projection
+    for field, projection in backend.projections.items():
+        if known.get(field) is not projection:
+            projection.save(projection_path(field))
+            logger.info(f"Saved {projection.max_dimension}-d projection for {field} to {projection_path(field)}")
+
+
+def load_backend(backend: VectorBackend) -> int:
+    """Fill the in-process backends from the document store. Returns items loaded."""
+    loaded = 0
+    for b in backends_of(backend):
+        if not b.persistent:
+            reduced = isinstance(b, NumpyBackend) and b.reduced_dim
+            if reduced:
+                _load_projections(b)
+                known = dict(b.projections)
+            loaded += b.upsert(items_from_records(get_store().iter_records()))
+            if reduced:
+                _save_projections(b, known)
+    return loaded
+
+
+def get_backend() -> VectorBackend:
+    """The shared backend, built and loaded on first use."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                backend = build_backend()
+                loaded = load_backend(backend)
+                logger.info(f"Vector backend {backend.name} ready ({loaded} items loaded in process)")
+                _backend = backend
+    return _backend
+
+
+def set_backend(backend: Optional[VectorBackend]):
+    """Replace the shared backend; ``None`` rebuilds it (e.g. after a re-import) on next use."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def sync_backend(records: Iterable[EpisodeRecord]) -> int:
+    """Upsert changed store records into the loaded in-process backends. Returns items written.
+
+    Nothing happens before the backend is first loaded; it reads the store then.
+    """
+    backend = _backend
+    if backend is None:
+        return 0
+    in_process = [b for b in backends_of(backend) if not b.persistent]
+    if not in_process:
+        return 0
+    items = list(items_from_records(records))
+    return sum(b.upsert(items) for b in in_process)
+
+
+def _fetch(store, hit: VectorHit, fragments: bool) -> Optional[Dict[str, Any]]:
+    if fragments:
+        data = store.episode_fragment(hit.season, hit.episode)
+    else:
+        data = store.get_episode(hit.season, hit.episode, with_embeddings=False)
+    if data is None:
+        logger.warning(f"Vector index has {hit.key} but the document store does not")
+        return None
+    return {
+        "season": hit.season,
+        "episode": hit.episode,
+        "key": hit.key,
+        "fragment" if fragments else "data": data,
+        "score": hit.score,
+    }
+
+
+def _encode_and_scan(
+    backend: VectorBackend,
+    query: str,
+    limit: int,
+    field: str,
+    seasons: Optional[List[int]],
+    keys: Optional[Collection[str]],
+    timings: Dict[str, float],
+    cache: Optional[ResultCache],
+    cache_key: str,
+) -> List[VectorHit]:
+    began = time.perf_counter()
+    with SEARCH_STAGE_SECONDS.time(backend=backend.name, stage="encode"):
+        query_embedding = get_embedder().encode(query)
+    timings["encode"] = time.perf_counter() - began
+
+    began = time.perf_counter()
+    hits = backend.knn(query_embedding, limit, field=field, seasons=seasons, keys=keys)
+    timings["knn"] = time.perf_counter() - began
+    # Cached before the in-flight entry is released, so later callers hit the cache
+    if cache is not None:
+        cache.put(cache_key, hits)
+    return hits
+
+
+def iter_search(
+    query: str,
+    limit: int = 5,
+    seasons: Optional[Iterable[int]] = None,
+    field: str = DEFAULT_FIELD,
+    episodes: Optional[Iterable[Tuple[int, str]]] = None,
+    fragments: bool = False,
+    timings: Optional[Dict[str, float]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """``search_episodes`` as a generator: each hit is yielded as soon as its document is fetched.
+
+    Pass a dict as ``timings`` to have the cache, encode, knn and fetch
+    seconds recorded in it (fetch excludes time spent by the consumer). A
+    result cache hit has no encode or knn entry; a search that waited for an
+    identical one already running records the wait as "coalesced".
+    """
+    backend = get_backend()
+    timings = timings if timings is not None else {}
+    keys = None
+    if episodes is not None:
+        keys = {episode_key(season, episode) for season, episode in episodes}
+        if not keys:
+            return
+    seasons = list(seasons) if seasons is not None else None
+    store = get_store()
+
+    # Also the in-flight key: identical concurrent searches share one encode and scan
+    key = result_cache_key(query, limit, field, backend.name, store.data_version(), seasons, keys)
+    cache = get_result_cache()
+    hits = None
+    if cache is not None:
+        began = time.perf_counter()
+        hits = cache.get(key)
+        timings["cache"] = time.perf_counter() - began
+    if hits is None:
+        began = time.perf_counter()
+        hits, leader = _in_flight.do(
+            key, _encode_and_scan, backend, query, limit, field, seasons, keys, timings, cache, key
+        )
+        if not leader:
+            timings["coalesced"] = time.perf_counter() - began
+            SEARCHES_COALESCED.inc(backend=backend.name)
+
+    timings["fetch"] = 0.0
+    for hit in hits:
+        began = time.perf_counter()
+        result = _fetch(store, hit, fragments)
+        timings["fetch"] += time.perf_counter() - began
+        if result is not None:
+            yield result
+    SEARCH_STAGE_SECONDS.observe(timings["fetch"], backend=backend.name, stage="fetch")
+
+
+def search_episodes(
+    query: str,
+    limit: int = 5,
+    seasons: Optional[Iterable[int]] = None,
+    field: str = DEFAULT_FIELD,
+    episodes: Optional[Iterable[Tuple[int, str]]] = None,
+    fragments: bool = False,
+) -> List[Dict[str, Any]]:
+    """Top ``limit`` episodes for ``query`` as dicts with season, episode, key, score and data.
+
+    ``episodes`` ((season, episode) pairs, e.g. from the entity index)
+    restricts the search to those episodes. With ``fragments`` each hit has
+    the episode's pre-serialized JSON under "fragment" instead of "data".
+    """
+    return list(iter_search(query, limit, seasons, field, episodes, fragments))
+
+
+def search_batch(
+    queries: Sequence[str],
+    limit: int = 5,
+    seasons: Optional[Sequence[Optional[Iterable[int]]]] = None,
+    episodes: Optional[Sequence[Optional[Iterable[Tuple[int, str]]]]] = None,
+    field: str = DEFAULT_FIELD,
+    fragments: bool = False,
+    batch_size: int = BATCH_QUERIES,
+) -> Iterator[List[Dict[str, Any]]]:
+    """``search_episodes`` for many queries, yielding each query's results in input order.
+
+    Every ``batch_size`` queries are encoded in one model call and scored in
+    one ``knn_batch``. ``seasons`` and ``episodes`` hold one filter (or
+    None) per query. ``limit`` is the largest number of results any query
+    needs; callers trim per query. Bulk jobs bypass the result cache so they
+    do not evict interactive queries.
+    """
+    backend = get_backend()
+    store = get_store()
+    encoder = get_embedder()
+    for start in range(0, len(queries), batch_size):
+        chunk = list(queries[start:start + batch_size])
+        chunk_seasons = list(seasons[start:start + batch_size]) if seasons is not None else None
+        chunk_keys = None
+        if episodes is not None:
+            chunk_keys = [
+                {episode_key(season, episode) for season, episode in allowed} if allowed is not None else None
+                for allowed in episodes[start:start + batch_size]
+            ]
+        with SEARCH_STAGE_SECONDS.time(backend=backend.name, stage="encode"):
+            vectors = np.asarray(encoder.encode(chunk, batch_size=len(chunk)), dtype=np.float32)
+        for hits in backend.knn_batch(vectors, limit, field=field, seasons=chunk_seasons, keys=chunk_keys):
+            results = (_fetch(store, hit, fragments) for hit in hits)
+            yield [result for result in results if result is not None]
@@ -0,0 +1,74 @@
+"""Coalescing of identical in-flight calls.
+
+When a popular query arrives many times at once, the first caller (the
+leader) runs the search and the others wait for its result instead of
+running their own encode and scan. This complements the result cache: it
+covers the window before the first result is cached.
+
+* An exception raised by the leader is raised in every waiter too.
+* If the leader is cancelled (a ``BaseException`` that is not an
+  ``Exception``, e.g. ``KeyboardInterrupt`` or ``asyncio.CancelledError``),
+  waiters do not inherit the cancellation; one of them becomes the new
+  leader and runs the call.
+* A waiter that gives up (``timeout``) only stops waiting; the leader and
+  the other waiters carry on.
+"""
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _LeaderCancelled(Exception):
+    """Set on a call's future when its leader was cancelled, telling waiters to retry."""
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def do(
+        self, key: Hashable, fn: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs
+    ) -> Tuple[Any, bool]:
+        """``fn(*args, **kwargs)``, shared with concurrent calls for ``key``.
+
+        Returns ``(result, leader)``: ``leader`` is False when the result
+        came from another caller's run. Waiters raise ``TimeoutError``
+        (``concurrent.futures.TimeoutError`` before Python 3.11) after
+        ``timeout`` seconds.
+        """
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = self._calls[key] = Future()
+            if leader:
+                return self._lead(key, future, fn, args, kwargs), True
+            try:
+                return future.result(timeout), False
+            except _LeaderCancelled:
+                continue
+
+    def _lead(self, key: Hashable, future: Future, fn: Callable[..., Any], args, kwargs) -> Any:
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._finish(key)
+            future.set_exception(e)
+            raise
+        except BaseException:
+            self._finish(key)
+            future.set_exception(_LeaderCancelled())
+            raise
+        self._finish(key)
+        future.set_result(result)
+        return result
+
+    def _finish(self, key: Hashable):
+        # Callers arriving from now on start a fresh run
+        with self._lock:
+            self._calls.pop(key, None)
@@ -0,0 +1,143 @@
+"""Field projection and highlighted snippets for search hits.
+
+Search results carry whole summary/synopsis paragraph lists, but a result
+list only shows a few lines per hit. ``project`` keeps just the requested
+fields. The ``snippet`` pseudo-field is the sentence that best matches the
+query plus ``window`` sentences either side, with character offsets of the
+matched words so clients can highlight without parsing markup. Full
+documents are fetched on demand from ``/api/episodes/{season}/{episode}``.
+"""
+import re
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from app.services.search.text import normalize
+
+DOCUMENT_FIELDS = ("title", "airdate", "summary", "synopsis", "quotes", "trivia")
+SNIPPET = "snippet"
+# Fields a client may ask for; season/episode/score are always returned
+PUBLIC_FIELDS = DOCUMENT_FIELDS + (SNIPPET,)
+# Searched in order; an equally good sentence in an earlier field wins
+SNIPPET_FIELDS = ("summary", "synopsis", "quotes")
+SNIPPET_WINDOW = 1
+SNIPPET_MAX_CHARS = 320
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "did", "do", "does", "for", "from", "has",
+    "have", "he", "her", "his", "how", "in", "into", "is", "it", "its", "of", "on", "or", "she", "that", "the",
+    "their", "them", "they", "this", "to", "was", "were", "what", "when", "where", "which", "who",
+    "why", "with", "episode", "episodes",
+}
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+
+
+@dataclass
+class Snippet:
+    field: str
+    text: str
+    highlights: List[Tuple[int, int]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def parse_fields(fields: Union[None, str, Sequence[str]]) -> Optional[List[str]]:
+    """Validate a field list (or comma-separated string); ``None`` means every field."""
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(fields) - set(PUBLIC_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}; choose from {', '.join(PUBLIC_FIELDS)}")
+    return list(dict.fromkeys(fields))
+
+
+def query_terms(query: str) -> List[str]:
+    """Normalized query words worth highlighting (no stopwords, no single letters)."""
+    return list(dict.fromkeys(w for w in normalize(query).split() if len(w) > 1 and w not in STOPWORDS))
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s for s in _SENTENCE_END.split(text.strip()) if s]
+
+
+def _score(sentence: str, terms: Sequence[str]) -> int:
+    # A term matches a word it starts: "vampire" finds "vampires"
+    words = normalize(sentence).split()
+    return sum(any(w.startswith(t) for w in words) for t in terms)
+
+
+def _highlights(text: str, terms: Sequence[str]) -> List[Tuple[int, int]]:
+    if not terms:
+        return []
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(t) for t in terms) + r")\w*", re.IGNORECASE)
+    return [m.span() for m in pattern.finditer(text)]
+
+
+def _clip(text: str, highlights: List[Tuple[int, int]], max_chars: int) -> Tuple[str, List[Tuple[int, int]]]:
+    """Cut ``text`` to ``max_chars`` around the first highlight, shifting the offsets."""
+    if len(text) <= max_chars:
+        return text, highlights
+    anchor = highlights[0][0] if highlights else 0
+    start = max(0, min(anchor - max_chars // 3, len(text) - max_chars))
+    # Start and end on word boundaries
+    if start:
+        start = text.find(" ", start) + 1 or start
+    end = min(len(text), start + max_chars)
+    if end < len(text):
+        space = text.rfind(" ", start, end)
+        end = space if space > start else end
+    prefix = "…" if start else ""
+    suffix = "…" if end < len(text) else ""
+    shift = len(prefix) - start
+    kept = [(s + shift, e + shift) for s, e in highlights if s >= start and e <= end]
+    return prefix + text[start:end] + suffix, kept
+
+
+def best_snippet(
+    data: Dict[str, Any],
+    query: str,
+    fields: Iterable[str] = SNIPPET_FIELDS,
+    window: int = SNIPPET_WINDOW,
+    max_chars: int = SNIPPET_MAX_CHARS,
+) -> Optional[Snippet]:
+    """Best-matching sentence of ``data`` for ``query`` with ``window`` sentences of context.
+
+    Falls back to the start of the first non-empty field when no sentence
+    shares a word with the query; ``None`` if every field is empty.
+    """
+    terms = query_terms(query)
+    best: Optional[Tuple[int, str, List[str], int]] = None
+    for field in fields:
+        value = data.get(field) or []
+        paragraphs = [value] if isinstance(value, str) else value
+        for paragraph in paragraphs:
+            sentences = split_sentences(paragraph)
+            for i, sentence in enumerate(sentences):
+                score = _score(sentence, terms)
+                if best is None or score > best[0]:
+                    best = (score, field, sentences, i)
+    if best is None:
+        return None
+    _, field, sentences, i = best
+    text = " ".join(sentences[max(0, i - window):i + window + 1])
+    text, highlights = _clip(text, _highlights(text, terms), max_chars)
+    return Snippet(field, text, highlights)
+
+
+def project(data: Dict[str, Any], fields: Optional[Sequence[str]], query: str = "") -> Dict[str, Any]:
+    """The requested public fields of an episode (default: every stored one).
+
+    ``snippet`` is generated for ``query``.
+    """
+    fields = DOCUMENT_FIELDS if fields is None else fields
+    projected: Dict[str, Any] = {}
+    for field in fields:
+        if field == SNIPPET:
+            snippet = best_snippet(data, query)
+            projected[field] = snippet.to_dict() if snippet else None
+        else:
+            projected[field] = data.get(field)
+    return projected
@@ -0,0 +1,164 @@
+"""Typeahead suggestions over episode titles, cast and quote openings.
+
+Every suggestion is indexed under its normalized text and under each later
+word start, so "summ" finds "Buffy Summers". Those keys go in one sorted
+array, and a prefix lookup is two binary searches plus a ranking of the
+matching range. The shortest prefixes match the most entries, so their
+rankings are precomputed.
+
+Ranking: matches at the start of the text first, then popularity, then
+shorter text. Popularity is the number of episodes for cast and quotes, and
+US viewers (millions, when known) for titles.
+"""
+import logging
+import threading
+from bisect import bisect_left
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.search.text import normalize, split_credit
+from app.services.storage.document_store import get_store
+from app.services.storage.episode_jsonl import EpisodeRecord
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("title", "character", "actor", "quote")
+CAST_FIELDS = ("main_cast", "guest_stars", "recurring_characters")
+# Words of a quote offered as its suggestion
+QUOTE_WORDS = 8
+# Later word starts indexed per suggestion (bounds the index for long quotes)
+MAX_WORD_STARTS = 6
+# Prefixes up to this length have their top MAX_LIMIT precomputed
+SHORT_PREFIX = 3
+MAX_LIMIT = 20
+
+
+@dataclass
+class Suggestion:
+    text: str
+    kind: str
+    popularity: float
+    season: Optional[int] = None
+    episode: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if v is not None}
+
+
+def build_suggestions(records: Iterable[EpisodeRecord]) -> List[Suggestion]:
+    """Collect titles, cast names and quote openings from store-layout records."""
+    suggestions: List[Suggestion] = []
+    counted: Dict[Tuple[str, str], Suggestion] = {}
+
+    def count(kind: str, text: str, season: int, episode: str):
+        key = (kind, normalize(text))
+        if not key[1]:
+            return
+        if key in counted:
+            counted[key].popularity += 1
+        else:
+            # Quotes point at the first episode they appear in; names at none
+            where = (season, episode) if kind == "quote" else (None, None)
+            counted[key] = Suggestion(text, kind, 1.0, *where)
+
+    for season_key, episode_num, episode in records:
+        season_num = int(season_key.split("_")[1])
+        if episode.get("title"):
+            suggestions.append(Suggestion(
+                episode["title"], "title", float(episode.get("us_viewers_millions") or 1.0),
+                season_num, episode_num,
+            ))
+        names = set()
+        for field in CAST_FIELDS:
+            for entry in episode.get(field) or []:
+                actor, character = split_credit(entry)
+                names.add(("character", character))
+                if actor:
+                    names.add(("actor", actor))
+        for kind, name in names:
+            count(kind, name, season_num, episode_num)
+        for quote in episode.get("quotes") or []:
+            count("quote", " ".join(quote.split()[:QUOTE_WORDS]), season_num, episode_num)
+    return suggestions + list(counted.values())
+
+
+class SuggestIndex:
+    """Immutable prefix index; build a new one to pick up store changes."""
+
+    def __init__(self, suggestions: List[Suggestion]):
+        entries = []
+        for sid, suggestion in enumerate(suggestions):
+            words = normalize(suggestion.text).split()
+            for start in range(min(len(words), MAX_WORD_STARTS)):
+                entries.append((" ".join(words[start:]), start > 0, sid))
+        entries.sort()
+        self.suggestions = suggestions
+        self._keys = [key for key, _, _ in entries]
+        self._ids = np.asarray([sid for _, _, sid in entries], dtype=np.int32)
+        self._mid_word = np.asarray([mid for _, mid, _ in entries], dtype=bool)
+        self._popularity = np.asarray([s.popularity for s in suggestions], dtype=np.float64)
+        self._lengths = np.asarray([len(s.text) for s in suggestions], dtype=np.int32)
+        self._short: Dict[str, List[int]] = {}
+        for key in {key[:n] for key in self._keys for n in range(1, SHORT_PREFIX + 1)}:
+            self._short[key] = self._rank(*self._range(key), MAX_LIMIT)
+
+    @classmethod
+    def from_records(cls, records: Iterable[EpisodeRecord]) -> "SuggestIndex":
+        return cls(build_suggestions(records))
+
+    def __len__(self) -> int:
+        return len(self.suggestions)
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        return bisect_left(self._keys, prefix), bisect_left(self._keys, prefix + "\uffff")
+
+    def _rank(self, lo: int, hi: int, limit: int, kinds: Optional[Iterable[str]] = None) -> List[int]:
+        ids, mid_word = self._ids[lo:hi], self._mid_word[lo:hi]
+        order = np.lexsort((self._lengths[ids], -self._popularity[ids], mid_word))
+        ranked: List[int] = []
+        seen = set()
+        for sid in ids[order].tolist():
+            if sid in seen or (kinds is not None and self.suggestions[sid].kind not in kinds):
+                continue
+            seen.add(sid)
+            ranked.append(sid)
+            if len(ranked) == limit:
+                break
+        return ranked
+
+    def suggest(self, prefix: str, limit: int = 8, kinds: Optional[Iterable[str]] = None) -> List[Suggestion]:
+        """Best ``limit`` suggestions whose text, or a later word of it, starts with ``prefix``."""
+        prefix = normalize(prefix)
+        limit = min(limit, MAX_LIMIT)
+        if not prefix or limit <= 0:
+            return []
+        if kinds is None and prefix in self._short:
+            ranked = self._short[prefix][:limit]
+        else:
+            ranked = self._rank(*self._range(prefix), limit, set(kinds) if kinds is not None else None)
+        return [self.suggestions[sid] for sid in ranked]
+
+
+_index: Optional[SuggestIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_suggest_index() -> SuggestIndex:
+    """The shared index, built from the document store on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = SuggestIndex.from_records(get_store().iter_records(with_embeddings=False))
+                logger.info(f"Suggest index ready ({len(index)} suggestions)")
+                _index = index
+    return _index
+
+
+def set_suggest_index(index: Optional[SuggestIndex]):
+    """Replace the shared index; ``None`` rebuilds it on next use."""
+    global _index
+    with _index_lock:
+        _index = index
@@ -0,0 +1,27 @@
+"""Text normalization shared by the lexical indexes (suggest, entities, quotes)."""
+import re
+import unicodedata
+from typing import Optional, Tuple
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+# "Sarah Michelle Gellar as Buffy Summers"
+_CREDIT = re.compile(r"^(?P<actor>.+?)\s+as\s+(?P<character>.+)$", re.IGNORECASE)
+
+
+def normalize(text: str) -> str:
+    """Fold case and accents, turn punctuation into single spaces.
+
+    ``"Jenny Calendar's"`` -> ``"jenny calendar s"``; ``"Anyanka"`` and
+    ``"ANYANKA"`` compare equal.
+    """
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _NON_WORD.sub(" ", text.casefold()).strip()
+
+
+def split_credit(entry: str) -> Tuple[Optional[str], str]:
+    """Split a cast credit into (actor, character); bare names are characters."""
+    match = _CREDIT.match(entry.strip())
+    if match:
+        return match.group("actor").strip(), match.group("character").strip()
+    return None, entry.strip()
@@ -1,15 +1,32 @@
 import json
+import os
+import shutil
+import threading
+import uuid
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 import logging
-from datetime import datetime
-import shutil
 from dataclasses import dataclass, asdict
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from app.services.storage.episode_jsonl import EpisodeRecord, iter_snapshot
+from app.services.storage.fragments import FragmentCache
+from app.services.storage.snapshot_store import SnapshotStore
+from app.services.storage.similarity import DEFAULT_TOP_N, EpisodeKey, SimilarityGraph
+from app.services.embeddings.model import get_embedder
+from app.services.embeddings.batch import (
+    DEFAULT_BATCH_SIZE,
+    STORE_EMBEDDING_FIELDS,
+    EmbeddingStats,
+    as_text,
+    embed_texts,
+)
+from app.services.monitoring.metrics import SEARCH_STAGE_SECONDS
 
 logger = logging.getLogger(__name__)
 
+# Embedding the "similar episodes" graph is computed from
+SIMILARITY_FIELD = "summary_embedding"
+
 @dataclass
 class EpisodeDocument:
     """Represents a single episode's data."""
@@ -74,7 +91,17 @@ class BuffyDocumentStore:
         self.episodes_path = self.base_path / "episodes"
         self.embeddings_path = self.base_path / "embeddings"
         self._ensure_dirs()
-        self.embedder = SentenceTransformer("all-MiniLM-L6-v2")
+        self.snapshots = SnapshotStore(str(self.base_path / "snapshots"))
+        self._similarity: Optional[SimilarityGraph] = None
+        self._similarity_lock = threading.Lock()
+        self._fragments = FragmentCache()
+        self._version = "0"
+        self._version_stamp: Optional[Tuple[int, int]] = None
+
+    @property
+    def embedder(self):
+        """Shared embedding model, loaded on first search."""
+        return get_embedder()
 
     def _ensure_dirs(self):
         """Ensure storage directories exist."""
@@ -89,24 +116,77 @@ class BuffyDocumentStore:
         """Get path for season embeddings file."""
         return self.embeddings_path / f"season_{season}_embeddings.json"
 
-    def backup(self):
-        """Create a backup of all data."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_path = self.base_path / f"backup_{timestamp}"
-        backup_path.mkdir(parents=True)
-        
-        # Copy all files
-        for file in self.episodes_path.glob("*.json"):
-            shutil.copy2(file, backup_path / file.name)
-        for file in self.embeddings_path.glob("*.json"):
-            shutil.copy2(file, backup_path / file.name)
-            
-        logger.info(f"Created backup at {backup_path}")
+    def iter_records(self, with_embeddings: bool = True) -> Iterator[EpisodeRecord]:
+        """Yield every stored episode, with its embeddings merged back in.
+
+        Pass ``with_embeddings=False`` to skip reading the embeddings files.
+        """
+        for season_file in sorted(self.episodes_path.glob("season_*.json")):
+            season_num = int(season_file.stem.split('_')[1])
+            with open(season_file, 'r') as f:
+                season_data = json.load(f)
+            embeddings_data = {}
+            embeddings_file = self._get_embeddings_file(season_num)
+            if with_embeddings and embeddings_file.exists():
+                with open(embeddings_file, 'r') as f:
+                    embeddings_data = json.load(f)
+            for episode_num, episode in season_data.items():
+                yield f"season_{season_num}", episode_num, {**episode, **embeddings_data.get(episode_num, {})}
+
+    def backup(self) -> str:
+        """Create a backup snapshot of all data.
+
+        Episodes are stored as content-addressed blobs, so only episodes that
+        changed since the last backup take up new disk space.
+        """
+        name = self.snapshots.commit(self.iter_records(), kind="backup", layout="store")
+        logger.info(f"Created backup snapshot {name}")
+        return name
+
+    def restore(self, name: Optional[str] = None):
+        """Replace the stored data with a backup snapshot (the latest by default)."""
+        name = name or self.snapshots.latest("backup")
+        if not name:
+            raise FileNotFoundError("No backup snapshot to restore")
+        if self.snapshots.read_manifest(name)["layout"] != "store":
+            raise ValueError(f"Snapshot {name} is not a document store backup")
+
+        # Imported beside the live data and swapped in only once complete, so a
+        # failure (bad manifest, missing blob, full disk) leaves the store as it was
+        staging_path = self.base_path / "restore.tmp"
+        shutil.rmtree(staging_path, ignore_errors=True)
+        try:
+            staging = BuffyDocumentStore(str(staging_path))
+            staging._import_records(
+                self.snapshots.iter_manifest(name),
+                lambda season_num, episode: EpisodeDocument(**episode),
+            )
+            for live, staged in ((self.episodes_path, staging.episodes_path), (self.embeddings_path, staging.embeddings_path)):
+                os.replace(live, staging_path / f"{live.name}.old")
+                os.replace(staged, live)
+        finally:
+            shutil.rmtree(staging_path, ignore_errors=True)
+        # Episodes missing from the snapshot must not be served from the cache
+        self._fragments.clear()
+        self.build_similarity()
+        self._refresh_indexes()
+        self.bump_data_version()
+        self.snapshots.set_latest("backup", name)
+        logger.info(f"Restored backup snapshot {name}")
 
     def save_episode(self, episode: EpisodeDocument):
         """Save a single episode."""
-        season_file = self._get_season_file(episode.season_number)
-        embeddings_file = self._get_embeddings_file(episode.season_number)
+        self.save_episodes(episode.season_number, [episode])
+
+    def save_episodes(self, season: int, episodes: List[EpisodeDocument], update_similarity: bool = True):
+        """Save several episodes of one season with a single read/write per file.
+
+        Changed episodes are folded into the similarity graph and the in-process
+        vector index incrementally; bulk imports pass ``update_similarity=False``
+        and rebuild both once.
+        """
+        season_file = self._get_season_file(season)
+        embeddings_file = self._get_embeddings_file(season)
         
         # Load existing data
         season_data = {}
@@ -119,28 +199,229 @@ class BuffyDocumentStore:
             with open(embeddings_file, 'r') as f:
                 embeddings_data = json.load(f)
         
-        # Update episode data
-        episode_dict = episode.to_dict()
-        
-        # Separate embeddings
-        episode_embeddings = {}
-        for key in ['summary_embedding', 'synopsis_embedding', 'quotes_embedding']:
-            if key in episode_dict:
-                episode_embeddings[key] = episode_dict.pop(key)
+        embeddings_changed = False
+        records: List[EpisodeRecord] = []
+        for episode in episodes:
+            # Update episode data
+            episode_dict = episode.to_dict()
+            
+            # Separate embeddings
+            episode_embeddings = {}
+            for key in ['summary_embedding', 'synopsis_embedding', 'quotes_embedding']:
+                if key in episode_dict:
+                    episode_embeddings[key] = episode_dict.pop(key)
+            
+            season_data[episode.episode_number] = episode_dict
+            self._fragments.put(season, episode.episode_number, episode_dict)
+            if episode_embeddings:
+                embeddings_data[episode.episode_number] = episode_embeddings
+                embeddings_changed = True
+            if update_similarity:
+                records.append((
+                    f"season_{season}",
+                    episode.episode_number,
+                    {**episode_dict, **embeddings_data.get(episode.episode_number, {})},
+                ))
         
         # Save episode data
-        season_data[episode.episode_number] = episode_dict
         with open(season_file, 'w') as f:
             json.dump(season_data, f, indent=2)
         
         # Save embeddings
-        if episode_embeddings:
-            embeddings_data[episode.episode_number] = episode_embeddings
+        if embeddings_changed:
             with open(embeddings_file, 'w') as f:
                 json.dump(embeddings_data, f, indent=2)
 
-    def get_episode(self, season: int, episode: str) -> Optional[Dict[str, Any]]:
-        """Get episode data by season and episode number."""
+        if update_similarity and embeddings_changed:
+            self._update_similarity([
+                ((season, episode.episode_number), getattr(episode, SIMILARITY_FIELD))
+                for episode in episodes
+                if getattr(episode, SIMILARITY_FIELD)
+            ])
+        if update_similarity:
+            self._refresh_indexes(records)
+        self.bump_data_version()
+
+    def _refresh_indexes(self, records: Optional[List[EpisodeRecord]] = None):
+        """Keep the in-process search indexes in step with this (shared) store.
+
+        ``records`` are upserted into the vector index; without them it is
+        dropped and reloaded from the store on the next search. The entity,
+        suggest and quote indexes are always dropped and rebuilt on next use.
+        """
+        if self is not store:
+            return
+        # The search services import this module
+        from app.services.search import entities, quotes, service, suggest
+
+        entities.set_entity_index(None)
+        suggest.set_suggest_index(None)
+        # Also picks up speaker aliases from the rebuilt entity index
+        quotes.set_quote_index(None)
+        if records is None:
+            service.set_backend(None)
+        elif records:
+            service.sync_backend(records)
+
+    def _version_file(self) -> Path:
+        return self.base_path / "index" / "data_version"
+
+    def data_version(self) -> str:
+        """Opaque token that changes whenever stored data changes, in any process using this store.
+
+        Costs one ``stat``; the file is only read after it was replaced.
+        """
+        path = self._version_file()
+        try:
+            info = path.stat()
+        except FileNotFoundError:
+            return "0"
+        # Every bump replaces the file, so the inode changes even within one mtime tick
+        stamp = (info.st_ino, info.st_mtime_ns)
+        if stamp != self._version_stamp:
+            self._version = path.read_text().strip() or "0"
+            self._version_stamp = stamp
+        return self._version
+
+    def bump_data_version(self) -> str:
+        """Record that stored data (or an index built from it) changed; caches keyed on the old version miss."""
+        path = self._version_file()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Random rather than a counter: two processes bumping at once must not agree on the result
+        version = uuid.uuid4().hex[:16]
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(version)
+        os.replace(tmp, path)
+        return version
+
+    def episode_fragment(self, season: int, episode: str) -> Optional[bytes]:
+        """Pre-serialized public JSON of an episode (see ``fragments``); ``None`` if not stored."""
+        if not self._fragments.loaded:
+            self.load_fragments()
+        return self._fragments.get(season, episode)
+
+    def episode_headline(self, season: int, episode: str) -> Optional[Dict[str, Any]]:
+        """Title and airdate of an episode, from the fragment cache; ``None`` if not stored."""
+        if not self._fragments.loaded:
+            self.load_fragments()
+        headline = self._fragments.headline(season, episode)
+        if headline is None:
+            return None
+        title, airdate = headline
+        return {'title': title, 'airdate': airdate}
+
+    def load_fragments(self) -> int:
+        """Serialize every episode's public fields once; later saves keep them current."""
+        count = self._fragments.load(self.iter_records(with_embeddings=False))
+        logger.info(f"Serialized {count} episode fragments")
+        return count
+
+    def _similarity_file(self) -> Path:
+        return self.base_path / "index" / f"similar_{SIMILARITY_FIELD}.npz"
+
+    def _field_vectors(self, field: str) -> Dict[EpisodeKey, List[float]]:
+        return {
+            (int(season_key.split('_')[1]), episode_num): episode[field]
+            for season_key, episode_num, episode in self.iter_records()
+            if episode.get(field)
+        }
+
+    def build_similarity(self, top_n: int = DEFAULT_TOP_N) -> SimilarityGraph:
+        """Recompute every episode's nearest neighbours and persist the graph."""
+        vectors = self._field_vectors(SIMILARITY_FIELD)
+        keys = list(vectors)
+        matrix = np.asarray([vectors[key] for key in keys], dtype=np.float32) if keys else np.zeros((0, 0), np.float32)
+        graph = SimilarityGraph.build(keys, matrix, top_n, field=SIMILARITY_FIELD)
+        graph.save(self._similarity_file())
+        with self._similarity_lock:
+            self._similarity = graph
+        logger.info(f"Built similarity graph: {len(keys)} episodes, top {top_n} neighbours")
+        return graph
+
+    def similarity_graph(self) -> SimilarityGraph:
+        """The neighbour graph, loaded from disk (or built) on first use."""
+        if self._similarity is None:
+            with self._similarity_lock:
+                if self._similarity is None and self._similarity_file().exists():
+                    self._similarity = SimilarityGraph.load(self._similarity_file())
+            if self._similarity is None:
+                return self.build_similarity()
+        return self._similarity
+
+    def _update_similarity(self, changed: List[Tuple[EpisodeKey, List[float]]]):
+        # Nothing to maintain until the graph has been built once
+        if not changed or (self._similarity is None and not self._similarity_file().exists()):
+            return
+        graph = self.similarity_graph()
+        if graph.matrix is None:
+            try:
+                graph.attach_vectors(self._field_vectors(SIMILARITY_FIELD))
+            except KeyError:
+                # An episode lost its embedding; the graph has to be rebuilt
+                self.build_similarity(graph.top_n)
+                return
+        for key, vector in changed:
+            graph.update(key, vector)
+        graph.save(self._similarity_file())
+
+    def similar_episodes(self, season: int, episode: str, limit: int = DEFAULT_TOP_N) -> Optional[List[Dict[str, Any]]]:
+        """Precomputed nearest episodes as search-style results; None if the episode has no entry.
+
+        Each result's ``data`` holds only the title and airdate.
+        """
+        neighbours = self.similarity_graph().similar(season, episode, limit)
+        if neighbours is None:
+            return None
+        results = []
+        for season_num, episode_num, score in neighbours:
+            data = self.episode_headline(season_num, episode_num)
+            if data is not None:
+                results.append({'season': season_num, 'episode': episode_num, 'data': data, 'score': score})
+        return results
+
+    def reembed(self, batch_size: int = DEFAULT_BATCH_SIZE) -> EmbeddingStats:
+        """Recompute every stored embedding with the current model.
+
+        Texts from all seasons are embedded together in length-sorted batches;
+        each season's embeddings file is rewritten as soon as it is complete.
+        The in-process vector index is reloaded on the next search.
+        """
+        def texts():
+            for season_file in sorted(self.episodes_path.glob("season_*.json")):
+                season_num = int(season_file.stem.split('_')[1])
+                with open(season_file, 'r') as f:
+                    season_data = json.load(f)
+                for episode_num, episode in season_data.items():
+                    for text_field, embedding_field in STORE_EMBEDDING_FIELDS:
+                        yield (season_num, episode_num, embedding_field), as_text(episode.get(text_field))
+
+        def write(season_num: int, embeddings_data: Dict[str, Dict[str, List[float]]]):
+            with open(self._get_embeddings_file(season_num), 'w') as f:
+                json.dump(embeddings_data, f, indent=2)
+
+        stats = EmbeddingStats()
+        current_season, embeddings_data = None, {}
+        for (season_num, episode_num, field), vector in embed_texts(
+            texts(), batch_size=batch_size, source="reembed", stats=stats
+        ):
+            if season_num != current_season:
+                if current_season is not None:
+                    write(current_season, embeddings_data)
+                current_season, embeddings_data = season_num, {}
+            if vector is not None:
+                embeddings_data.setdefault(episode_num, {})[field] = vector.tolist()
+        if current_season is not None:
+            write(current_season, embeddings_data)
+        self.build_similarity()
+        self._refresh_indexes()
+        self.bump_data_version()
+        return stats
+
+    def get_episode(self, season: int, episode: str, with_embeddings: bool = True) -> Optional[Dict[str, Any]]:
+        """Get episode data by season and episode number.
+
+        Pass ``with_embeddings=False`` to skip reading the (much larger) embeddings file.
+        """
         try:
             season_file = self._get_season_file(season)
             embeddings_file = self._get_embeddings_file(season)
@@ -158,7 +439,7 @@ class BuffyDocumentStore:
             episode_data = season_data[episode]
             
             # Load embeddings if they exist
-            if embeddings_file.exists():
+            if with_embeddings and embeddings_file.exists():
                 with open(embeddings_file, 'r') as f:
                     embeddings_data = json.load(f)
                 if episode in embeddings_data:
@@ -188,35 +469,37 @@ class BuffyDocumentStore:
         """Search episodes using semantic search."""
         try:
             # Encode query
-            query_embedding = self.embedder.encode(query)
+            with SEARCH_STAGE_SECONDS.time(backend="store", stage="encode"):
+                query_embedding = self.embedder.encode(query)
             
             # Search through all seasons
-            results = []
-            for season_file in self.episodes_path.glob("season_*.json"):
-                with open(season_file, 'r') as f:
-                    season_data = json.load(f)
+            with SEARCH_STAGE_SECONDS.time(backend="store", stage="scan"):
+                results = []
+                for season_file in self.episodes_path.glob("season_*.json"):
+                    with open(season_file, 'r') as f:
+                        season_data = json.load(f)
                 
-                # Get embeddings for this season
-                season_num = int(season_file.stem.split('_')[1])
-                embeddings_file = self._get_embeddings_file(season_num)
-                embeddings_data = {}
-                if embeddings_file.exists():
-                    with open(embeddings_file, 'r') as f:
-                        embeddings_data = json.load(f)
+                    # Get embeddings for this season
+                    season_num = int(season_file.stem.split('_')[1])
+                    embeddings_file = self._get_embeddings_file(season_num)
+                    embeddings_data = {}
+                    if embeddings_file.exists():
+                        with open(embeddings_file, 'r') as f:
+                            embeddings_data = json.load(f)
                 
-                # Calculate similarity for each episode
-                for episode_num, episode in season_data.items():
-                    if 'summary_embedding' in embeddings_data.get(episode_num, {}):
-                        episode_embedding = np.array(embeddings_data[episode_num]['summary_embedding'])
-                        similarity = np.dot(query_embedding, episode_embedding) / (
-                            np.linalg.norm(query_embedding) * np.linalg.norm(episode_embedding)
-                        )
-                        results.append({
-                            'season': season_num,
-                            'episode': episode_num,
-                            'data': episode,
-                            'score': float(similarity)
-                        })
+                    # Calculate similarity for each episode
+                    for episode_num, episode in season_data.items():
+                        if 'summary_embedding' in embeddings_data.get(episode_num, {}):
+                            episode_embedding = np.array(embeddings_data[episode_num]['summary_embedding'])
+                            similarity = np.dot(query_embedding, episode_embedding) / (
+                                np.linalg.norm(query_embedding) * np.linalg.norm(episode_embedding)
+                            )
+                            results.append({
+                                'season': season_num,
+                                'episode': episode_num,
+                                'data': episode,
+                                'score': float(similarity)
+                            })
             
             # Sort by similarity and return top results
             results.sort(key=lambda x: x['score'], reverse=True)
@@ -226,56 +509,67 @@ class BuffyDocumentStore:
             logger.error(f"Error searching episodes: {str(e)}")
             return []
 
+    @staticmethod
+    def episode_from_raw(season_num: int, episode: Dict[str, Any]) -> EpisodeDocument:
+        """Convert an episode in the crawl layout to an EpisodeDocument."""
+        return EpisodeDocument(
+            season_number=season_num,
+            episode_number=episode['episode_number'],
+            title=episode['episode_title'],
+            airdate=episode['episode_airdate'],
+            summary=episode.get('episode_summary', []),
+            synopsis=episode.get('episode_synopsis'),
+            quotes=episode.get('episode_quotes'),
+            trivia=episode.get('episode_trivia'),
+            director=episode.get('director'),
+            writer=episode.get('writer'),
+            production_code=episode.get('production_code'),
+            us_viewers_millions=episode.get('us_viewers_millions'),
+            original_air_date=episode.get('original_air_date'),
+            filming_location=episode.get('filming_location'),
+            network=episode.get('network'),
+            running_time=episode.get('running_time'),
+            budget=episode.get('budget'),
+            main_cast=episode.get('cast_main_cast'),
+            guest_stars=episode.get('cast_guest_stars'),
+            recurring_characters=episode.get('cast_recurring_characters'),
+            first_appearances=episode.get('cast_first_appearances'),
+            last_appearances=episode.get('cast_last_appearances'),
+            characters_introduced=episode.get('characters_introduced'),
+            characters_mentioned=episode.get('characters_mentioned'),
+            characters_died=episode.get('characters_died'),
+            continuity_notes=episode.get('continuity'),
+            cultural_references=episode.get('cultural_references'),
+            music=episode.get('music'),
+            mythology_references=episode.get('mythology_references'),
+            prophecies=episode.get('prophecies'),
+            arc_connections=episode.get('arc_connections'),
+            awards=episode.get('awards'),
+            death_count=episode.get('death_count'),
+            body_count=episode.get('body_count'),
+            summary_embedding=episode.get('summary_embedding'),
+            synopsis_embedding=episode.get('synopsis_embedding'),
+            quotes_embedding=episode.get('quotes_embedding')
+        )
+
     def import_from_json(self, json_path: str):
-        """Import data from a JSON file."""
+        """Import data from a JSON file (or a JSONL snapshot)."""
+        if Path(json_path).suffix == ".jsonl":
+            return self.import_from_jsonl(json_path)
+
         try:
             with open(json_path, 'r') as f:
                 data = json.load(f)
             
             for season_key, season_data in data.items():
                 season_num = int(season_key.split('_')[1])
-                for episode_num, episode in season_data.items():
-                    # Convert to EpisodeDocument
-                    doc = EpisodeDocument(
-                        season_number=season_num,
-                        episode_number=episode['episode_number'],
-                        title=episode['episode_title'],
-                        airdate=episode['episode_airdate'],
-                        summary=episode.get('episode_summary', []),
-                        synopsis=episode.get('episode_synopsis'),
-                        quotes=episode.get('episode_quotes'),
-                        trivia=episode.get('episode_trivia'),
-                        director=episode.get('director'),
-                        writer=episode.get('writer'),
-                        production_code=episode.get('production_code'),
-                        us_viewers_millions=episode.get('us_viewers_millions'),
-                        original_air_date=episode.get('original_air_date'),
-                        filming_location=episode.get('filming_location'),
-                        network=episode.get('network'),
-                        running_time=episode.get('running_time'),
-                        budget=episode.get('budget'),
-                        main_cast=episode.get('cast_main_cast'),
-                        guest_stars=episode.get('cast_guest_stars'),
-                        recurring_characters=episode.get('cast_recurring_characters'),
-                        first_appearances=episode.get('cast_first_appearances'),
-                        last_appearances=episode.get('cast_last_appearances'),
-                        characters_introduced=episode.get('characters_introduced'),
-                        characters_mentioned=episode.get('characters_mentioned'),
-                        characters_died=episode.get('characters_died'),
-                        continuity_notes=episode.get('continuity'),
-                        cultural_references=episode.get('cultural_references'),
-                        music=episode.get('music'),
-                        mythology_references=episode.get('mythology_references'),
-                        prophecies=episode.get('prophecies'),
-                        arc_connections=episode.get('arc_connections'),
-                        awards=episode.get('awards'),
-                        death_count=episode.get('death_count'),
-                        body_count=episode.get('body_count'),
-                        summary_embedding=episode.get('summary_embedding'),
-                        synopsis_embedding=episode.get('synopsis_embedding'),
-                        quotes_embedding=episode.get('quotes_embedding')
-                    )
-                    self.save_episode(doc)
+                docs = [
+                    self.episode_from_raw(season_num, episode)
+                    for episode in season_data.values()
+                ]
+                self.save_episodes(season_num, docs, update_similarity=False)
+            self.build_similarity()
+            self._refresh_indexes()
             
             logger.info(f"Successfully imported data from {json_path}")
             self.backup()
@@ -284,9 +578,62 @@ class BuffyDocumentStore:
             logger.error(f"Error importing data from {json_path}: {str(e)}")
             raise
 
-# Singleton instance
-store = BuffyDocumentStore()
+    def _import_records(self, records: Iterable[EpisodeRecord], to_document=None):
+        """Save a stream of episode records, buffering one season at a time.
+
+        Peak memory is bounded by the largest season rather than the input.
+        The similarity graph is left to the caller to rebuild.
+        """
+        to_document = to_document or self.episode_from_raw
+        # Reloaded on next use rather than patched one episode at a time
+        self._fragments.clear()
+        current_season = None
+        pending: List[EpisodeDocument] = []
+        for season_key, _, episode in records:
+            season_num = int(season_key.split('_')[1])
+            if season_num != current_season and pending:
+                self.save_episodes(current_season, pending, update_similarity=False)
+                pending = []
+            current_season = season_num
+            pending.append(to_document(season_num, episode))
+        if pending:
+            self.save_episodes(current_season, pending, update_similarity=False)
+
+    def import_from_jsonl(self, jsonl_path: str):
+        """Import data from a JSONL snapshot, streaming one episode at a time."""
+        try:
+            self._import_records(iter_snapshot(jsonl_path))
+            self.build_similarity()
+            self._refresh_indexes()
+            logger.info(f"Successfully imported data from {jsonl_path}")
+            self.backup()
+
+        except Exception as e:
+            logger.error(f"Error importing data from {jsonl_path}: {str(e)}")
+            raise
+
+    def import_snapshot(self, snapshots: SnapshotStore, name: Optional[str] = None):
+        """Import a crawl snapshot (the latest one by default)."""
+        name = name or snapshots.latest("crawl")
+        if not name:
+            raise FileNotFoundError("No crawl snapshot to import")
+        try:
+            self._import_records(snapshots.iter_manifest(name))
+            self.build_similarity()
+            self._refresh_indexes()
+            logger.info(f"Successfully imported crawl snapshot {name}")
+            self.backup()
+
+        except Exception as e:
+            logger.error(f"Error importing crawl snapshot {name}: {str(e)}")
+            raise
+
+# Singleton instance, created on first use
+store: Optional[BuffyDocumentStore] = None
 
 def get_store() -> BuffyDocumentStore:
     """Get the document store instance."""
+    global store
+    if store is None:
+        store = BuffyDocumentStore()
     return store 
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""Line-delimited episode snapshots.
+
+One JSON object per line: a header line describing the format, followed by
+one line per episode. Vectors are optionally stored as base64-encoded
+little-endian float32 so a 384-d embedding takes ~2 KB instead of ~8 KB of
+decimal text.
+"""
+import base64
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+FORMAT_NAME = "tvshowchat.episodes"
+FORMAT_VERSION = 1
+VECTOR_FIELDS = ("summary_embedding", "synopsis_embedding", "quotes_embedding")
+
+# (season label, episode number, episode data) as found in the crawl layout,
+# e.g. ("season_1", "01", {"episode_title": ..., ...})
+EpisodeRecord = Tuple[str, str, Dict[str, Any]]
+
+
+def encode_vector(values: Union[List[float], np.ndarray]) -> str:
+    """Encode a vector as base64 little-endian float32."""
+    return base64.b64encode(np.asarray(values, dtype="<f4").tobytes()).decode("ascii")
+
+
+def decode_vector(encoded: str) -> List[float]:
+    """Decode a base64 float32 vector back into a list of floats."""
+    return np.frombuffer(base64.b64decode(encoded), dtype="<f4").tolist()
+
+
+def iter_nested(data: Dict[str, Dict[str, Dict[str, Any]]]) -> Iterator[EpisodeRecord]:
+    """Flatten the nested ``{season: {episode: data}}`` layout into records."""
+    for season_label, season_data in data.items():
+        for episode_num, episode in season_data.items():
+            yield season_label, episode_num, episode
+
+
+def write_snapshot(
+    records: Iterable[EpisodeRecord], path: Union[str, Path], encode_vectors: bool = True
+) -> int:
+    """Write episode records to a JSONL snapshot. Returns the episode count."""
+    count = 0
+    with open(path, "w") as f:
+        header = {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "vectors": "b64f32" if encode_vectors else "list",
+        }
+        f.write(json.dumps(header) + "\n")
+        for season_label, episode_num, episode in records:
+            if encode_vectors:
+                episode = {
+                    k: encode_vector(v) if k in VECTOR_FIELDS and v is not None else v
+                    for k, v in episode.items()
+                }
+            line = {"season": season_label, "episode": episode_num, "data": episode}
+            f.write(json.dumps(line) + "\n")
+            count += 1
+    return count
+
+
+def read_header(path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+    """Read the header line of a snapshot, or None if it is not one."""
+    with open(path, "r") as f:
+        first = f.readline()
+    try:
+        header = json.loads(first)
+    except ValueError:
+        return None
+    if not isinstance(header, dict) or header.get("format") != FORMAT_NAME:
+        return None
+    return header
+
+
+def iter_snapshot(path: Union[str, Path]) -> Iterator[EpisodeRecord]:
+    """Stream episode records from a JSONL snapshot, one line at a time."""
+    with open(path, "r") as f:
+        header = json.loads(f.readline())
+        if header.get("format") != FORMAT_NAME:
+            raise ValueError(f"{path} is not an episode snapshot")
+        if header.get("version", 0) > FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {header['version']} in {path}")
+
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            episode = record["data"]
+            for key in VECTOR_FIELDS:
+                if isinstance(episode.get(key), str):
+                    episode[key] = decode_vector(episode[key])
+            yield record["season"], record["episode"], episode
+
+
+def json_to_jsonl(
+    src: Union[str, Path], dst: Union[str, Path], encode_vectors: bool = True
+) -> int:
+    """Convert a nested JSON crawl file into a JSONL snapshot."""
+    with open(src, "r") as f:
+        data = json.load(f)
+    return write_snapshot(iter_nested(data), dst, encode_vectors=encode_vectors)
+
+
+def jsonl_to_json(src: Union[str, Path], dst: Union[str, Path], indent: int = 4) -> int:
+    """Convert a JSONL snapshot back into the nested JSON crawl layout."""
+    data: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    count = 0
+    for season_label, episode_num, episode in iter_snapshot(src):
+        data.setdefault(season_label, {})[episode_num] = episode
+        count += 1
+    with open(dst, "w") as f:
+        json.dump(data, f, indent=indent)
+    return count
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert between JSON and JSONL episode files.")
+    parser.add_argument("direction", choices=["to-jsonl", "to-json"])
+    parser.add_argument("src")
+    parser.add_argument("dst")
+    parser.add_argument("--plain-vectors", action="store_true", help="Keep vectors as float lists")
+    args = parser.parse_args()
+
+    if args.direction == "to-jsonl":
+        n = json_to_jsonl(args.src, args.dst, encode_vectors=not args.plain_vectors)
+    else:
+        n = jsonl_to_json(args.src, args.dst)
+    print(f"Converted {n} episodes: {args.src} -> {args.dst}")
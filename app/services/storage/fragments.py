@@ -0,0 +1,100 @@
+"""Pre-serialized JSON for each episode's public fields.
+
+Search responses repeat the same episode documents on every request, so
+each episode is serialized once (with orjson when installed) and kept as
+bytes. A response is assembled by splicing those fragments with the
+per-query score and rank, so serialization cost no longer depends on
+document size.
+"""
+import json
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.services.storage.episode_jsonl import EpisodeRecord
+
+try:
+    import orjson
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value)
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+EpisodeKey = Tuple[int, str]
+Headline = Tuple[Optional[str], Optional[str]]
+
+# Fields of a search result besides score and rank, in response order
+FRAGMENT_FIELDS = ("title", "airdate", "summary", "synopsis", "quotes", "trivia")
+
+
+def episode_fragment(season: int, episode: str, data: Dict[str, Any]) -> bytes:
+    """The serialized public part of one episode."""
+    document = {"season_number": season, "episode_number": episode}
+    for field in FRAGMENT_FIELDS:
+        document[field] = data.get(field)
+    return dumps(document)
+
+
+def splice(fragment: bytes, score: float, rank: int) -> bytes:
+    """``fragment`` with score and rank added as its first members."""
+    return b'{"score":' + dumps(float(score)) + b',"rank":' + str(rank).encode() + b"," + fragment[1:]
+
+
+def results_body(parts: Iterable[bytes]) -> bytes:
+    return b'{"results":[' + b",".join(parts) + b"]}"
+
+
+class FragmentCache:
+    """Fragments for every stored episode, loaded in one pass on first use.
+
+    ``put`` keeps a loaded cache current as episodes are saved; ``clear``
+    makes the next lookup reload everything. Each episode's title and
+    airdate are kept alongside, for lists that need no more than that.
+    """
+
+    def __init__(self):
+        self._fragments: Dict[EpisodeKey, bytes] = {}
+        self._headlines: Dict[EpisodeKey, Headline] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, records: Iterable[EpisodeRecord]) -> int:
+        fragments, headlines = {}, {}
+        for season_key, episode_num, episode in records:
+            season = int(season_key.split("_")[1])
+            fragments[(season, episode_num)] = episode_fragment(season, episode_num, episode)
+            headlines[(season, episode_num)] = (episode.get("title"), episode.get("airdate"))
+        with self._lock:
+            self._fragments = fragments
+            self._headlines = headlines
+            self._loaded = True
+        return len(fragments)
+
+    def get(self, season: int, episode: str) -> Optional[bytes]:
+        return self._fragments.get((season, episode))
+
+    def headline(self, season: int, episode: str) -> Optional[Headline]:
+        """``(title, airdate)`` of a stored episode."""
+        return self._headlines.get((season, episode))
+
+    def put(self, season: int, episode: str, data: Dict[str, Any]):
+        # Until loaded, the next load reads the saved episode anyway
+        if self._loaded:
+            fragment = episode_fragment(season, episode, data)
+            with self._lock:
+                self._fragments[(season, episode)] = fragment
+                self._headlines[(season, episode)] = (data.get("title"), data.get("airdate"))
+
+    def clear(self):
+        with self._lock:
+            self._fragments = {}
+            self._headlines = {}
+            self._loaded = False
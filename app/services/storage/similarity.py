@@ -0,0 +1,183 @@
+"""Precomputed "episodes like this one" graph.
+
+Each episode's top-N neighbours by cosine similarity of one embedding field,
+stored as int32 row ids and float16 scores (``-1`` pads rows with fewer
+neighbours). Lookups are a dict hit and a row slice.
+
+``build`` computes all pairs in row blocks sized to ``BLOCK_BYTES``, so
+large catalogues never hold the full n x n matrix. ``update`` folds one
+changed or new episode in with a single matrix-vector product. Only rows
+that lose that episode as a neighbour are rescanned.
+"""
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_N = 10
+DEFAULT_FIELD = "summary_embedding"
+# Working set of one block of the all-pairs product
+BLOCK_BYTES = 256 * 1024 * 1024
+
+EpisodeKey = Tuple[int, str]
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+def _top_rows(sims: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Top ``n`` columns per row of ``sims``, best first, padded with -1 ids."""
+    rows, cols = sims.shape
+    ids = np.full((rows, n), -1, dtype=np.int32)
+    scores = np.zeros((rows, n), dtype=np.float16)
+    k = min(n, cols)
+    if k == 0:
+        return ids, scores
+    top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(sims, top, 1)
+    order = np.argsort(-top_scores, axis=1)
+    top, top_scores = np.take_along_axis(top, order, 1), np.take_along_axis(top_scores, order, 1)
+    valid = top_scores > -np.inf
+    ids[:, :k] = np.where(valid, top, -1)
+    scores[:, :k] = np.where(valid, top_scores, 0)
+    return ids, scores
+
+
+class SimilarityGraph:
+    def __init__(
+        self,
+        keys: List[EpisodeKey],
+        neighbours: np.ndarray,
+        scores: np.ndarray,
+        matrix: Optional[np.ndarray] = None,
+        field: str = DEFAULT_FIELD,
+    ):
+        self.keys = list(keys)
+        self.neighbours = neighbours  # (n, top_n) int32
+        self.scores = scores  # (n, top_n) float16
+        # Normalized vectors, needed only for updates; not persisted
+        self.matrix = matrix
+        self.field = field
+        self._rows = {key: i for i, key in enumerate(self.keys)}
+        self._lock = threading.Lock()
+
+    @property
+    def top_n(self) -> int:
+        return self.neighbours.shape[1]
+
+    def __contains__(self, key: EpisodeKey) -> bool:
+        return key in self._rows
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def build(
+        cls,
+        keys: List[EpisodeKey],
+        vectors: np.ndarray,
+        top_n: int = DEFAULT_TOP_N,
+        field: str = DEFAULT_FIELD,
+    ) -> "SimilarityGraph":
+        matrix = _normalize(np.asarray(vectors, dtype=np.float32))
+        n = len(keys)
+        neighbours = np.full((n, top_n), -1, dtype=np.int32)
+        scores = np.zeros((n, top_n), dtype=np.float16)
+        block = max(1, BLOCK_BYTES // (4 * max(n, 1)))
+        for start in range(0, n, block):
+            end = min(start + block, n)
+            sims = matrix[start:end] @ matrix.T
+            sims[np.arange(end - start), np.arange(start, end)] = -np.inf
+            neighbours[start:end], scores[start:end] = _top_rows(sims, top_n)
+        return cls(keys, neighbours, scores, matrix, field)
+
+    def similar(self, season: int, episode: str, limit: Optional[int] = None) -> Optional[List[Tuple[int, str, float]]]:
+        """(season, episode, score) neighbours, best first; None if the episode is not in the graph."""
+        with self._lock:
+            row = self._rows.get((season, episode))
+            if row is None:
+                return None
+            ids, scores = self.neighbours[row, :limit], self.scores[row, :limit]
+            return [(*self.keys[i], float(s)) for i, s in zip(ids.tolist(), scores.tolist()) if i >= 0]
+
+    def update(self, key: EpisodeKey, vector: Union[List[float], np.ndarray]):
+        """Insert or replace one episode's vector and repair the affected rows."""
+        if self.matrix is None:
+            raise ValueError("Similarity graph was loaded without vectors; attach them before updating")
+        vector = _normalize(np.asarray(vector, dtype=np.float32)[None, :])[0]
+        with self._lock:
+            i = self._rows.get(key)
+            if i is None:
+                i = len(self.keys)
+                self.keys.append(key)
+                self._rows[key] = i
+                self.matrix = np.vstack([self.matrix, vector[None, :]])
+                self.neighbours = np.vstack([self.neighbours, np.full((1, self.top_n), -1, dtype=np.int32)])
+                self.scores = np.vstack([self.scores, np.zeros((1, self.top_n), dtype=np.float16)])
+            else:
+                self.matrix[i] = vector
+
+            sims = self.matrix @ vector
+            sims[i] = -np.inf
+            ids, scores = _top_rows(sims[None, :], self.top_n)
+            self.neighbours[i], self.scores[i] = ids[0], scores[0]
+
+            valid = self.neighbours >= 0
+            full = valid.all(axis=1)
+            # Anything outside a full row scores at most the row's last (lowest) entry
+            floor = np.where(full, self.scores[:, -1].astype(np.float32), -np.inf)
+            holds = (self.neighbours == i).any(axis=1)
+            holds[i] = False
+            # Rows where i dropped below the floor may now miss a better episode
+            rescan = np.flatnonzero(holds & (sims < floor))
+            # Rows that keep or gain i are repaired in place
+            patch = np.flatnonzero((holds & (sims >= floor)) | (~holds & (sims > floor)))
+            patch = patch[patch != i]
+            for j in patch.tolist():
+                ids = self.neighbours[j]
+                slot = np.flatnonzero(ids == i)
+                if slot.size == 0:
+                    slot = np.flatnonzero(ids < 0)[:1] if not full[j] else np.array([self.top_n - 1])
+                ids[slot[0]] = i
+                self.scores[j, slot[0]] = sims[j]
+                order = np.argsort(-np.where(ids >= 0, self.scores[j].astype(np.float32), -np.inf), kind="stable")
+                self.neighbours[j], self.scores[j] = ids[order], self.scores[j][order]
+            if rescan.size:
+                row_sims = self.matrix[rescan] @ self.matrix.T
+                row_sims[np.arange(rescan.size), rescan] = -np.inf
+                self.neighbours[rescan], self.scores[rescan] = _top_rows(row_sims, self.top_n)
+
+    def save(self, path: Union[str, Path]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp.npz")
+        with self._lock:
+            np.savez(
+                tmp,
+                seasons=np.asarray([season for season, _ in self.keys], dtype=np.int32),
+                episodes=np.asarray([episode for _, episode in self.keys], dtype=str),
+                neighbours=self.neighbours,
+                scores=self.scores,
+                field=np.array(self.field),
+            )
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "SimilarityGraph":
+        with np.load(path) as data:
+            keys = list(zip(data["seasons"].tolist(), data["episodes"].tolist()))
+            return cls(keys, data["neighbours"], data["scores"], field=str(data["field"]))
+
+    def attach_vectors(self, vectors: Dict[EpisodeKey, np.ndarray]):
+        """Attach the vectors (key -> vector) of a loaded graph so it can be updated.
+
+        Raises KeyError if an episode in the graph has no vector.
+        """
+        self.matrix = _normalize(np.asarray([vectors[key] for key in self.keys], dtype=np.float32))
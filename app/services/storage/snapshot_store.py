@@ -0,0 +1,147 @@
+"""Content-addressed episode snapshots.
+
+Each episode is stored once as a blob named by the SHA-256 of its canonical
+JSON. A snapshot is a small manifest mapping ``season/episode`` to blob
+hashes, and a ref file per kind (``crawl``, ``backup``) names the latest
+manifest. Committing a snapshot only writes blobs that changed, and
+rolling back is a matter of pointing the ref at an older manifest.
+
+Layout::
+
+    <root>/blobs/ab/abcdef...json
+    <root>/manifests/<kind>_<timestamp>.json
+    <root>/refs/<kind>
+"""
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.services.storage.episode_jsonl import EpisodeRecord
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_ROOT = "app/content/snapshots"
+
+
+def _canonical(episode: Dict[str, Any]) -> bytes:
+    return json.dumps(episode, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def _atomic_write(path: Path, data: bytes):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class SnapshotStore:
+    def __init__(self, root: str = DEFAULT_SNAPSHOT_ROOT):
+        self.root = Path(root)
+        self.blobs_path = self.root / "blobs"
+        self.manifests_path = self.root / "manifests"
+        self.refs_path = self.root / "refs"
+        for path in (self.blobs_path, self.manifests_path, self.refs_path):
+            path.mkdir(parents=True, exist_ok=True)
+
+    def _blob_file(self, digest: str) -> Path:
+        return self.blobs_path / digest[:2] / f"{digest}.json"
+
+    def put_blob(self, episode: Dict[str, Any]) -> Tuple[str, bool]:
+        """Store an episode blob if not already present.
+
+        Returns the hash and whether a new blob was written.
+        """
+        data = _canonical(episode)
+        digest = hashlib.sha256(data).hexdigest()
+        blob_file = self._blob_file(digest)
+        if blob_file.exists():
+            return digest, False
+        blob_file.parent.mkdir(exist_ok=True)
+        _atomic_write(blob_file, data)
+        return digest, True
+
+    def get_blob(self, digest: str) -> Dict[str, Any]:
+        with open(self._blob_file(digest), "r") as f:
+            return json.load(f)
+
+    def commit(
+        self, records: Iterable[EpisodeRecord], kind: str = "crawl", layout: str = "crawl"
+    ) -> str:
+        """Record a snapshot of the given episodes and make it the latest for ``kind``.
+
+        ``layout`` says how blobs are shaped: ``crawl`` for the scraper's
+        ``episode_*`` keys, ``store`` for EpisodeDocument dicts.
+        Returns the manifest name.
+        """
+        episodes: Dict[str, str] = {}
+        new_blobs = 0
+        for season_label, episode_num, episode in records:
+            digest, created = self.put_blob(episode)
+            new_blobs += created
+            episodes[f"{season_label}/{episode_num}"] = digest
+
+        parent = self.latest(kind)
+        if parent and self.read_manifest(parent)["episodes"] == episodes:
+            logger.info(f"Snapshot unchanged from {parent}, not creating a new manifest")
+            return parent
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        name = f"{kind}_{timestamp}"
+        manifest = {
+            "name": name,
+            "kind": kind,
+            "layout": layout,
+            "created": datetime.now().isoformat(),
+            "parent": parent,
+            "episodes": episodes,
+        }
+        _atomic_write(self.manifests_path / f"{name}.json", json.dumps(manifest, indent=2).encode("utf-8"))
+        self.set_latest(kind, name)
+        logger.info(f"Committed snapshot {name}: {len(episodes)} episodes, {new_blobs} new blobs")
+        return name
+
+    def read_manifest(self, name: str) -> Dict[str, Any]:
+        with open(self.manifests_path / f"{name}.json", "r") as f:
+            return json.load(f)
+
+    def latest(self, kind: str = "crawl") -> Optional[str]:
+        """Name of the latest manifest for ``kind``, read from its ref file."""
+        ref = self.refs_path / kind
+        if not ref.exists():
+            return None
+        return ref.read_text().strip() or None
+
+    def set_latest(self, kind: str, name: str):
+        """Point the ``kind`` ref at a manifest; this is how rollback works."""
+        if not (self.manifests_path / f"{name}.json").exists():
+            raise FileNotFoundError(f"No such snapshot manifest: {name}")
+        _atomic_write(self.refs_path / kind, name.encode("utf-8"))
+
+    def list_manifests(self, kind: Optional[str] = None) -> List[str]:
+        names = sorted(p.stem for p in self.manifests_path.glob("*.json"))
+        if kind:
+            names = [n for n in names if n.startswith(f"{kind}_")]
+        return names
+
+    def iter_manifest(self, name: str) -> Iterator[EpisodeRecord]:
+        """Stream the episodes of a snapshot as (season, episode, data) records."""
+        manifest = self.read_manifest(name)
+        for key, digest in manifest["episodes"].items():
+            season_label, episode_num = key.split("/", 1)
+            yield season_label, episode_num, self.get_blob(digest)
+
+    def gc(self) -> int:
+        """Delete blobs not referenced by any manifest. Returns the number removed."""
+        referenced: Set[str] = set()
+        for name in self.list_manifests():
+            referenced.update(self.read_manifest(name)["episodes"].values())
+        removed = 0
+        for blob_file in self.blobs_path.glob("*/*.json"):
+            if blob_file.stem not in referenced:
+                blob_file.unlink()
+                removed += 1
+        return removed
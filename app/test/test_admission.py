@@ -0,0 +1,134 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.monitoring.admission import (
+    BATCH_PATHS,
+    AdmissionController,
+    AdmissionMiddleware,
+    Overloaded,
+    build_admission_controller,
+    set_admission_controller,
+)
+
+
+def test_queue_bound_deadline_and_handover():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=1, deadline=1.0)
+        await controller.acquire()
+
+        queued = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as full:
+            await controller.acquire()
+        assert full.value.reason == "queue_full" and full.value.retry_after >= 1
+
+        # The slot goes straight to the queued request
+        controller.release(0.4)
+        await asyncio.wait_for(queued, 1)
+        assert controller.snapshot()["in_flight"] == 1
+
+        # 0.4s per search: one ahead plus our own no longer fits a 0.5s budget
+        with pytest.raises(Overloaded) as late:
+            await controller.acquire(timeout=0.5)
+        assert late.value.reason == "deadline"
+        controller.release(0.4)
+        return controller.snapshot()
+
+    snapshot = asyncio.run(scenario())
+    assert snapshot["in_flight"] == 0 and snapshot["queued"] == 0
+    assert snapshot["admitted"] == 2 and snapshot["shed"] == {"queue_full": 1, "deadline": 1}
+
+
+def test_queued_request_gives_up_at_its_deadline():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=4, deadline=0.05)
+        await controller.acquire()
+        with pytest.raises(Overloaded):
+            await controller.acquire()
+        assert controller.snapshot()["queued"] == 0
+        controller.release()
+        await controller.acquire()
+
+    asyncio.run(scenario())
+
+
+def test_middleware_sheds_search_but_not_health():
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware, paths=["/search"])
+    started, release = threading.Event(), threading.Event()
+
+    @app.post("/search")
+    def search():
+        started.set()
+        release.wait(5)
+        return {"status": "success"}
+
+    @app.get("/health")
+    def health():
+        return {"status": "healthy"}
+
+    set_admission_controller(AdmissionController(max_concurrent=1, max_queue=0))
+    try:
+        client = TestClient(app)
+        first = {}
+        worker = threading.Thread(target=lambda: first.update(r=client.post("/search")))
+        worker.start()
+        assert started.wait(5)
+
+        shed = client.post("/search")
+        assert shed.status_code == 503 and shed.headers["retry-after"] == "1"
+        assert shed.json()["status"] == "error"
+        assert client.get("/health").status_code == 200
+
+        release.set()
+        worker.join(5)
+        assert first["r"].status_code == 200
+        assert client.post("/search").status_code == 200
+    finally:
+        release.set()
+        set_admission_controller(None)
+
+
+def test_batch_jobs_have_their_own_pool():
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware, paths=["/api/search"])
+    app.add_middleware(AdmissionMiddleware, paths=BATCH_PATHS, pool="batch")
+    started, release = threading.Event(), threading.Event()
+
+    @app.post("/api/search/batch")
+    def batch():
+        started.set()
+        release.wait(5)
+        return {"status": "success"}
+
+    @app.post("/api/search")
+    def search():
+        return {"status": "success"}
+
+    assert build_admission_controller("batch").max_concurrent == 1
+    set_admission_controller(AdmissionController("batch", max_concurrent=1, max_queue=0), pool="batch")
+    set_admission_controller(AdmissionController(max_concurrent=1, max_queue=0))
+    try:
+        client = TestClient(app)
+        first = {}
+        worker = threading.Thread(target=lambda: first.update(r=client.post("/api/search/batch")))
+        worker.start()
+        assert started.wait(5)
+
+        # A second job is shed while the first holds the only batch slot...
+        shed = client.post("/api/search/batch")
+        assert shed.status_code == 503 and shed.headers["retry-after"] == "1"
+        # ...and interactive searches are not held up by it
+        assert client.post("/api/search").status_code == 200
+
+        release.set()
+        worker.join(5)
+        assert first["r"].status_code == 200
+    finally:
+        release.set()
+        set_admission_controller(None, pool="batch")
+        set_admission_controller(None)
@@ -0,0 +1,56 @@
+import numpy as np
+
+from app.services.embeddings import model
+from app.services.embeddings.batch import EmbeddingStats, embed_texts
+from app.services.storage.document_store import BuffyDocumentStore, EpisodeDocument
+from benchmarks.standins import HashEncoder
+
+
+class _RecordingEncoder(HashEncoder):
+    def __init__(self):
+        super().__init__(dim=8)
+        self.calls = []
+
+    def encode(self, sentences, **kwargs):
+        self.calls.append(list(sentences))
+        return super().encode(sentences)
+
+
+def test_results_come_back_in_input_order_from_length_sorted_batches():
+    encoder = _RecordingEncoder()
+    texts = ["a " * n for n in (9, 1, 5, 3, 7, 2)] + [""]
+    stats = EmbeddingStats()
+    results = list(embed_texts(enumerate(texts), encoder=encoder, batch_size=2, stats=stats))
+
+    assert [i for i, _ in results] == list(range(len(texts)))
+    assert results[-1][1] is None
+    for i, vector in results[:-1]:
+        np.testing.assert_allclose(vector, HashEncoder(dim=8).encode(texts[i]))
+
+    # Batches hold neighbours in length: 1+2, 3+5, 7+9 words
+    assert [[len(t.split()) for t in call] for call in encoder.calls] == [[1, 2], [3, 5], [7, 9]]
+    assert stats.texts == 7 and stats.batches == 3
+    assert stats.tokens == sum(n + 2 for n in (9, 1, 5, 3, 7, 2))
+    assert 0 < stats.padding_ratio < 0.2
+
+
+def test_reembed_rewrites_store_embeddings(tmp_path, monkeypatch):
+    monkeypatch.setattr(model, "_embedder", HashEncoder())
+    store = BuffyDocumentStore(base_path=str(tmp_path))
+    store.save_episodes(1, [
+        EpisodeDocument(1, "01", "Welcome to the Hellmouth", "March 10, 1997",
+                        summary=["Buffy arrives in Sunnydale."], summary_embedding=[0.0] * 384),
+        EpisodeDocument(1, "02", "The Harvest", "March 10, 1997",
+                        summary=["Buffy fights the Master's minions."], synopsis=["Luke attacks."]),
+    ])
+
+    version = store.data_version()
+    stats = store.reembed()
+    assert stats.texts == 6
+    # Cached results computed from the old embeddings are no longer served
+    assert store.data_version() != version
+
+    first = store.get_episode(1, "01")
+    np.testing.assert_allclose(first["summary_embedding"], HashEncoder().encode("Buffy arrives in Sunnydale."), atol=1e-6)
+    assert "synopsis_embedding" not in first
+    assert "synopsis_embedding" in store.get_episode(1, "02")
@@ -0,0 +1,69 @@
+from app.services.search import entities
+from app.services.search.entities import EntityIndex, EntityTerm, get_entity_index
+from app.services.storage import document_store
+from app.services.storage.document_store import BuffyDocumentStore, EpisodeDocument
+
+
+def _records():
+    yield "season_2", "13", {
+        "title": "Surprise",
+        "main_cast": ["Sarah Michelle Gellar as Buffy Summers", "Alyson Hannigan as Willow Rosenberg"],
+        "recurring_characters": ["Robia LaMorte as Jenny Calendar"],
+        "guest_stars": ["Armin Shimerman as Principal Snyder"],
+    }
+    yield "season_2", "17", {
+        "title": "Passion",
+        "main_cast": ["Buffy Summers", "Willow Rosenberg"],
+        "recurring_characters": ["Ms. Calendar"],
+        "characters_died": ["Jenny Calendar"],
+    }
+    yield "season_10", "01", {"title": "Far Future", "main_cast": ["Buffy"]}
+    yield "season_3", "03", {
+        "title": "Faith, Hope & Trick",
+        "main_cast": ["Buffy Summers"],
+        "first_appearances": ["Faith Lehane"],
+        "characters_mentioned": ["Janna Kalderash (flashback)"],
+    }
+
+
+def test_aliases_roles_and_set_queries():
+    index = EntityIndex.from_records(_records())
+
+    assert index.resolve("JANNA KALDERASH") == index.resolve("ms calendar") == "jenny calendar"
+    assert index.resolve("Snyder") == "principal snyder"
+    assert index.resolve("Robia LaMorte") == "robia lamorte"
+    assert index.resolve("Glory") is None
+
+    # Postings follow season order, not string order (season_10 last)
+    assert index.query([EntityTerm("Buffy")]) == [(2, "13"), (2, "17"), (3, "03"), (10, "01")]
+    assert index.query([EntityTerm("Jenny Calendar", "died")]) == [(2, "17")]
+    # Mentioned does not count as appearing
+    assert index.query([EntityTerm("Jenny Calendar")]) == [(2, "13"), (2, "17")]
+    assert index.query([EntityTerm("Jenny Calendar", "any")])[-1] == (3, "03")
+
+    assert index.query(
+        all_of=[EntityTerm("Buffy Summers")],
+        any_of=[EntityTerm("Faith"), EntityTerm("Willow")],
+        none_of=[EntityTerm("Jenny Calendar", "died")],
+    ) == [(2, "13"), (3, "03")]
+    assert index.query([EntityTerm("Buffy")], seasons=[3, 10]) == [(3, "03"), (10, "01")]
+    assert index.query([EntityTerm("Buffy"), EntityTerm("Glory")]) == []
+    assert index.display["jenny calendar"] == "Jenny Calendar"
+    assert index.title((2, "17")) == "Passion"
+
+
+def test_saved_episodes_reach_the_shared_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(document_store, "store", BuffyDocumentStore(base_path=str(tmp_path)))
+    entities.set_entity_index(None)
+    try:
+        store = document_store.get_store()
+        store.save_episode(EpisodeDocument(2, "13", "Surprise", "1998", summary=["..."], main_cast=["Buffy Summers"]))
+        assert get_entity_index().query([EntityTerm("Buffy")]) == [(2, "13")]
+
+        store.save_episode(EpisodeDocument(
+            2, "17", "Passion", "1998", summary=["..."], main_cast=["Buffy Summers"], characters_died=["Jenny Calendar"],
+        ))
+        assert get_entity_index().query([EntityTerm("Buffy")]) == [(2, "13"), (2, "17")]
+        assert get_entity_index().query([EntityTerm("Jenny Calendar", "died")]) == [(2, "17")]
+    finally:
+        entities.set_entity_index(None)
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from app.services.storage.episode_jsonl import (
+    decode_vector,
+    encode_vector,
+    iter_snapshot,
+    json_to_jsonl,
+    jsonl_to_json,
+    read_header,
+)
+
+
+@pytest.fixture
+def nested_data():
+    return {
+        "season_1": {
+            "01": {
+                "episode_number": "01",
+                "episode_title": "Welcome to the Hellmouth",
+                "summary_embedding": [0.5, -0.25, 0.125],
+            },
+            "02": {"episode_number": "02", "episode_title": "The Harvest"},
+        },
+        "season_2": {
+            "01": {
+                "episode_number": "01",
+                "episode_title": "When She Was Bad",
+                "summary_embedding": [1.0, 0.0, -1.0],
+                "quotes_embedding": None,
+            },
+        },
+    }
+
+
+def test_vector_roundtrip():
+    values = [0.5, -0.25, 0.125, 3.0]
+    assert decode_vector(encode_vector(values)) == values
+
+
+def test_json_jsonl_roundtrip(tmp_path, nested_data):
+    src = tmp_path / "in.json"
+    src.write_text(json.dumps(nested_data))
+
+    assert json_to_jsonl(src, tmp_path / "snap.jsonl") == 3
+    assert read_header(tmp_path / "snap.jsonl")["vectors"] == "b64f32"
+    assert read_header(src) is None
+
+    records = list(iter_snapshot(tmp_path / "snap.jsonl"))
+    assert [(s, e) for s, e, _ in records] == [
+        ("season_1", "01"),
+        ("season_1", "02"),
+        ("season_2", "01"),
+    ]
+
+    assert jsonl_to_json(tmp_path / "snap.jsonl", tmp_path / "out.json") == 3
+    with open(tmp_path / "out.json") as f:
+        assert json.load(f) == nested_data
+
+
+def test_iter_snapshot_rejects_other_files(tmp_path):
+    path = tmp_path / "other.jsonl"
+    path.write_text('{"hello": "world"}\n')
+    with pytest.raises(ValueError):
+        list(iter_snapshot(path))
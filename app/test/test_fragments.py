@@ -0,0 +1,34 @@
+import json
+
+from app.services.storage.document_store import BuffyDocumentStore, EpisodeDocument
+from app.services.storage.fragments import results_body, splice
+
+
+def _episode(number: str, title: str) -> EpisodeDocument:
+    return EpisodeDocument(
+        season_number=2, episode_number=number, title=title, airdate="1997-10-27",
+        summary=["Ethan’s costumes come to life."], director="Bruce Seth Green",
+    )
+
+
+def test_fragments_follow_saves_and_splice_into_valid_json(tmp_path):
+    store = BuffyDocumentStore(base_path=str(tmp_path))
+    store.save_episodes(2, [_episode("06", "Halloween"), _episode("07", "Lie to Me")])
+
+    body = results_body([
+        splice(store.episode_fragment(2, "07"), 0.91, 1),
+        splice(store.episode_fragment(2, "06"), 0.5, 2),
+    ])
+    first, second = json.loads(body)["results"]
+    assert first == {
+        "score": 0.91, "rank": 1, "season_number": 2, "episode_number": "07", "title": "Lie to Me",
+        "airdate": "1997-10-27", "summary": ["Ethan’s costumes come to life."],
+        "synopsis": None, "quotes": None, "trivia": None,
+    }
+    assert second["rank"] == 2
+
+    # A loaded cache is patched on save; imports reload it
+    store.save_episode(_episode("06", "Halloween (edited)"))
+    assert json.loads(store.episode_fragment(2, "06"))["title"] == "Halloween (edited)"
+    assert store.episode_headline(2, "06") == {"title": "Halloween (edited)", "airdate": "1997-10-27"}
+    assert store.episode_fragment(3, "01") is None
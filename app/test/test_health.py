@@ -0,0 +1,51 @@
+from app.services.monitoring.health import STALE_AFTER_INTERVALS, HealthMonitor
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_probes_update_cached_status_and_history():
+    clock = Clock()
+    redis_up = {"ok": True}
+
+    def ping():
+        if not redis_up["ok"]:
+            raise ConnectionError("connection refused")
+
+    monitor = HealthMonitor({"redis": ping, "model": lambda: None}, interval=10, clock=clock)
+    assert monitor.status("redis")["status"] == "unknown"
+
+    # Startup results have no latency and do not enter the history
+    monitor.record("redis")
+    assert monitor.healthy("redis") and monitor.history() == {}
+
+    clock.now += 10
+    redis_up["ok"] = False
+    status = monitor.check("redis")
+    assert status["status"] == "unhealthy" and "connection refused" in status["error"]
+    assert status["last_healthy_at"] == 1000.0
+
+    clock.now += 10
+    redis_up["ok"] = True
+    monitor.check_all()
+    assert monitor.healthy("redis") and monitor.healthy("model")
+    assert [h["ok"] for h in monitor.history()["redis"]] == [False, True]
+
+
+def test_running_monitor_reports_stale_results_as_unhealthy():
+    clock = Clock()
+    monitor = HealthMonitor({"store": lambda: None}, interval=60, clock=clock)
+    monitor.check("store")
+    monitor.start()
+    try:
+        assert monitor.healthy("store")
+        clock.now += STALE_AFTER_INTERVALS * 60 + 1
+        status = monitor.status("store")
+        assert status["status"] == "unhealthy" and "No health check" in status["error"]
+    finally:
+        monitor.stop()
@@ -0,0 +1,16 @@
+import pytest
+
+from benchmarks.loadgen import QueryReplay, _next_query
+
+
+def test_replay_keeps_log_order_and_loops_only_when_asked():
+    replay = QueryReplay(["slayer", "willow spell", "angel soul"])
+    assert _next_query("health", replay) is None
+    assert [_next_query("api_search", replay) for _ in range(3)] == ["slayer", "willow spell", "angel soul"]
+    assert replay.exhausted
+    with pytest.raises(IndexError):
+        replay.next()
+
+    looping = QueryReplay(["a", "b"], loop=True)
+    assert [looping.next() for _ in range(5)] == ["a", "b", "a", "b", "a"]
+    assert not looping.exhausted
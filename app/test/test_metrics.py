@@ -0,0 +1,43 @@
+import threading
+
+from app.services.monitoring.metrics import MetricsRegistry, result_count_bucket
+
+
+def test_histogram_merges_thread_shards():
+    registry = MetricsRegistry()
+    hist = registry.histogram("stage_seconds", "Stage latency.", labels=("stage",), buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            hist.observe(0.05, stage="scan")
+        hist.observe(5.0, stage="encode")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    series = hist.collect()
+    assert series[("scan",)][:3] == [4000, 0, 0]
+    assert series[("encode",)][:3] == [0, 0, 4]
+
+    text = registry.expose()
+    assert 'stage_seconds_bucket{stage="scan",le="0.1"} 4000' in text
+    assert 'stage_seconds_bucket{stage="encode",le="+Inf"} 4' in text
+    assert 'stage_seconds_count{stage="encode"} 4' in text
+
+
+def test_counter_and_registration():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests.", labels=("status",))
+    assert registry.counter("requests_total", "Requests.", labels=("status",)) is counter
+
+    counter.inc(status="ok")
+    counter.inc(2, status="ok")
+    assert 'requests_total{status="ok"} 3' in registry.expose()
+
+
+def test_result_counts_are_bucketed():
+    counts = [0, 1, 5, 6, 20, 21, 10000]
+    assert [result_count_bucket(n) for n in counts] == ["0", "1-5", "1-5", "6-20", "6-20", ">20", ">20"]
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.embeddings.onnx_encoder import MODEL_DIR, ONNX_FILE, ONNX_INT8_FILE, OnnxEncoder, pool
+
+
+class _TableSession:
+    """Stands in for an InferenceSession: each token id maps to a fixed vector."""
+
+    def __init__(self, dim=384):
+        self.table = np.random.default_rng(0).standard_normal((30522, dim)).astype(np.float32)
+
+    def get_inputs(self):
+        return [SimpleNamespace(name=n) for n in ("input_ids", "attention_mask", "token_type_ids")]
+
+    def run(self, outputs, feeds):
+        return [self.table[feeds["input_ids"]]]
+
+
+def test_mean_pooling_ignores_padding():
+    tokens = np.array([[[1.0, 1.0], [3.0, 3.0], [100.0, 100.0]]])
+    mask = np.array([[1, 1, 0]])
+    np.testing.assert_allclose(pool(tokens, mask, {"pooling_mode_mean_tokens": True}), [[2.0, 2.0]])
+
+
+def test_encoder_matches_manual_pipeline_and_is_padding_invariant():
+    session = _TableSession()
+    encoder = OnnxEncoder(session=session)
+    short, long = "Buffy slays.", "Giles researches an ancient prophecy in the Sunnydale library."
+
+    alone = encoder.encode(short)
+    batch = encoder.encode([short, long])
+    assert alone.shape == (encoder.dimension,)
+    assert batch.shape == (2, encoder.dimension)
+    np.testing.assert_allclose(batch[0], alone, atol=1e-6)
+
+    ids = encoder.tokenizer.encode(short).ids
+    expected = session.table[ids].mean(axis=0)
+    np.testing.assert_allclose(alone, expected / np.linalg.norm(expected), atol=1e-6)
+    assert np.linalg.norm(batch, axis=1) == pytest.approx([1.0, 1.0])
+
+
+@pytest.mark.parametrize("onnx_file,quantized", [(ONNX_FILE, False), (ONNX_INT8_FILE, True)])
+def test_parity_with_sentence_transformers(onnx_file, quantized):
+    pytest.importorskip("onnxruntime")
+    st = pytest.importorskip("sentence_transformers")
+    if not (MODEL_DIR / onnx_file).exists():
+        pytest.skip("run `python -m app.services.embeddings.export_onnx` first")
+    from app.services.embeddings.export_onnx import PARITY_SENTENCES
+    from app.services.embeddings.model import MODEL_NAME
+
+    reference = st.SentenceTransformer(MODEL_NAME).encode(PARITY_SENTENCES, normalize_embeddings=True)
+    candidate = OnnxEncoder(quantized=quantized).encode(PARITY_SENTENCES)
+    assert np.min(np.sum(reference * candidate, axis=1)) >= 0.99
@@ -0,0 +1,87 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.api import prefork
+from app.api.prefork import PreforkServer, process_memory, respawn_delay
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# One worker on an ephemeral port, with the offline stand-ins for the model, Redis and store
+SERVE = """
+import sys, time
+from pathlib import Path
+from benchmarks.loadgen import build_offline_app
+from app.api import prefork
+
+build_offline_app(50, Path(sys.argv[1]))
+start = time.perf_counter()
+shared = prefork.preload()
+from app.api.main import app
+server = prefork.PreforkServer(app, "127.0.0.1", 0, 1, "warning")
+sys.exit(server.run(time.perf_counter() - start, shared, Path(sys.argv[2])))
+"""
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux /proc")
+def test_process_memory_splits_shared_and_private():
+    memory = process_memory(os.getpid())
+    assert memory["rss_mb"] > 0 and memory["private_mb"] > 0
+    assert memory["rss_mb"] == pytest.approx(memory["shared_mb"] + memory["private_mb"], abs=0.5)
+    assert process_memory(2**22 + 1) == dict.fromkeys(memory)
+
+
+def test_workers_failing_at_startup_are_respawned_with_backoff(monkeypatch):
+    server = PreforkServer(app=None, host="127.0.0.1", port=0, workers=1)
+    exits = [(101, 256), (0, 0)]
+    monkeypatch.setattr(prefork.os, "waitpid", lambda pid, options: exits.pop(0))
+
+    server.children[101] = time.perf_counter()
+    server._reap()
+    assert server.failed_starts == 1 and not server.children
+    assert server.respawns[0] - time.perf_counter() == pytest.approx(prefork.RESPAWN_BASE_DELAY_SECONDS, abs=0.1)
+
+    assert [respawn_delay(n) for n in range(4)] == [0.0, 0.5, 1.0, 2.0]
+    assert respawn_delay(50) == prefork.RESPAWN_MAX_DELAY_SECONDS
+
+    # Stopping drops replacements that were still waiting
+    server._stop(signal.SIGTERM, None)
+    assert server.respawns == []
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_worker_serves_and_stops_on_sigterm(tmp_path):
+    report = tmp_path / "boot.json"
+    proc = subprocess.Popen(
+        [sys.executable, "-c", SERVE, str(tmp_path), str(report)],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        # The report is written once the worker has sent its ready notification
+        deadline = time.monotonic() + 60
+        while not report.exists() and proc.poll() is None and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert report.exists(), f"no boot report (exit code {proc.poll()})"
+        boot = json.loads(report.read_text())
+        assert boot["workers"] == 1
+        worker = boot["worker_memory"][0]["pid"]
+
+        response = httpx.post(f"http://127.0.0.1:{boot['port']}/api/search", json={"query": "slayer", "top_k": 3})
+        assert response.status_code == 200
+        assert len(response.json()["results"]) == 3
+
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(30) == 0
+        with pytest.raises(ProcessLookupError):
+            os.kill(worker, 0)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
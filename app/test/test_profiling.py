@@ -0,0 +1,49 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.api.routes import admin
+from app.services.monitoring import profiling
+
+app = FastAPI()
+app.include_router(admin.router, prefix="/admin")
+
+
+@app.get("/work")
+def work(request: Request):
+    with profiling.profile_request(request, "/work") as profile:
+        total = sum(i * i for i in range(10000))
+    return {"total": total, "profile": profile.id if profile else None}
+
+
+client = TestClient(app)
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+def test_admin_disabled_without_token(monkeypatch):
+    monkeypatch.delenv(profiling.ADMIN_TOKEN_ENV, raising=False)
+    assert client.get("/admin/profiles", headers=ADMIN).status_code == 404
+    assert client.get("/work", params={"profile": "1"}, headers=ADMIN).json()["profile"] is None
+
+
+def test_profile_requires_admin_token(monkeypatch):
+    monkeypatch.setenv(profiling.ADMIN_TOKEN_ENV, "secret")
+    assert client.get("/admin/profiles").status_code == 403
+    assert client.get("/work", headers={"X-Profile": "1"}).json()["profile"] is None
+
+    profile_id = client.get("/work", headers={"X-Profile": "1", **ADMIN}).json()["profile"]
+    assert profile_id is not None
+    profile = client.get(f"/admin/profiles/{profile_id}", headers=ADMIN).json()
+    assert profile["label"] == "/work"
+    assert profile["top_frames"]
+
+
+def test_memory_snapshot_and_diff(monkeypatch):
+    monkeypatch.setenv(profiling.ADMIN_TOKEN_ENV, "secret")
+    try:
+        base = client.post("/admin/memory/snapshot", headers=ADMIN).json()
+        assert "by_category" in base
+        diff = client.get("/admin/memory/diff", params={"base": base["id"]}, headers=ADMIN).json()
+        assert diff["base"] == base["id"]
+        assert client.get("/admin/memory/diff", params={"base": "nope"}, headers=ADMIN).status_code == 404
+    finally:
+        client.post("/admin/memory/stop", headers=ADMIN)
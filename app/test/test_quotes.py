@@ -0,0 +1,93 @@
+import numpy as np
+
+from app.services.search import entities, quotes
+from app.services.search.entities import EntityIndex
+from app.services.search.quotes import QuoteIndex, get_quote_index, split_quote, strip_question
+from app.services.storage import document_store
+from app.services.storage.document_store import BuffyDocumentStore, EpisodeDocument
+
+
+def _records():
+    yield "season_2", "22", {
+        "title": "Becoming, Part Two",
+        "main_cast": ["Buffy Summers", "Xander Harris"],
+        "quotes": [
+            "Buffy: Grr, argh. Xander: That is what happens when you stay up late.",
+            "Whistler: Bottom line is, even if you see 'em coming, you're not ready for the big moments.",
+        ],
+    }
+    yield "season_3", "09", {
+        "title": "The Wish",
+        "main_cast": ["Buffy Summers"],
+        "quotes": ["Cordelia: I wish Buffy Summers had never come to Sunnydale."],
+    }
+
+
+class WordEncoder:
+    """Bag-of-words vectors, enough to rank lines by shared words."""
+
+    vocabulary = ("wish", "late", "moments", "sunnydale", "ready")
+
+    def encode(self, texts, batch_size=None):
+        def vector(text):
+            return np.asarray([float(w in text.lower()) for w in self.vocabulary]) + 0.01
+
+        return [vector(t) for t in texts] if isinstance(texts, list) else vector(texts)
+
+
+def test_split_and_question():
+    assert split_quote("Buffy: Grr, argh. Xander: Late.") == [("Buffy", "Grr, argh."), ("Xander", "Late.")]
+    assert split_quote("No speaker here.") == [(None, "No speaker here.")]
+    assert strip_question('Who said "Grr, argh"?') == "Grr, argh"
+
+
+def test_exact_fuzzy_and_speaker():
+    index = QuoteIndex.from_records(_records(), EntityIndex.from_records(_records()).canonical)
+    assert len(index) == 4
+
+    hit = index.search("who said grr argh")[0]
+    assert (hit.quote.speaker, hit.quote.text, hit.match) == ("Buffy", "Grr, argh.", "exact")
+    assert (hit.quote.season, hit.quote.episode, hit.quote.title) == (2, "22", "Becoming, Part Two")
+
+    # A typo misses the exact index and falls through to trigram overlap
+    hit = index.search("I wish Buffy Sumers had never come")[0]
+    assert (hit.quote.speaker, hit.match) == ("Cordelia", "fuzzy")
+
+    assert index.exact("buffy", speaker="Cordelia")[0].quote.season == 3
+    assert index.exact("grr", speaker="Buffy Summers")[0].quote.text == "Grr, argh."
+    assert index.exact("grr", speaker="Xander") == []
+    assert index.exact("zzz") == [] and index.fuzzy("") == []
+
+
+def test_semantic_vectors_are_cached(tmp_path, monkeypatch):
+    index = QuoteIndex.from_records(_records())
+    monkeypatch.setattr(index, "_vector_file", lambda: tmp_path / "quote_vectors.npz")
+
+    hit = index.semantic("ready for moments", encoder=WordEncoder())[0]
+    assert (hit.quote.speaker, hit.match) == ("Whistler", "semantic")
+    assert (tmp_path / "quote_vectors.npz").exists()
+
+    # A fresh index reuses the file instead of encoding every line again
+    again = QuoteIndex.from_records(_records())
+    monkeypatch.setattr(again, "_vector_file", lambda: tmp_path / "quote_vectors.npz")
+    np.testing.assert_allclose(again.vectors(encoder=None), index.vectors())
+
+
+def test_saved_episodes_reach_the_shared_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(document_store, "store", BuffyDocumentStore(base_path=str(tmp_path)))
+    quotes.set_quote_index(None)
+    entities.set_entity_index(None)
+    try:
+        store = document_store.get_store()
+        store.save_episode(EpisodeDocument(2, "22", "Becoming, Part Two", "1998", summary=["..."],
+                                           quotes=["Buffy: Grr, argh."]))
+        assert get_quote_index().exact("i wish") == []
+
+        store.save_episode(EpisodeDocument(3, "09", "The Wish", "1998", summary=["..."],
+                                           main_cast=["Charisma Carpenter as Cordelia Chase"],
+                                           quotes=["Cordelia: I wish Buffy Summers had never come to Sunnydale."]))
+        hits = get_quote_index().exact("i wish", speaker="Cordelia Chase")
+        assert [(h.quote.season, h.quote.episode) for h in hits] == [(3, "09")]
+    finally:
+        quotes.set_quote_index(None)
+        entities.set_entity_index(None)
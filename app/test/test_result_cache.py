@@ -0,0 +1,51 @@
+from app.services.search.backends import VectorHit
+from app.services.search.result_cache import ResultCache, result_cache_key
+from app.services.storage.document_store import BuffyDocumentStore, EpisodeDocument
+from benchmarks.standins import FakeRedis
+
+HITS = [VectorHit("buffy:s02:e22", 2, "22", 0.9), VectorHit("buffy:s05:e16", 5, "16", 0.7)]
+
+
+def test_keys_normalize_whitespace_and_separate_filters():
+    key = result_cache_key("Angel  goes bad ", 5, "summary_embedding", "numpy", "v1")
+    assert key == result_cache_key("Angel goes bad", 5, "summary_embedding", "numpy", "v1")
+    assert key != result_cache_key("angel goes bad", 5, "summary_embedding", "numpy", "v1")
+    assert key != result_cache_key("Angel goes bad", 5, "summary_embedding", "numpy", "v1", seasons=[2])
+    assert key != result_cache_key("Angel goes bad", 5, "summary_embedding", "redis", "v1")
+    assert result_cache_key("q", 5, "f", "numpy", "v1", seasons=[3, 2]) == result_cache_key(
+        "q", 5, "f", "numpy", "v1", seasons=[2, 3, 3]
+    )
+
+
+def test_lru_bound_version_change_and_shared_tier():
+    shared = FakeRedis()
+    cache = ResultCache(max_entries=2, shared=shared)
+    a, b, c = (result_cache_key(q, 5, "f", "numpy", "v1") for q in "abc")
+    cache.put(a, HITS)
+    cache.put(b, HITS[:1])
+    assert cache.get(a) == HITS  # a is now most recent
+    cache.put(c, [])
+    assert len(cache) == 2 and b not in cache._entries
+
+    # b is still in the shared tier and is promoted back
+    assert cache.get(b) == HITS[:1]
+    # Another worker with an empty local tier reads the shared one
+    assert ResultCache(shared=shared).get(a) == HITS
+
+    newer = result_cache_key("a", 5, "f", "numpy", "v2")
+    assert cache.get(newer) is None and len(cache) == 0
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+def test_store_version_changes_on_save_and_is_seen_by_other_instances(tmp_path):
+    writer = BuffyDocumentStore(base_path=str(tmp_path))
+    reader = BuffyDocumentStore(base_path=str(tmp_path))
+    assert reader.data_version() == "0"
+
+    writer.save_episode(EpisodeDocument(
+        season_number=1, episode_number="01", title="Welcome to the Hellmouth",
+        airdate="1997-03-10", summary=["Buffy arrives in Sunnydale."],
+    ))
+    first = reader.data_version()
+    assert first != "0" and first == writer.data_version()
+    assert writer.bump_data_version() == reader.data_version() != first
@@ -0,0 +1,63 @@
+import json
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import search
+from app.services.storage.fragments import episode_fragment
+
+app = FastAPI()
+app.include_router(search.router, prefix="/api")
+client = TestClient(app)
+
+EPISODES = [
+    (2, "22", {"title": "Becoming, Part Two", "airdate": "1998-05-19", "summary": ["Buffy sends Angel to hell."]}),
+    (5, "16", {"title": "The Body", "airdate": "2001-02-27", "summary": ["Joyce dies."]}),
+]
+
+
+def fake_iter_search(query, limit, seasons=None, episodes=None, fragments=False, timings=None):
+    timings.update(encode=0.002, knn=0.001)
+    for (season, episode, data), score in zip(EPISODES[:limit], (0.9, 0.7)):
+        hit = {"season": season, "episode": episode, "score": score}
+        if fragments:
+            hit["fragment"] = episode_fragment(season, episode, data)
+        else:
+            hit["data"] = data
+        yield hit
+    if query == "boom":
+        raise RuntimeError("backend went away")
+
+
+def _setup(monkeypatch):
+    monkeypatch.setattr(search, "iter_search", fake_iter_search)
+    monkeypatch.setattr(search, "get_backend", lambda: SimpleNamespace(name="numpy"))
+
+
+def test_ndjson_frames_then_summary(monkeypatch):
+    _setup(monkeypatch)
+    response = client.post("/api/search/stream", json={"query": "angel", "top_k": 2})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    frames = [json.loads(line) for line in response.text.splitlines()]
+
+    assert [f["type"] for f in frames] == ["result", "result", "summary"]
+    assert frames[0]["title"] == "Becoming, Part Two" and frames[0]["rank"] == 1
+    assert frames[1]["score"] == 0.7 and frames[1]["episode_number"] == "16"
+    assert frames[2]["count"] == 2 and frames[2]["stages_ms"] == {"encode": 2.0, "knn": 1.0}
+
+
+def test_sse_projection_and_in_band_errors(monkeypatch):
+    _setup(monkeypatch)
+    response = client.post(
+        "/api/search/stream",
+        json={"query": "boom", "top_k": 1, "fields": ["title"]},
+        headers={"Accept": "text/event-stream"},
+    )
+    events = [block.split("\n") for block in response.text.strip().split("\n\n")]
+    assert [lines[0] for lines in events] == ["event: result", "event: error", "event: summary"]
+    first = json.loads(events[0][1][len("data: "):])
+    assert set(first) == {"type", "score", "rank", "season_number", "episode_number", "title"}
+    assert "backend went away" in events[1][1]
+
+    assert client.post("/api/search/stream?format=xml", json={"query": "x"}).status_code == 400
@@ -0,0 +1,67 @@
+import numpy as np
+
+from app.services.storage import similarity
+from app.services.storage.document_store import BuffyDocumentStore, EpisodeDocument
+from app.services.storage.similarity import SimilarityGraph
+
+
+def _brute_force(vectors, top_n):
+    matrix = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    sims = matrix @ matrix.T
+    np.fill_diagonal(sims, -np.inf)
+    return np.argsort(-sims, axis=1)[:, :top_n]
+
+
+def test_blocked_build_matches_brute_force(monkeypatch):
+    # A tiny block size forces several blocks
+    monkeypatch.setattr(similarity, "BLOCK_BYTES", 4 * 50 * 7)
+    vectors = np.random.default_rng(0).standard_normal((50, 16)).astype(np.float32)
+    keys = [(i // 10 + 1, f"{i % 10 + 1:02}") for i in range(50)]
+    graph = SimilarityGraph.build(keys, vectors, top_n=5)
+
+    assert graph.neighbours.dtype == np.int32 and graph.scores.dtype == np.float16
+    np.testing.assert_array_equal(graph.neighbours, _brute_force(vectors, 5))
+    season, episode, score = graph.similar(1, "01")[0]
+    assert (season, episode) == keys[graph.neighbours[0, 0]]
+    assert graph.similar(9, "01") is None
+
+
+def test_incremental_updates_match_a_rebuild():
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((40, 8)).astype(np.float32)
+    keys = [(1, f"{i:02}") for i in range(40)]
+    graph = SimilarityGraph.build(keys, vectors, top_n=4)
+
+    # Move episodes around (some far away, some right next to others), then add new ones
+    for i in (3, 17, 3):
+        vectors[i] = rng.standard_normal(8)
+        graph.update(keys[i], vectors[i])
+    vectors[5] = vectors[30] + 0.01
+    graph.update(keys[5], vectors[5])
+    for j in range(2):
+        keys.append((2, f"{j:02}"))
+        vectors = np.vstack([vectors, rng.standard_normal((1, 8)).astype(np.float32)])
+        graph.update(keys[-1], vectors[-1])
+
+    np.testing.assert_array_equal(graph.neighbours, _brute_force(vectors, 4))
+
+
+def test_store_serves_and_maintains_similar_episodes(tmp_path):
+    store = BuffyDocumentStore(base_path=str(tmp_path))
+    vectors = np.eye(4, 384, dtype=np.float32) + 0.1
+    docs = [
+        EpisodeDocument(1, f"{i:02}", f"Episode {i}", "1997", summary=["..."], summary_embedding=v.tolist())
+        for i, v in enumerate(vectors, start=1)
+    ]
+    store.save_episodes(1, docs)
+    store.build_similarity(top_n=2)
+
+    # Episode 04 moves next to 01
+    docs[3].summary_embedding = (vectors[0] + 0.01).tolist()
+    BuffyDocumentStore(base_path=str(tmp_path)).save_episode(docs[3])
+
+    reloaded = BuffyDocumentStore(base_path=str(tmp_path))
+    results = reloaded.similar_episodes(1, "01", limit=1)
+    assert [(r["season"], r["episode"], r["data"]["title"]) for r in results] == [(1, "04", "Episode 4")]
+    assert results[0]["data"] == {"title": "Episode 4", "airdate": "1997"}
+    assert reloaded.similar_episodes(1, "99") is None
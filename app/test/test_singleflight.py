@@ -0,0 +1,91 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import pytest
+
+from app.services.search.singleflight import SingleFlight
+
+
+class Cancelled(BaseException):
+    pass
+
+
+def _wait_for_waiters(flight, key):
+    # The leader is registered as soon as its call starts
+    while key not in flight._calls:
+        time.sleep(0.001)
+    time.sleep(0.05)
+
+
+def test_concurrent_callers_share_one_run():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def search():
+        calls.append(1)
+        release.wait(5)
+        return ["buffy:s02:e22"]
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(flight.do, "q", search) for _ in range(8)]
+        _wait_for_waiters(flight, "q")
+        release.set()
+        results = [f.result(5) for f in futures]
+
+    assert len(calls) == 1
+    assert all(result == ["buffy:s02:e22"] for result, _ in results)
+    assert sum(leader for _, leader in results) == 1
+    assert len(flight) == 0
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise RuntimeError("model crashed")
+
+    with ThreadPoolExecutor(3) as pool:
+        futures = [pool.submit(flight.do, "q", failing) for _ in range(3)]
+        _wait_for_waiters(flight, "q")
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError, match="model crashed"):
+                future.result(5)
+    # The next call runs again rather than reusing the failure
+    assert flight.do("q", lambda: "ok") == ("ok", True)
+
+
+def test_cancelled_leader_hands_over_and_waiters_can_time_out():
+    flight = SingleFlight()
+    release = threading.Event()
+    runs = []
+
+    def search():
+        runs.append(threading.current_thread().name)
+        if len(runs) == 1:
+            release.wait(5)
+            raise Cancelled()
+        return "result"
+
+    def lead():
+        with pytest.raises(Cancelled):
+            flight.do("q", search)
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    _wait_for_waiters(flight, "q")
+    with pytest.raises(TimeoutError):
+        flight.do("q", search, timeout=0.01)
+
+    with ThreadPoolExecutor(1) as pool:
+        waiter = pool.submit(flight.do, "q", search)
+        time.sleep(0.05)
+        release.set()
+        # The waiter does not see the cancellation; it runs the search itself
+        assert waiter.result(5) == ("result", True)
+    leader.join(5)
+    assert len(runs) == 2
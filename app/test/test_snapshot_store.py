@@ -0,0 +1,74 @@
+import pytest
+
+from app.services.storage.document_store import BuffyDocumentStore, EpisodeDocument
+from app.services.storage.snapshot_store import SnapshotStore
+
+
+@pytest.fixture
+def snapshots(tmp_path):
+    return SnapshotStore(str(tmp_path / "snapshots"))
+
+
+def _records(titles):
+    return [
+        ("season_1", f"{i:02}", {"episode_number": f"{i:02}", "episode_title": title})
+        for i, title in enumerate(titles, 1)
+    ]
+
+
+def test_commit_deduplicates_unchanged_episodes(snapshots):
+    first = snapshots.commit(_records(["Welcome to the Hellmouth", "The Harvest"]))
+    assert snapshots.latest("crawl") == first
+    assert len(list(snapshots.blobs_path.glob("*/*.json"))) == 2
+
+    # Identical content does not create a new manifest
+    assert snapshots.commit(_records(["Welcome to the Hellmouth", "The Harvest"])) == first
+
+    second = snapshots.commit(_records(["Welcome to the Hellmouth", "The Harvest (revised)"]))
+    assert second != first
+    assert snapshots.read_manifest(second)["parent"] == first
+    assert len(list(snapshots.blobs_path.glob("*/*.json"))) == 3
+
+
+def test_rollback_is_a_ref_swap(snapshots):
+    first = snapshots.commit(_records(["Welcome to the Hellmouth"]))
+    snapshots.commit(_records(["Witch"]))
+
+    snapshots.set_latest("crawl", first)
+    records = list(snapshots.iter_manifest(snapshots.latest("crawl")))
+    assert records == _records(["Welcome to the Hellmouth"])
+
+    with pytest.raises(FileNotFoundError):
+        snapshots.set_latest("crawl", "crawl_missing")
+
+
+def test_gc_removes_unreferenced_blobs(snapshots):
+    snapshots.commit(_records(["Witch"]))
+    snapshots.put_blob({"episode_title": "orphan"})
+    assert snapshots.gc() == 1
+    assert len(list(snapshots.blobs_path.glob("*/*.json"))) == 1
+
+
+def test_failed_restore_leaves_the_store_untouched(tmp_path):
+    store = BuffyDocumentStore(base_path=str(tmp_path / "store"))
+    episodes = [EpisodeDocument(1, f"{i:02}", title, "1997", summary=["..."])
+                for i, title in enumerate(["Welcome to the Hellmouth", "The Harvest"], 1)]
+    store.save_episodes(1, episodes)
+    backup = store.backup()
+    store.save_episode(EpisodeDocument(1, "03", "Witch", "1997", summary=["..."]))
+    assert store.episode_fragment(1, "03") is not None
+
+    # The second blob is missing, so the import fails after the first episode
+    manifest = store.snapshots.read_manifest(backup)
+    store.snapshots._blob_file(manifest["episodes"]["season_1/02"]).unlink()
+    with pytest.raises(FileNotFoundError):
+        store.restore(backup)
+    assert [store.get_episode(1, f"{i:02}")["title"] for i in (1, 3)] == ["Welcome to the Hellmouth", "Witch"]
+    assert store.get_episode(1, "02")["title"] == "The Harvest"
+    assert not (tmp_path / "store" / "restore.tmp").exists()
+
+    # A complete restore drops the later episode, from the files and the fragment cache
+    store.snapshots.put_blob(episodes[1].to_dict())
+    store.restore(backup)
+    assert store.get_episode(1, "03") is None and store.episode_fragment(1, "03") is None
+    assert store.get_episode(1, "02")["title"] == "The Harvest"
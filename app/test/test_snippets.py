@@ -0,0 +1,47 @@
+import pytest
+
+from app.services.search.snippets import best_snippet, parse_fields, project
+
+EPISODE = {
+    "title": "Halloween",
+    "airdate": "1997-10-27",
+    "summary": [
+        "Buffy gets ready for a date with Angel. Ethan Rayne opens a costume shop in Sunnydale. "
+        "His costumes turn the trick-or-treaters into what they are dressed as.",
+    ],
+    "synopsis": ["Willow becomes a ghost after dressing as one."],
+    "trivia": ["First appearance of Ethan Rayne."],
+}
+
+
+def test_best_sentence_with_window_and_offsets():
+    snippet = best_snippet(EPISODE, "who did the costumes turn into?", window=0)
+    assert snippet.field == "summary"
+    assert snippet.text.startswith("His costumes turn")
+    assert [snippet.text[s:e] for s, e in snippet.highlights] == ["costumes", "turn"]
+
+    with_context = best_snippet(EPISODE, "costume shop")
+    assert with_context.text.startswith("Buffy gets ready") and with_context.text.endswith("dressed as.")
+
+    # No shared words: the opening of the first field
+    assert best_snippet(EPISODE, "zzz").text.startswith("Buffy gets ready")
+    assert best_snippet({"title": "x"}, "anything") is None
+
+
+def test_long_snippets_are_clipped_around_the_match():
+    data = {"summary": ["word " * 200 + "Slayer lands here " + "word " * 200]}
+    snippet = best_snippet(data, "slayer", max_chars=60)
+    assert len(snippet.text) <= 62 and snippet.text.startswith("…") and snippet.text.endswith("…")
+    (start, end), = snippet.highlights
+    assert snippet.text[start:end] == "Slayer"
+
+
+def test_projection():
+    assert parse_fields("title, snippet,title") == ["title", "snippet"]
+    assert parse_fields(None) is None
+    with pytest.raises(ValueError):
+        parse_fields(["title", "embedding"])
+
+    projected = project(EPISODE, ["title", "snippet"], "ghost")
+    assert set(projected) == {"title", "snippet"}
+    assert projected["snippet"]["field"] == "synopsis"
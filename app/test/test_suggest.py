@@ -0,0 +1,62 @@
+from app.services.search import suggest
+from app.services.search.suggest import SuggestIndex, get_suggest_index
+from app.services.storage import document_store
+from app.services.storage.document_store import BuffyDocumentStore, EpisodeDocument
+from app.services.search.text import normalize, split_credit
+
+
+def _records():
+    yield "season_2", "22", {
+        "title": "Becoming, Part Two",
+        "us_viewers_millions": 5.3,
+        "main_cast": ["Sarah Michelle Gellar as Buffy Summers", "Alyson Hannigan as Willow Rosenberg"],
+        "quotes": ["Buffy: Grr, argh. That is what happens when you stay up late."],
+    }
+    yield "season_3", "01", {
+        "title": "Anne",
+        "main_cast": ["Sarah Michelle Gellar as Buffy Summers"],
+        "guest_stars": ["Julie Benz as Darla"],
+    }
+    yield "season_5", "16", {"title": "The Body", "main_cast": ["Buffy Summers", "Willow Rosenberg"]}
+
+
+def test_normalization_and_credits():
+    assert normalize("  Jenny Calendar's ") == "jenny calendar s"
+    assert normalize("Anyánka") == normalize("ANYANKA")
+    assert split_credit("Julie Benz as Darla") == ("Julie Benz", "Darla")
+    assert split_credit("Spike") == (None, "Spike")
+
+
+def test_prefix_and_word_start_matches_ranked_by_popularity():
+    index = SuggestIndex.from_records(_records())
+
+    buffy = index.suggest("bu", limit=1)[0]
+    assert (buffy.text, buffy.kind, buffy.popularity) == ("Buffy Summers", "character", 3)
+
+    # Popularity orders start-of-text matches; later-word matches come last, shortest first
+    assert [s.text for s in index.suggest("b")] == [
+        "Becoming, Part Two", "Buffy Summers", "Buffy: Grr, argh. That is what happens when",
+        "The Body", "Julie Benz",
+    ]
+    assert [s.text for s in index.suggest("summers")] == ["Buffy Summers"]
+    assert [s.text for s in index.suggest("willow r", kinds={"character"})] == ["Willow Rosenberg"]
+
+    quote = index.suggest("grr", kinds={"quote"})[0]
+    assert (quote.season, quote.episode) == (2, "22")
+    assert quote.text == "Buffy: Grr, argh. That is what happens when"
+    assert [s.kind for s in index.suggest("sarah")] == ["actor"]
+    assert index.suggest("zzz") == [] and index.suggest("  ") == []
+
+
+def test_saved_episodes_reach_the_shared_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(document_store, "store", BuffyDocumentStore(base_path=str(tmp_path)))
+    suggest.set_suggest_index(None)
+    try:
+        store = document_store.get_store()
+        store.save_episode(EpisodeDocument(3, "01", "Anne", "1998", summary=["..."]))
+        assert [s.text for s in get_suggest_index().suggest("the bo", kinds=["title"])] == []
+
+        store.save_episode(EpisodeDocument(5, "16", "The Body", "2001", summary=["..."]))
+        assert [s.text for s in get_suggest_index().suggest("the bo", kinds=["title"])] == ["The Body"]
+    finally:
+        suggest.set_suggest_index(None)
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from app.services.pipeline.validation import (
+    VECTOR_DIMENSION,
+    check_embeddings,
+    drop_invalid_embeddings,
+    validate_episode_data,
+    validate_single_episode,
+)
+
+
+def _unit_vector(seed):
+    v = np.random.default_rng(seed).standard_normal(VECTOR_DIMENSION)
+    return (v / np.linalg.norm(v)).tolist()
+
+
+def _episode(number, **overrides):
+    data = {
+        "episode_number": f"{number:02}",
+        "episode_airdate": "March 10, 1997",
+        "episode_title": "Welcome to the Hellmouth",
+        "season_number": 1,
+        "episode_summary": ["Buffy arrives at Sunnydale High School."],
+        "summary_embedding": _unit_vector(number),
+    }
+    data.update(overrides)
+    return data
+
+
+@pytest.mark.parametrize("mode", ["full", "fast"])
+def test_modes_agree_on_valid_data(mode):
+    data = {"season_1": {"01": _episode(1), "02": _episode(2)}}
+    result = validate_episode_data(data, mode=mode)
+    assert result.dict()["__root__"] == validate_episode_data(data).dict()["__root__"]
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"episode_airdate": "1997-03-10"},
+        {"episode_airdate": "February 30, 1997"},
+        {"episode_summary": ["short"]},
+        {"summary_embedding": [0.1] * 10},
+    ],
+)
+def test_fast_mode_rejects_invalid_episode(overrides):
+    with pytest.raises(ValueError):
+        validate_single_episode(_episode(1, **overrides), mode="fast")
+
+
+@pytest.mark.parametrize("mode", ["full", "fast"])
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"episode_number": "1"},
+        {"summary_embedding": [v * 3 for v in _unit_vector(1)]},
+        {"synopsis_embedding": [float("nan")] * VECTOR_DIMENSION},
+    ],
+)
+def test_modes_share_number_and_embedding_rules(mode, overrides):
+    with pytest.raises(ValueError):
+        validate_single_episode(_episode(1, **overrides), mode=mode)
+
+
+def test_check_embeddings_flags_bad_rows():
+    bad_norm = [v * 3 for v in _unit_vector(2)]
+    not_finite = _unit_vector(3)
+    not_finite[0] = float("nan")
+    records = [
+        ("ok", {"summary_embedding": _unit_vector(1)}),
+        ("norm", {"summary_embedding": bad_norm}),
+        ("nan", {"summary_embedding": not_finite}),
+    ]
+    with pytest.raises(ValueError) as exc:
+        check_embeddings(records)
+    assert "norm:" in str(exc.value) and "nan:" in str(exc.value)
+    assert "ok:" not in str(exc.value)
+
+
+def test_prevalidated_skips_per_episode_checks():
+    season = {
+        "01": validate_single_episode(_episode(1), mode="fast", check_vectors=False).dict(),
+    }
+    result = validate_episode_data({"season_1": season}, mode="fast", prevalidated=True)
+    assert result.validate_episode_numbers()
+
+
+def test_bad_embedding_drops_only_its_episode():
+    data = {
+        "season_1": {"01": _episode(1), "02": _episode(2, summary_embedding=[v * 3 for v in _unit_vector(2)])},
+        "season_2": {"01": _episode(3, season_number=2, episode_number="01")},
+        "season_3": {"01": _episode(4, season_number=3, episode_number="01", quotes_embedding=[0.0] * 5)},
+    }
+    errors = drop_invalid_embeddings(data)
+
+    assert [e.split(":")[0] for e in errors] == ["season_1/02", "season_3/01"]
+    assert list(data) == ["season_1", "season_2"] and list(data["season_1"]) == ["01"]
+    validate_episode_data(data, mode="fast", prevalidated=True)
@@ -0,0 +1,215 @@
+import numpy as np
+import pytest
+
+from app.services.search.backends import NumpyBackend, RedisBackend, VectorItem, episode_key
+from app.services.search.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    FailoverBackend,
+)
+from app.services.search.projection import Projection, evaluate
+from benchmarks.standins import FakeRedis
+
+
+def _items(n=12, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    items = []
+    for i in range(n):
+        season, episode = i // 4 + 1, f"{i % 4 + 1:02}"
+        items.append(VectorItem(
+            episode_key(season, episode), season, episode,
+            {"summary_embedding": vectors[i]},
+            {"metadata": {"season": season, "episode": episode}},
+        ))
+    return items, vectors
+
+
+@pytest.mark.parametrize("make_backend", [NumpyBackend, lambda: RedisBackend(client=FakeRedis())])
+def test_backends_agree_on_knn_and_filters(make_backend):
+    backend = make_backend()
+    items, vectors = _items()
+    assert backend.upsert(items) == len(items)
+
+    hits = backend.knn(vectors[5], k=3)
+    assert hits[0].key == items[5].key
+    assert (hits[0].season, hits[0].episode) == (2, "02")
+    assert hits[0].score == pytest.approx(1.0, abs=1e-5)
+    assert [h.score for h in hits] == sorted((h.score for h in hits), reverse=True)
+
+    filtered = backend.knn(vectors[5], k=10, seasons=[1, 3])
+    assert len(filtered) == 8
+    assert {h.season for h in filtered} == {1, 3}
+
+    # Key prefilter: only the listed items are scored
+    allowed = [items[i].key for i in (1, 2, 9)]
+    prefiltered = backend.knn(vectors[1], k=2, keys=allowed)
+    assert prefiltered[0].key == items[1].key and len(prefiltered) == 2
+    assert {h.key for h in prefiltered} <= set(allowed)
+    assert [h.key for h in backend.knn(vectors[1], k=3, keys=allowed, seasons=[3])] == [items[9].key]
+
+    assert backend.delete([items[5].key]) == 1
+    assert items[5].key not in {h.key for h in backend.knn(vectors[5], k=12)}
+
+
+@pytest.mark.parametrize("make_backend", [NumpyBackend, lambda: RedisBackend(client=FakeRedis())])
+def test_knn_batch_matches_single_queries(make_backend):
+    backend = make_backend()
+    items, vectors = _items()
+    backend.upsert(items)
+    seasons = [None, [1, 3], None, [2]]
+    keys = [None, None, [items[i].key for i in (1, 2, 9)], None]
+
+    batch = backend.knn_batch(vectors[:4], k=3, seasons=seasons, keys=keys)
+    single = [backend.knn(vectors[i], k=3, seasons=seasons[i], keys=keys[i]) for i in range(4)]
+    assert [[h.key for h in hits] for hits in batch] == [[h.key for h in hits] for hits in single]
+    assert batch[0][0].score == pytest.approx(single[0][0].score, abs=1e-5)
+    assert backend.knn_batch(vectors[:2], k=0) == [[], []]
+
+
+def test_breaker_opens_then_half_opens_after_timeout():
+    now = [0.0]
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+
+    def fail():
+        raise ConnectionError("down")
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "not called")
+
+    now[0] = 10.0
+    assert breaker.state == HALF_OPEN
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_slow_calls_count_as_failures():
+    now = [0.0]
+
+    def slow():
+        now[0] += 1.0
+        return "late"
+
+    breaker = CircuitBreaker("slow", failure_threshold=1, slow_call_seconds=0.5, clock=lambda: now[0])
+    assert breaker.call(slow) == "late"
+    assert breaker.state == OPEN
+
+
+class _BrokenBackend(NumpyBackend):
+    name = "broken"
+
+    def knn(self, *args, **kwargs):
+        raise TimeoutError("Redis timed out")
+
+
+def test_failover_serves_from_fallback():
+    items, vectors = _items()
+    breaker = CircuitBreaker("broken", failure_threshold=1, reset_timeout=60)
+    backend = FailoverBackend(_BrokenBackend(), NumpyBackend(), breaker)
+    backend.upsert(items)
+
+    assert backend.knn(vectors[0], k=1)[0].key == items[0].key
+    assert breaker.state == OPEN
+    # Once open, the primary is skipped entirely
+    assert backend.knn(vectors[1], k=1)[0].key == items[1].key
+    assert backend.stats()["circuit"]["state"] == OPEN
+
+
+def test_reduced_scan_reranks_to_exact_results(tmp_path):
+    # Low-rank vectors, as real embeddings are: 8 PCA dimensions capture them
+    rng = np.random.default_rng(1)
+    vectors = (rng.standard_normal((200, 6)) @ rng.standard_normal((6, 32))).astype(np.float32)
+    vectors += 0.01 * rng.standard_normal(vectors.shape).astype(np.float32)
+    items = [
+        VectorItem(episode_key(i // 20 + 1, f"{i % 20 + 1:02}"), i // 20 + 1, f"{i % 20 + 1:02}",
+                   {"summary_embedding": v})
+        for i, v in enumerate(vectors)
+    ]
+    exact, reduced = NumpyBackend(), NumpyBackend(reduced_dim=8)
+    exact.upsert(items)
+    reduced.upsert(items)
+
+    for query in vectors[:20]:
+        assert [h.key for h in reduced.knn(query, 5)] == [h.key for h in exact.knn(query, 5)]
+    assert {h.season for h in reduced.knn(vectors[0], 10, seasons=[2])} == {2}
+    stats = reduced.stats()
+    assert stats["reduced_memory_bytes"] * 4 == stats["memory_bytes"]
+
+    path = tmp_path / "projection.npz"
+    reduced.projections["summary_embedding"].save(path)
+    reloaded = NumpyBackend(reduced_dim=8, projections={"summary_embedding": Projection.load(path)})
+    reloaded.upsert(items)
+    assert [h.key for h in reloaded.knn(vectors[3], 5)] == [h.key for h in exact.knn(vectors[3], 5)]
+
+    rows = evaluate(vectors, dims=[4, 8], k=5, n_queries=20)
+    assert [r["dimension"] for r in rows] == [32, 4, 8]
+    assert rows[2]["recall_reranked"] >= 0.95 and rows[2]["memory_saved"] == 0.75
+
+
+def test_memory_mapped_matrices_answer_like_in_memory_ones(tmp_path):
+    items, vectors = _items(n=40, dim=16)
+    in_memory, mapped = NumpyBackend(), NumpyBackend(reduced_dim=4)
+    in_memory.upsert(items)
+    mapped.upsert(items)
+    expected = [[h.key for h in hits] for hits in in_memory.knn_batch(vectors[:5], 3)]
+
+    assert mapped.map_matrices(tmp_path) == 40 * (16 + 4) * 4
+    assert mapped.stats()["memory_mapped"]
+    assert not mapped._fields["summary_embedding"].matrix.flags.writeable
+    assert [h.key for h in mapped.knn(vectors[7], 3, seasons=[2])] == [
+        h.key for h in in_memory.knn(vectors[7], 3, seasons=[2])
+    ]
+    assert [[h.key for h in hits] for hits in mapped.knn_batch(vectors[:5], 3)] == expected
+
+    # Writes go back to an ordinary in-memory matrix
+    mapped.delete([items[0].key])
+    assert not mapped.stats()["memory_mapped"]
+
+
+def test_store_writes_refresh_the_in_process_index(tmp_path, monkeypatch):
+    from app.services.embeddings import model
+    from app.services.search import service
+    from app.services.search.result_cache import set_result_cache
+    from app.services.storage import document_store
+    from app.services.storage.document_store import BuffyDocumentStore, EpisodeDocument
+    from benchmarks.standins import HashEncoder
+
+    encoder = HashEncoder()
+    monkeypatch.setattr(model, "_embedder", encoder)
+    monkeypatch.setattr(document_store, "store", BuffyDocumentStore(base_path=str(tmp_path)))
+    monkeypatch.setenv(service.VECTOR_BACKEND_ENV, "numpy")
+    set_result_cache(None)
+    service.set_backend(None)
+    try:
+        store = document_store.get_store()
+        docs = [
+            EpisodeDocument(1, f"{i:02}", f"Episode {i}", "1997", summary=["..."],
+                            summary_embedding=encoder.encode(f"episode {i}").tolist())
+            for i in range(1, 5)
+        ]
+        store.save_episodes(1, docs)
+        def top(query):
+            return service.search_episodes(query, limit=1)[0]["episode"]
+
+        assert top("episode 2") == "02"
+
+        # A saved embedding is searchable without reloading the backend
+        docs[3].summary_embedding = encoder.encode("the harvest").tolist()
+        store.save_episode(docs[3])
+        assert top("the harvest") == "04"
+        assert service.get_backend().stats()["items"] == 4
+
+        # Bulk writes drop the index so it is reloaded from the store
+        store.restore(store.backup())
+        assert service._backend is None
+        assert top("the harvest") == "04"
+    finally:
+        service.set_backend(None)
+        set_result_cache(None, configured=False)
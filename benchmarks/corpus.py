@@ -0,0 +1,104 @@
+"""Synthetic episode corpora for benchmarks.
+
+Episodes are shaped like the crawl layout that BuffyDocumentStore imports
+(``episode_title``, ``episode_summary``, ``cast_guest_stars``, ...), with a
+random unit vector per embedding field. Everything is generated lazily from
+a seed so a 1M-episode corpus can be streamed to disk without holding it in
+memory, and the same seed always yields the same corpus.
+"""
+from pathlib import Path
+from typing import Iterator, List, Union
+
+import numpy as np
+
+from app.services.storage.episode_jsonl import EpisodeRecord, write_snapshot
+
+VECTOR_DIMENSION = 384
+EPISODES_PER_SEASON = 22
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+WORDS = (
+    "slayer vampire watcher library hellmouth stake demon prophecy spell witch "
+    "werewolf bronze sunnydale school cemetery patrol apocalypse council mayor "
+    "graduation magic curse ritual portal hell god key initiative soul chip "
+    "friend sister mother father night crossbow axe coffin crypt basement"
+).split()
+CHARACTERS = (
+    "Buffy Summers", "Willow Rosenberg", "Xander Harris", "Rupert Giles", "Cordelia Chase",
+    "Angel", "Spike", "Oz", "Anya Jenkins", "Tara Maclay", "Dawn Summers", "Faith Lehane",
+    "Joyce Summers", "Jenny Calendar", "Riley Finn", "Glory", "Drusilla", "The Master",
+    "Principal Snyder", "Mayor Wilkins", "Andrew Wells", "Warren Mears", "Jonathan Levinson",
+    "Kendra Young", "Harmony Kendall", "Amy Madison", "Ethan Rayne", "Wesley Wyndam-Pryce",
+)
+MONTHS = (
+    "January", "February", "March", "April", "May", "June", "July", "August",
+    "September", "October", "November", "December",
+)
+
+
+def unit_vectors(rng: np.random.Generator, n: int, dim: int = VECTOR_DIMENSION) -> np.ndarray:
+    """``n`` random float32 unit vectors of length ``dim``."""
+    v = rng.standard_normal((n, dim)).astype(np.float32)
+    v /= np.linalg.norm(v, axis=1, keepdims=True)
+    return v
+
+
+def _sentence(rng: np.random.Generator, n_words: int) -> str:
+    words = [WORDS[i] for i in rng.integers(0, len(WORDS), n_words)]
+    name = CHARACTERS[rng.integers(0, len(CHARACTERS))]
+    return f"{name} {' '.join(words)}."
+
+
+def _names(rng: np.random.Generator, k: int) -> List[str]:
+    return [CHARACTERS[i] for i in rng.choice(len(CHARACTERS), size=k, replace=False)]
+
+
+def generate_episodes(
+    n: int,
+    seed: int = 0,
+    dim: int = VECTOR_DIMENSION,
+    episodes_per_season: int = EPISODES_PER_SEASON,
+    chunk: int = 1024,
+) -> Iterator[EpisodeRecord]:
+    """Yield ``n`` synthetic episodes as (season label, episode number, data)."""
+    rng = np.random.default_rng(seed)
+    for chunk_start in range(0, n, chunk):
+        size = min(chunk, n - chunk_start)
+        summary_vectors = unit_vectors(rng, size, dim)
+        synopsis_vectors = unit_vectors(rng, size, dim)
+        for offset in range(size):
+            i = chunk_start + offset
+            season_num = i // episodes_per_season + 1
+            episode_num = f"{i % episodes_per_season + 1:02}"
+            episode = {
+                "episode_number": episode_num,
+                "episode_title": " ".join(WORDS[j] for j in rng.integers(0, len(WORDS), 3)).title(),
+                "episode_airdate": f"{MONTHS[rng.integers(0, 12)]} {rng.integers(1, 29)}, {1997 + season_num % 7}",
+                "season_number": season_num,
+                "episode_summary": [_sentence(rng, 25) for _ in range(3)],
+                "episode_synopsis": [_sentence(rng, 15)],
+                "episode_quotes": [_sentence(rng, 8) for _ in range(2)],
+                "cast_guest_stars": _names(rng, 3),
+                "cast_recurring_characters": _names(rng, 2),
+                "summary_embedding": summary_vectors[offset].tolist(),
+                "synopsis_embedding": synopsis_vectors[offset].tolist(),
+            }
+            yield f"season_{season_num}", episode_num, episode
+
+
+def write_corpus(path: Union[str, Path], n: int, seed: int = 0, dim: int = VECTOR_DIMENSION) -> int:
+    """Stream a synthetic corpus to a JSONL snapshot. Returns the episode count."""
+    return write_snapshot(generate_episodes(n, seed=seed, dim=dim), path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write a synthetic episode corpus as JSONL.")
+    parser.add_argument("size", help=f"Episode count or one of {', '.join(SIZES)}")
+    parser.add_argument("path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    n = SIZES.get(args.size.lower()) or int(args.size)
+    print(f"Wrote {write_corpus(args.path, n, seed=args.seed)} episodes to {args.path}")
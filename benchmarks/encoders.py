@@ -0,0 +1,92 @@
+"""Compare encoder implementations: latency, throughput, memory and parity.
+
+Unlike benchmarks.run this uses the real model, so it needs the ONNX export
+(``python -m app.services.embeddings.export_onnx``) and, for the torch row
+and parity column, sentence-transformers. Unavailable encoders are skipped.
+Peak RSS only grows, so run one encoder per process for memory numbers.
+
+    python -m benchmarks.encoders --encoders torch,onnx,onnx-int8 --output encoders.json
+"""
+import argparse
+import json
+import resource
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.corpus import generate_episodes
+from benchmarks.run import measure
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench_encoder(kind: str, queries: List[str], documents: List[str], repeat: int, budget: float) -> Dict[str, Any]:
+    from app.services.embeddings.model import load_encoder
+
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    encoder = load_encoder(kind)
+    load_seconds = time.perf_counter() - start
+    encoder.encode(queries[0])  # warm up
+
+    i = iter(range(10 ** 9))
+    single = measure(lambda: encoder.encode(queries[next(i) % len(queries)]), repeat, budget)
+    start = time.perf_counter()
+    embeddings = encoder.encode(documents, batch_size=32)
+    batch_seconds = time.perf_counter() - start
+    return {
+        "encoder": kind,
+        "load_seconds": round(load_seconds, 3),
+        "query_p50_ms": single["p50_ms"],
+        "query_p95_ms": single["p95_ms"],
+        "docs_per_second": round(len(documents) / batch_seconds, 1),
+        "peak_rss_growth_mb": round(_rss_mb() - rss_before, 1),
+        "embeddings": embeddings,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare torch and ONNX encoders.")
+    parser.add_argument("--encoders", default="torch,onnx,onnx-int8")
+    parser.add_argument("--documents", type=int, default=256, help="Summaries embedded for the throughput run")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--budget", type=float, default=10.0)
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+
+    episodes = [ep for _, _, ep in generate_episodes(args.documents)]
+    documents = [" ".join(ep["episode_summary"]) for ep in episodes]
+    queries = [" ".join(ep["episode_summary"][0].split()[:8]) for ep in episodes[:50]]
+
+    rows = []
+    for kind in [k.strip() for k in args.encoders.split(",") if k.strip()]:
+        try:
+            rows.append(bench_encoder(kind, queries, documents, args.repeat, args.budget))
+        except (ImportError, FileNotFoundError) as e:
+            print(f"  {kind:<10} skipped: {e}")
+
+    reference = next((r["embeddings"] for r in rows if r["encoder"] == "torch"), None)
+    for row in rows:
+        embeddings = row.pop("embeddings")
+        if reference is not None:
+            row["min_cosine_vs_torch"] = round(float(np.min(np.sum(reference * embeddings, axis=1))), 5)
+        print(
+            f"  {row['encoder']:<10} load={row['load_seconds']:>6.2f}s  query p50={row['query_p50_ms']:>7.2f}ms  "
+            f"p95={row['query_p95_ms']:>7.2f}ms  {row['docs_per_second']:>7.1f} docs/s  "
+            f"rss+{row['peak_rss_growth_mb']:.0f}MB  cos={row.get('min_cosine_vs_torch', '-')}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"documents": len(documents), "results": rows}, f, indent=2)
+        print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
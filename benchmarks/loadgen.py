@@ -0,0 +1,380 @@
+"""HTTP load generator for the API.
+
+Drives the FastAPI app either in-process over ASGI (fully offline, using the
+stand-ins from benchmarks.standins and a synthetic corpus) or against a
+running server via ``--url``. Two load models are supported:
+
+* closed loop (``--concurrency N``): N workers each send the next request
+  as soon as the previous one returns; measures the throughput ceiling.
+* open loop (``--rate R``): requests are scheduled at R/s regardless of
+  how fast responses come back; latency is measured from the scheduled
+  time, so queueing delay is not hidden (no coordinated omission).
+
+    python -m benchmarks.loadgen --concurrency 8 --duration 20
+    python -m benchmarks.loadgen --rate 50 --duration 30 --mix api_search=9,health=1
+    python -m benchmarks.loadgen --url http://localhost:8000 --queries queries.txt --loop
+
+Queries come from a Zipf-skewed synthetic pool (``--skew``), or with
+``--queries`` from a log replayed in its recorded order; the run ends when
+the log does unless ``--loop`` starts it over.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from benchmarks.corpus import WORDS, CHARACTERS, generate_episodes
+from benchmarks.run import install_standins
+
+# name -> (method, path, body builder)
+TARGETS = {
+    "api_search": ("POST", "/api/search", lambda q, k: {"query": q, "top_k": k}),
+    "search": ("POST", "/search", lambda q, k: {"query": q}),
+    "health": ("GET", "/health", None),
+    "health_redis": ("GET", "/health/redis", None),
+    "health_model": ("GET", "/health/model", None),
+    "health_startup": ("GET", "/health/startup", None),
+}
+PERCENTILES = (50, 95, 99, 99.9)
+
+
+def synthetic_queries(n: int = 500, seed: int = 0) -> List[str]:
+    """A pool of queries; callers draw from it with a Zipf-like skew."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n):
+        words = rng.sample(WORDS, rng.randint(2, 5))
+        if rng.random() < 0.5:
+            words.insert(0, rng.choice(CHARACTERS))
+        queries.append(" ".join(words))
+    return queries
+
+
+def load_queries(path: str) -> List[str]:
+    """One query per line, or JSONL objects with a "query" field."""
+    queries = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                line = json.loads(line).get("query", "")
+            if line:
+                queries.append(line)
+    return queries
+
+
+class QuerySampler:
+    """Draw queries with a Zipf(s) popularity skew; s=0 is uniform."""
+
+    exhausted = False
+
+    def __init__(self, queries: List[str], skew: float, seed: int):
+        self.queries = queries
+        self.rng = random.Random(seed)
+        ranks = np.arange(1, len(queries) + 1, dtype=np.float64)
+        weights = 1.0 / ranks ** skew
+        self.cumulative = np.cumsum(weights / weights.sum()).tolist()
+
+    def next(self) -> str:
+        i = int(np.searchsorted(self.cumulative, self.rng.random()))
+        return self.queries[min(i, len(self.queries) - 1)]
+
+
+class QueryReplay:
+    """A query log in its recorded order; with ``loop`` it starts over at the end."""
+
+    def __init__(self, queries: List[str], loop: bool = False):
+        self.queries = queries
+        self.loop = loop
+        self.position = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return not self.loop and self.position >= len(self.queries)
+
+    def next(self) -> str:
+        if self.position >= len(self.queries):
+            if not self.loop:
+                raise IndexError("query log exhausted")
+            self.position = 0
+        query = self.queries[self.position]
+        self.position += 1
+        return query
+
+
+def parse_mix(spec: str) -> List[Tuple[str, float]]:
+    mix = []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in TARGETS:
+            raise ValueError(f"Unknown target {name!r}; choose from {', '.join(TARGETS)}")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+def build_offline_app(n_episodes: int, workdir: Path, seed: int = 0):
+    """Import the API with the model, Redis and store replaced by offline stand-ins."""
+    install_standins()
+
+    from app.services import embed
+    from app.services.storage import document_store
+    from app.api import main
+
+    main.client = embed.client
+
+    store = document_store.BuffyDocumentStore(base_path=str(workdir / "store"))
+    store._import_records(generate_episodes(n_episodes, seed=seed))
+    document_store.store = store
+
+    nested: Dict[str, Dict[str, Any]] = {}
+    for season, episode_num, episode in generate_episodes(n_episodes, seed=seed):
+        nested.setdefault(season, {})[episode_num] = episode
+    embed.execute_pipeline(embed.create_pipeline(nested))
+    embed.create_index()
+
+    # Probe the stand-ins once so the health endpoints report real (cached) results
+    from app.services.monitoring.health import HealthMonitor, default_probes, set_health_monitor
+
+    main.health_monitor = HealthMonitor(default_probes(redis_client=embed.client))
+    set_health_monitor(main.health_monitor)
+    main.health_monitor.check_all()
+    return main.app
+
+
+class Recorder:
+    def __init__(self):
+        self.start = time.perf_counter()
+        # (completion offset seconds, target, latency seconds, ok)
+        self.samples: List[Tuple[float, str, float, bool]] = []
+        self.errors: Dict[str, int] = {}
+
+    def add(self, target: str, latency: float, ok: bool, error: Optional[str] = None):
+        self.samples.append((time.perf_counter() - self.start, target, latency, ok))
+        if error:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+
+def _next_query(target: str, sampler) -> Optional[str]:
+    # Only search targets take a query, so health checks do not consume the replayed log
+    return sampler.next() if TARGETS[target][2] is not None else None
+
+
+async def _send(client: httpx.AsyncClient, target: str, query: Optional[str], top_k: int,
+                recorder: Recorder, scheduled: Optional[float] = None):
+    method, path, body = TARGETS[target]
+    start = scheduled if scheduled is not None else time.perf_counter()
+    error = None
+    try:
+        if method == "POST":
+            response = await client.post(path, json=body(query, top_k))
+        else:
+            response = await client.get(path)
+        ok = response.status_code < 400
+        if not ok:
+            error = f"HTTP {response.status_code}"
+    except Exception as e:
+        ok = False
+        error = type(e).__name__
+    recorder.add(target, time.perf_counter() - start, ok, error)
+
+
+async def run_closed_loop(client, mix, sampler, top_k, concurrency, duration, max_requests, recorder):
+    names, weights = zip(*mix)
+    rng = random.Random(1)
+    deadline = time.perf_counter() + duration
+    issued = 0
+
+    async def worker():
+        nonlocal issued
+        while (
+            time.perf_counter() < deadline
+            and (max_requests is None or issued < max_requests)
+            and not sampler.exhausted
+        ):
+            issued += 1
+            target = rng.choices(names, weights)[0]
+            await _send(client, target, _next_query(target, sampler), top_k, recorder)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def run_open_loop(client, mix, sampler, top_k, rate, duration, max_requests, recorder, poisson=True):
+    names, weights = zip(*mix)
+    rng = random.Random(1)
+    start = time.perf_counter()
+    next_at = start
+    tasks = []
+    while (
+        next_at - start < duration
+        and (max_requests is None or len(tasks) < max_requests)
+        and not sampler.exhausted
+    ):
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        target = rng.choices(names, weights)[0]
+        tasks.append(asyncio.ensure_future(
+            _send(client, target, _next_query(target, sampler), top_k, recorder, scheduled=next_at)
+        ))
+        next_at += rng.expovariate(rate) if poisson else 1.0 / rate
+    await asyncio.gather(*tasks)
+
+
+def _latency_stats(latencies: List[float]) -> Dict[str, float]:
+    if not latencies:
+        return {}
+    ms = np.asarray(latencies) * 1000
+    stats = {f"p{str(p).replace('.', '')}_ms": round(float(np.percentile(ms, p)), 3) for p in PERCENTILES}
+    stats["mean_ms"] = round(float(ms.mean()), 3)
+    stats["max_ms"] = round(float(ms.max()), 3)
+    return stats
+
+
+def summarize(recorder: Recorder, elapsed: float, window: float = 1.0) -> Dict[str, Any]:
+    samples = recorder.samples
+    total = len(samples)
+    errors = sum(1 for s in samples if not s[3])
+    report: Dict[str, Any] = {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "latency": _latency_stats([s[2] for s in samples]),
+        "error_kinds": recorder.errors,
+        "by_target": {},
+        "timeline": [],
+    }
+    for target in sorted({s[1] for s in samples}):
+        subset = [s for s in samples if s[1] == target]
+        report["by_target"][target] = {
+            "requests": len(subset),
+            "errors": sum(1 for s in subset if not s[3]),
+            "latency": _latency_stats([s[2] for s in subset]),
+        }
+
+    buckets: Dict[int, List[Tuple[float, str, float, bool]]] = {}
+    for s in samples:
+        buckets.setdefault(int(s[0] // window), []).append(s)
+    for i in sorted(buckets):
+        subset = buckets[i]
+        lat = np.asarray([s[2] for s in subset]) * 1000
+        report["timeline"].append({
+            "t": round(i * window, 3),
+            "requests": len(subset),
+            "errors": sum(1 for s in subset if not s[3]),
+            "p50_ms": round(float(np.percentile(lat, 50)), 3),
+            "p99_ms": round(float(np.percentile(lat, 99)), 3),
+        })
+    return report
+
+
+def print_report(report: Dict[str, Any]):
+    lat = report["latency"]
+    print(f"requests={report['requests']} errors={report['errors']} "
+          f"({report['error_rate'] * 100:.2f}%) throughput={report['throughput_rps']} req/s")
+    if lat:
+        print(f"latency ms: p50={lat['p50_ms']} p95={lat['p95_ms']} p99={lat['p99_ms']} "
+              f"p999={lat['p999_ms']} max={lat['max_ms']}")
+    for target, row in report["by_target"].items():
+        tl = row["latency"]
+        print(f"  {target:<14} n={row['requests']:<7} err={row['errors']:<5} "
+              f"p50={tl['p50_ms']}ms p99={tl['p99_ms']}ms")
+    for kind, count in report["error_kinds"].items():
+        print(f"  error {kind}: {count}")
+
+
+async def _main(args) -> Dict[str, Any]:
+    mix = parse_mix(args.mix)
+    if args.queries:
+        queries = load_queries(args.queries)
+        sampler = QueryReplay(queries, loop=args.loop)
+        # Warm up on a separate pass so the measured run starts at the top of the log
+        warmup_sampler = QueryReplay(queries, loop=True)
+    else:
+        queries = synthetic_queries(seed=args.seed)
+        sampler = warmup_sampler = QuerySampler(queries, skew=args.skew, seed=args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="tvshowchat-load-") as tmp:
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        else:
+            app = build_offline_app(args.episodes, Path(tmp), seed=args.seed)
+            transport = httpx.ASGITransport(app=app)
+            client = httpx.AsyncClient(transport=transport, base_url="http://loadgen", timeout=args.timeout)
+
+        async with client:
+            if args.warmup:
+                await run_closed_loop(client, mix, warmup_sampler, args.top_k, 1, args.warmup, None, Recorder())
+            recorder = Recorder()
+            if args.rate:
+                await run_open_loop(client, mix, sampler, args.top_k, args.rate, args.duration,
+                                    args.requests, recorder, poisson=not args.constant_rate)
+            else:
+                await run_closed_loop(client, mix, sampler, args.top_k, args.concurrency,
+                                      args.duration, args.requests, recorder)
+            elapsed = time.perf_counter() - recorder.start
+
+    report = summarize(recorder, elapsed, window=args.window)
+    report["config"] = {
+        "target": args.url or "in-process",
+        "mode": "open" if args.rate else "closed",
+        "rate": args.rate,
+        "concurrency": None if args.rate else args.concurrency,
+        "mix": dict(mix),
+        "queries": len(queries),
+        "query_source": "replay" if args.queries else "synthetic",
+        "loop": args.loop if args.queries else None,
+        "replayed": sampler.position if args.queries else None,
+        "skew": None if args.queries else args.skew,
+        "episodes": None if args.url else args.episodes,
+    }
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the search API.")
+    parser.add_argument("--url", help="Base URL of a running server; default drives the app in-process")
+    parser.add_argument("--mix", default="api_search=1", help=f"Weighted targets, e.g. api_search=8,health=1 ({', '.join(TARGETS)})")
+    parser.add_argument("--concurrency", type=int, default=8, help="Closed-loop workers")
+    parser.add_argument("--rate", type=float, help="Open-loop arrival rate (req/s); overrides --concurrency")
+    parser.add_argument("--constant-rate", action="store_true", help="Evenly spaced arrivals instead of Poisson")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Seconds of unrecorded warmup")
+    parser.add_argument("--queries", help="Query log to replay in order (one per line or JSONL)")
+    parser.add_argument("--loop", action="store_true", help="Start the query log over when it runs out")
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent for the synthetic query pool")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--episodes", type=int, default=1000, help="Synthetic corpus size (in-process only)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--window", type=float, default=1.0, help="Timeline bucket width in seconds")
+    parser.add_argument("--output", help="Write the full JSON report here")
+    args = parser.parse_args(argv)
+
+    for name in ("my_app", "app", "httpx"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    report = asyncio.run(_main(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
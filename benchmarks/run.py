@@ -0,0 +1,268 @@
+"""Search and storage benchmarks over synthetic corpora.
+
+Runs entirely offline: the embedding model is replaced by a deterministic
+HashEncoder and Redis by an in-memory FakeRedis (see benchmarks.standins),
+so timings reflect our code paths rather than the model or the network.
+
+    python -m benchmarks.run --sizes 1k,10k --output bench_results.json
+    python -m benchmarks.run --sizes 1k --baseline benchmarks/baseline.json
+    python -m benchmarks.run --sizes 1k --save-baseline benchmarks/baseline.json
+
+With ``--baseline`` the p50 of every (benchmark, size) pair is compared to
+the stored one and the exit code is 1 if any regressed past ``--threshold``.
+"""
+import argparse
+import json
+import logging
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.corpus import SIZES, generate_episodes, write_corpus
+from benchmarks.standins import FakeRedis, HashEncoder
+
+DEFAULT_BENCHMARKS = (
+    "store.import",
+    "store.search_episodes",
+    "store.get_episode",
+    "store.similar",
+    "numpy.knn",
+    "numpy.knn_pca128",
+    "numpy.knn_batch256",
+    "redis.ingest",
+    "redis.search",
+)
+
+
+def install_standins() -> HashEncoder:
+    """Swap the shared model and the Redis client for offline stand-ins."""
+    from app.services import embed
+    from app.services.embeddings import model
+
+    encoder = HashEncoder()
+    model._embedder = encoder
+    embed.client = FakeRedis()
+    return encoder
+
+
+def measure(fn: Callable[[], Any], repeat: int, budget: float) -> Dict[str, float]:
+    """Run ``fn`` up to ``repeat`` times (at least once) within ``budget`` seconds."""
+    timings: List[float] = []
+    deadline = time.perf_counter() + budget
+    while len(timings) < repeat and (not timings or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    ms = np.asarray(timings) * 1000
+    return {
+        "runs": len(timings),
+        "mean_ms": round(float(ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "min_ms": round(float(ms.min()), 4),
+        "max_ms": round(float(ms.max()), 4),
+    }
+
+
+def run_size(
+    n: int, workdir: Path, benchmarks: List[str], repeat: int, budget: float, seed: int
+) -> List[Dict[str, Any]]:
+    from app.services import embed
+    from app.services.storage.document_store import BuffyDocumentStore
+
+    results = []
+
+    def record(name: str, stats: Dict[str, float]):
+        results.append({"benchmark": name, "size": n, **stats})
+        print(f"  {name:<24} n={n:<8} p50={stats['p50_ms']:>10.3f}ms  p95={stats['p95_ms']:>10.3f}ms  runs={stats['runs']}")
+
+    rng = random.Random(seed)
+    queries = [
+        " ".join(ep["episode_summary"][0].split()[:8])
+        for _, _, ep in generate_episodes(min(n, 50), seed=seed + 1)
+    ]
+
+    corpus = workdir / f"corpus_{n}.jsonl"
+    write_corpus(corpus, n, seed=seed)
+    store = BuffyDocumentStore(base_path=str(workdir / f"store_{n}"))
+
+    # Import is measured once: it mutates the store
+    if "store.import" in benchmarks or any(b.startswith(("store.", "numpy.")) for b in benchmarks):
+        stats = measure(lambda: store.import_from_jsonl(str(corpus)), repeat=1, budget=0)
+        if "store.import" in benchmarks:
+            record("store.import", stats)
+
+    if "store.search_episodes" in benchmarks:
+        record("store.search_episodes", measure(
+            lambda: store.search_episodes(rng.choice(queries), limit=10), repeat, budget
+        ))
+
+    if "store.get_episode" in benchmarks:
+        seasons = sorted({int(p.stem.split("_")[1]) for p in store.episodes_path.glob("season_*.json")})
+
+        def get_random_episode():
+            season = rng.choice(seasons)
+            store.get_episode(season, f"{rng.randint(1, 22):02}")
+
+        record("store.get_episode", measure(get_random_episode, repeat, budget))
+
+    if "store.similar" in benchmarks:
+        # The graph was built by the import above
+        keys = store.similarity_graph().keys
+        record("store.similar", measure(
+            lambda: store.similar_episodes(*rng.choice(keys)), repeat, budget
+        ))
+
+    for name, reduced_dim in (("numpy.knn", None), ("numpy.knn_pca128", 128)):
+        if name not in benchmarks:
+            continue
+        from app.services.embeddings.model import get_embedder
+        from app.services.search.backends import NumpyBackend, items_from_records
+
+        backend = NumpyBackend(reduced_dim=reduced_dim)
+        backend.upsert(items_from_records(store.iter_records()))
+        backend.stats()  # build (and fit) outside the timed loop
+        encoder = get_embedder()
+        record(name, measure(
+            lambda: backend.knn(encoder.encode(rng.choice(queries)), 10), repeat, budget
+        ))
+
+    if "numpy.knn_batch256" in benchmarks:
+        from app.services.embeddings.model import get_embedder
+        from app.services.search.backends import NumpyBackend, items_from_records
+
+        backend = NumpyBackend()
+        backend.upsert(items_from_records(store.iter_records()))
+        backend.stats()
+        encoder = get_embedder()
+        # Compare with 256 x numpy.knn
+        record("numpy.knn_batch256", measure(
+            lambda: backend.knn_batch(np.asarray(encoder.encode(rng.choices(queries, k=256))), 10),
+            repeat, budget,
+        ))
+
+    if "redis.ingest" in benchmarks or "redis.search" in benchmarks:
+        nested: Dict[str, Dict[str, Any]] = {}
+        for season, episode_num, episode in generate_episodes(n, seed=seed):
+            nested.setdefault(season, {})[episode_num] = episode
+
+        def ingest():
+            embed.client.flushdb()
+            embed.execute_pipeline(embed.create_pipeline(nested))
+            embed.create_index()
+
+        stats = measure(ingest, repeat=1, budget=0)
+        if "redis.ingest" in benchmarks:
+            record("redis.ingest", stats)
+        del nested
+
+    if "redis.search" in benchmarks:
+        record("redis.search", measure(
+            lambda: embed.fetch_search_results(rng.choice(queries), 10), repeat, budget
+        ))
+
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Compare p50 timings with a baseline; returns one row per matched benchmark."""
+    base = {(r["benchmark"], r["size"]): r for r in baseline.get("results", [])}
+    rows = []
+    for r in results:
+        b = base.get((r["benchmark"], r["size"]))
+        if not b or not b["p50_ms"]:
+            continue
+        ratio = r["p50_ms"] / b["p50_ms"]
+        rows.append({
+            "benchmark": r["benchmark"],
+            "size": r["size"],
+            "baseline_p50_ms": b["p50_ms"],
+            "p50_ms": r["p50_ms"],
+            "ratio": round(ratio, 3),
+            "regressed": ratio > threshold,
+        })
+    return rows
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run search/storage benchmarks on synthetic data.")
+    parser.add_argument("--sizes", default="1k,10k", help=f"Comma-separated; any of {', '.join(SIZES)} or integers")
+    parser.add_argument("--benchmarks", default=",".join(DEFAULT_BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=50, help="Max runs per benchmark")
+    parser.add_argument("--budget", type=float, default=10.0, help="Seconds per benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", help="Also write results to this path as a new baseline")
+    parser.add_argument("--threshold", type=float, default=1.25, help="p50 ratio counted as a regression")
+    parser.add_argument("--workdir", help="Keep generated corpora/stores here instead of a temp dir")
+    args = parser.parse_args(argv)
+    if args.baseline and not Path(args.baseline).is_file():
+        # Checked up front: a typo must not turn the regression gate into a silent pass
+        parser.error(f"baseline {args.baseline} does not exist (create one with --save-baseline)")
+
+    logging.getLogger("my_app").setLevel(logging.WARNING)
+    logging.getLogger("app").setLevel(logging.WARNING)
+    install_standins()
+
+    sizes = [SIZES.get(s.strip().lower()) or int(s) for s in args.sizes.split(",") if s.strip()]
+    benchmarks = [b.strip() for b in args.benchmarks.split(",") if b.strip()]
+
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="tvshowchat-bench-") as tmp:
+        workdir = Path(args.workdir or tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+        for n in sizes:
+            print(f"Corpus of {n} episodes")
+            results.extend(run_size(n, workdir, benchmarks, args.repeat, args.budget, args.seed))
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = compare(results, json.load(f), args.threshold)
+        for row in report["comparison"]:
+            flag = "REGRESSED" if row["regressed"] else "ok"
+            print(f"  {row['benchmark']:<24} n={row['size']:<8} x{row['ratio']:<6} {flag}")
+        if any(row["regressed"] for row in report["comparison"]):
+            exit_code = 1
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline {args.save_baseline}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""Offline stand-ins for the embedding model and Redis Stack.
+
+They implement just enough of the SentenceTransformer and redis-py APIs
+used by ``app.services.embed`` and ``BuffyDocumentStore`` for benchmarks
+and load tests to run without a model download or a Redis server.
+"""
+import re
+import zlib
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+from benchmarks.corpus import VECTOR_DIMENSION
+
+
+class HashEncoder:
+    """Deterministic encoder: each text maps to a fixed random unit vector."""
+
+    def __init__(self, dim: int = VECTOR_DIMENSION):
+        self.dim = dim
+
+    def _encode_one(self, text: str) -> np.ndarray:
+        rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+        v = rng.standard_normal(self.dim).astype(np.float32)
+        return v / np.linalg.norm(v)
+
+    def encode(self, sentences: Union[str, List[str]], **kwargs) -> np.ndarray:
+        if isinstance(sentences, str):
+            return self._encode_one(sentences)
+        if not sentences:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.stack([self._encode_one(s) for s in sentences])
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+
+class _Document:
+    def __init__(self, fields: Dict[str, Any]):
+        self.__dict__.update(fields)
+
+    def __getitem__(self, key):
+        return self.__dict__[key]
+
+
+class _Result:
+    def __init__(self, docs: List[_Document]):
+        self.docs = docs
+        self.total = len(docs)
+
+
+class _Pipeline:
+    def __init__(self, client: "FakeRedis"):
+        self._client = client
+        self._ops: List[Any] = []
+
+    def json(self):
+        return self
+
+    def set(self, key: str, path: str, obj: Dict[str, Any]):
+        self._ops.append((key, obj))
+        return self
+
+    def execute(self) -> List[bool]:
+        for key, obj in self._ops:
+            self._client.docs[key] = obj
+        results = [True] * len(self._ops)
+        self._ops = []
+        return results
+
+
+class _Json:
+    def __init__(self, client: "FakeRedis"):
+        self._client = client
+
+    def mget(self, keys: List[str], path: str) -> List[Any]:
+        # Only "$.field" paths; JSONPath results come back as lists
+        name = path[2:]
+        results = []
+        for key in keys:
+            doc = self._client.docs.get(key)
+            results.append(None if doc is None else ([doc[name]] if name in doc else []))
+        return results
+
+
+class _Index:
+    _KNN = re.compile(r"KNN\s+(\d+)\s+@(\w+)")
+    _SEASON = re.compile(r"@season:\[(-?\d+) (-?\d+)\]")
+
+    def __init__(self, client: "FakeRedis", name: str):
+        self._client = client
+        self.name = name
+
+    def create_index(self, fields=None, definition=None):
+        self._client.indexes[self.name] = True
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "index_name": self.name,
+            "num_docs": len(self._client.docs),
+            "total_indexing_time": 0,
+        }
+
+    def search(self, query, query_params: Dict[str, Any] = None) -> _Result:
+        """Brute-force cosine KNN, returning distances like RediSearch does."""
+        query_string = query.query_string() if hasattr(query, "query_string") else str(query)
+        match = self._KNN.search(query_string)
+        k, field = (int(match.group(1)), match.group(2)) if match else (10, "summary_embedding")
+        q = np.frombuffer(query_params["query_vector"], dtype=np.float32)
+
+        keys, matrix = self._client._matrix(field)
+        if not keys:
+            return _Result([])
+        scores = matrix @ q / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(q) + 1e-12)
+        prefilter = query_string.split("=>", 1)[0]
+        ranges = [(int(lo), int(hi)) for lo, hi in self._SEASON.findall(prefilter)]
+        if ranges:
+            seasons = np.asarray([self._client.docs[key]["metadata"]["season"] for key in keys])
+            allowed = np.zeros(len(keys), dtype=bool)
+            for lo, hi in ranges:
+                allowed |= (seasons >= lo) & (seasons <= hi)
+            scores = np.where(allowed, scores, -np.inf)
+        top = np.argsort(-scores)[:k]
+        docs = []
+        for i in top:
+            if scores[i] == -np.inf:
+                break
+            obj = self._client.docs[keys[i]]
+            docs.append(_Document({
+                "id": keys[i],
+                "vector_score": str(1.0 - float(scores[i])),
+                "summary": obj.get("summary", ""),
+                "synopsis": obj.get("synopsis", ""),
+            }))
+        return _Result(docs)
+
+
+class FakeRedis:
+    """In-memory stand-in for the parts of redis-py + RedisJSON + RediSearch we use."""
+
+    def __init__(self, *args, **kwargs):
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.indexes: Dict[str, bool] = {}
+        # Plain string values (GET/SET); expiry is ignored
+        self.strings: Dict[str, str] = {}
+        self._cache = None
+
+    def ping(self) -> bool:
+        return True
+
+    def flushdb(self):
+        self.docs.clear()
+        self.indexes.clear()
+        self.strings.clear()
+
+    def get(self, key: str):
+        return self.strings.get(key)
+
+    def set(self, key: str, value: str, ex=None) -> bool:
+        self.strings[key] = value
+        return True
+
+    def pipeline(self, *args, **kwargs) -> _Pipeline:
+        return _Pipeline(self)
+
+    def json(self) -> _Json:
+        return _Json(self)
+
+    def ft(self, name: str = "idx") -> _Index:
+        return _Index(self, name)
+
+    def delete(self, *keys: str) -> int:
+        return sum(self.docs.pop(key, None) is not None for key in keys)
+
+    def keys(self, pattern: str = "*") -> List[str]:
+        prefix = pattern.rstrip("*")
+        return [k for k in self.docs if k.startswith(prefix)]
+
+    def exists(self, key: str) -> int:
+        return int(key in self.docs or key in self.indexes)
+
+    def _matrix(self, field: str):
+        # Rebuilt only when the document set changes, like a real index
+        stamp = (field, len(self.docs), id(next(iter(self.docs.values()), None)))
+        if self._cache is None or self._cache[0] != stamp:
+            keys = [k for k, d in self.docs.items() if d.get(field) is not None]
+            matrix = np.asarray([self.docs[k][field] for k in keys], dtype=np.float32)
+            self._cache = (stamp, keys, matrix)
+        return self._cache[1], self._cache[2]
@@ -1,20 +1,75 @@
 // Search.tsx
-import { FC, useState } from 'react';
+import { FC, useEffect, useState } from 'react';
 import axios from 'axios';
 
+interface Suggestion {
+  text: string;
+  kind: 'title' | 'character' | 'actor' | 'quote';
+  season?: number;
+  episode?: string;
+}
+
+interface Snippet {
+  field: string;
+  text: string;
+  highlights: [number, number][];
+}
+
 interface SearchResult {
+  season_number: number;
   episode_number: string;
   title: string;
   airdate: string;
-  summary: string[];
   score: number;
+  snippet?: Snippet | null;
 }
 
+// Wrap the highlighted [start, end) ranges of a snippet in <mark>
+const renderSnippet = (snippet: Snippet) => {
+  const parts: React.ReactNode[] = [];
+  let last = 0;
+  snippet.highlights.forEach(([start, end], index) => {
+    parts.push(snippet.text.slice(last, start));
+    parts.push(<mark key={index}>{snippet.text.slice(start, end)}</mark>);
+    last = end;
+  });
+  parts.push(snippet.text.slice(last));
+  return parts;
+};
+
 const Search: FC = () => {
   const [searchQuery, setSearchQuery] = useState<string>('');
   const [searchResults, setSearchResults] = useState<SearchResult[]>([]);
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  const [suggestions, setSuggestions] = useState<Suggestion[]>([]);
+  // Full summaries, fetched only when a result is expanded
+  const [summaries, setSummaries] = useState<Record<string, string[]>>({});
+
+  // Typeahead: /api/suggest is a prefix lookup (no model), so query it as the user types
+  useEffect(() => {
+    const prefix = searchQuery.trim();
+    if (!prefix) {
+      setSuggestions([]);
+      return;
+    }
+    const controller = new AbortController();
+    const timer = setTimeout(async () => {
+      try {
+        const response = await axios.get('http://localhost:8000/api/suggest', {
+          params: { q: prefix, limit: 8 },
+          signal: controller.signal,
+        });
+        setSuggestions(response.data.suggestions || []);
+      } catch (error) {
+        if (!axios.isCancel(error)) setSuggestions([]);
+      }
+    }, 80);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [searchQuery]);
 
   const handleSearch = async () => {
     if (!searchQuery.trim()) return;
@@ -22,12 +77,39 @@ const Search: FC = () => {
     setIsLoading(true);
     setError(null);
     
+    setSearchResults([]);
+    setSummaries({});
+
     try {
-      const response = await axios.post('http://localhost:8000/api/search', { 
-        query: searchQuery,
-        top_k: 3 
+      // NDJSON stream: render each result as soon as its line arrives
+      const response = await fetch('http://localhost:8000/api/search/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          query: searchQuery,
+          top_k: 3,
+          fields: ['title', 'airdate', 'snippet'],
+        }),
       });
-      setSearchResults(response.data.results || []);
+      if (!response.ok || !response.body) throw new Error(`HTTP ${response.status}`);
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop() ?? '';
+        for (const line of lines.filter(Boolean)) {
+          const frame = JSON.parse(line);
+          if (frame.type === 'result') {
+            setSearchResults((prev) => [...prev, frame as SearchResult]);
+          } else if (frame.type === 'error') {
+            throw new Error(frame.detail);
+          }
+        }
+      }
     } catch (error) {
       console.error('Search error:', error);
       setError('Failed to perform search. Please try again.');
@@ -36,6 +118,20 @@ const Search: FC = () => {
     }
   };
 
+  const showSummary = async (result: SearchResult) => {
+    const key = `${result.season_number}-${result.episode_number}`;
+    if (summaries[key]) return;
+    try {
+      const response = await axios.get(
+        `http://localhost:8000/api/episodes/${result.season_number}/${result.episode_number}`,
+        { params: { fields: 'summary' } },
+      );
+      setSummaries((prev) => ({ ...prev, [key]: response.data.summary || [] }));
+    } catch (error) {
+      console.error('Episode fetch error:', error);
+    }
+  };
+
   const handleKeyPress = (e: React.KeyboardEvent) => {
     if (e.key === 'Enter') {
       handleSearch();
@@ -50,9 +146,17 @@ const Search: FC = () => {
           value={searchQuery}
           onChange={(e) => setSearchQuery(e.target.value)}
           onKeyPress={handleKeyPress}
+          list="search-suggestions"
           placeholder="Search Buffy episodes..."
           className="flex-1 px-4 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-blue-500"
         />
+        <datalist id="search-suggestions">
+          {suggestions.map((suggestion) => (
+            <option key={`${suggestion.kind}-${suggestion.text}`} value={suggestion.text}>
+              {suggestion.kind}
+            </option>
+          ))}
+        </datalist>
         <button 
           onClick={handleSearch}
           disabled={isLoading}
@@ -87,9 +191,23 @@ const Search: FC = () => {
                 Aired: {new Date(result.airdate).toLocaleDateString()}
               </div>
               <div className="space-y-2">
-                {result.summary.map((summary, index) => (
-                  <p key={index} className="text-gray-600">{summary}</p>
-                ))}
+                {summaries[`${result.season_number}-${result.episode_number}`] ? (
+                  summaries[`${result.season_number}-${result.episode_number}`].map((summary, index) => (
+                    <p key={index} className="text-gray-600">{summary}</p>
+                  ))
+                ) : (
+                  <>
+                    {result.snippet && (
+                      <p className="text-gray-600">{renderSnippet(result.snippet)}</p>
+                    )}
+                    <button
+                      onClick={() => showSummary(result)}
+                      className="text-sm text-blue-600 hover:underline"
+                    >
+                      Full summary
+                    </button>
+                  </>
+                )}
               </div>
             </div>
           </div>